@@ -3,12 +3,70 @@ This file house the function for the package ListUnion
 """
 
 
-def list_union(list_a: list, list_b: list):
+def _union_into(result: list, lists: tuple) -> list:
     """
-    This function creates a union of two lists. Assuming there are no duplicates in list_a and no duplicates in list_b.
-    When the two lists are combined there will be no duplicates in the new list.
+    This function appends each element of the lists to result if it is not already in result. Elements which can be
+    hashed are tracked in a set so checking for them is O(1), elements which can't be hashed (e.g. dictionaries) are
+    tracked in a list and checked the same way the old implementation did. Overall this makes the union O(n+m) instead
+    of O(n·m) when the elements are hashable.
     """
-    for element in list_b:
-        if element not in list_a:
-            list_a.append(element)
-    return list_a
+    seen = set()
+    seen_unhashable = []
+    for element in result:
+        try:
+            seen.add(element)
+        except TypeError:
+            seen_unhashable.append(element)
+
+    for list_b in lists:
+        for element in list_b:
+            try:
+                if element in seen:
+                    continue
+                seen.add(element)
+            except TypeError:
+                if element in seen_unhashable:
+                    continue
+                seen_unhashable.append(element)
+            result.append(element)
+    return result
+
+
+def list_union(list_a: list, *lists: list):
+    """
+    This function creates a union of two or more lists. Assuming there are no duplicates in list_a, when the lists
+    are combined there will be no duplicates in the new list and the elements keep the order they first appear in.
+    list_a is modified in place and returned, use list_union_copy if list_a should not be modified.
+    """
+    return _union_into(list_a, lists)
+
+
+def list_union_copy(*lists: list):
+    """
+    This function works the same as list_union but returns a new list so none of the lists passed in are modified.
+    """
+    return list(iter_union(*lists))
+
+
+def iter_union(*iterables, key=None):
+    """
+    This generator yields the union of the iterables lazily, each element is yielded the first time it is seen and
+    duplicates after that are skipped. The iterables can be generators as nothing is turned into a list first.
+
+    key is an optional function which returns the value used to compare the elements, for example
+    `key=lambda behaviour: behaviour.__class__` would only yield the first behaviour of each class.
+    """
+    seen = set()
+    seen_unhashable = []
+    for iterable in iterables:
+        for element in iterable:
+            element_key = element if key is None else key(element)
+            try:
+                if element_key in seen:
+                    continue
+                seen.add(element_key)
+            except TypeError:
+                if element_key in seen_unhashable:
+                    continue
+                seen_unhashable.append(element_key)
+            yield element
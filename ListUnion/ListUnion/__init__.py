@@ -2,4 +2,4 @@
 ListUnion is a package that contains a function that creates a union of two lists.
 There are no duplicates in either of the lists.
 """
-from .List_Union import list_union
+from .List_Union import list_union, list_union_copy, iter_union
@@ -3,7 +3,7 @@ This program will test the ZMK module
 """
 import unittest
 
-from ListUnion import list_union
+from ListUnion import list_union, list_union_copy, iter_union
 
 
 class TestListUnion(unittest.TestCase):
@@ -19,6 +19,86 @@ class TestListUnion(unittest.TestCase):
         list_b = [4, 5, 6, 1, 2, 3]
         self.assertEqual(list_union(list_a, list_b), expected_list)
 
+    def test_list_union_n_way(self):
+        expected_list = [1, 2, 3, 4, 5, 6]
+        self.assertEqual(list_union([1, 2], [2, 3, 4], [4, 1, 5], [6, 6]), expected_list)
+
+    def test_list_union_with_unhashable(self):
+        expected_list = [1, {'a': 1}, [2], 3, {'b': 2}]
+        self.assertEqual(list_union([1, {'a': 1}], [[2], {'a': 1}, 3], [1, {'b': 2}, [2]]), expected_list)
+
+    def test_list_union_mutates_first_list(self):
+        list_a = [1, 2]
+        self.assertIs(list_union(list_a, [3]), list_a)
+        self.assertEqual(list_a, [1, 2, 3])
+
+    def test_list_union_copy(self):
+        list_a = [1, 2, 3]
+        list_b = [3, 4]
+        self.assertEqual(list_union_copy(list_a, list_b), [1, 2, 3, 4])
+        self.assertEqual(list_a, [1, 2, 3])
+        self.assertEqual(list_b, [3, 4])
+
+
+class TestIterUnion(unittest.TestCase):
+    def test_iter_union_with_generators(self):
+        union = iter_union((i for i in range(4)), iter([2, 3, 4, 5]), [5, 6])
+        self.assertNotIsInstance(union, list)
+        self.assertEqual(list(union), [0, 1, 2, 3, 4, 5, 6])
+
+    def test_iter_union_is_lazy(self):
+        def infinite():
+            i = 0
+            while True:
+                yield i
+                i += 1
+        union = iter_union([0, 1], infinite())
+        self.assertEqual([next(union) for _ in range(5)], [0, 1, 2, 3, 4])
+
+    def test_iter_union_with_key(self):
+        words = ['apple', 'avocado', 'banana', 'blueberry', 'cherry']
+        self.assertEqual(list(iter_union(words, key=lambda word: word[0])), ['apple', 'banana', 'cherry'])
+        self.assertEqual(list(iter_union([{'a': 1}], [{'a': 1}, {'a': 2}], key=lambda item: item)),
+                         [{'a': 1}, {'a': 2}])
+
+
+class _Counted:
+    """element which counts how many times elements are compared, to measure the work done by a union"""
+    comparisons = 0
+
+    def __init__(self, value: int):
+        self.value = value
+
+    def __eq__(self, other):
+        _Counted.comparisons += 1
+        return isinstance(other, _Counted) and self.value == other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+
+class TestListUnionScaling(unittest.TestCase):
+    """
+    Test that the union scales linearly with the size of the lists, the old implementation was O(n·m) so ten times the
+    elements would take a hundred times as long. The comparisons are counted instead of timing the union, so the test
+    doesn't depend on the speed of the machine.
+    """
+
+    def count_comparisons(self, union, size: int) -> int:
+        list_a = [_Counted(value) for value in range(size)]
+        list_b = [_Counted(value) for value in range(size // 2, size + size // 2)]
+        _Counted.comparisons = 0
+        result = union(list_a, list_b)
+        self.assertEqual(len(result), size + size // 2)
+        return _Counted.comparisons
+
+    def test_scaling(self):
+        for union in (list_union, list_union_copy, lambda list_a, list_b: list(iter_union(list_a, list_b))):
+            small, large = self.count_comparisons(union, 1_000), self.count_comparisons(union, 10_000)
+            # every element of list_b which is also in list_a is compared once, an O(n·m) union compares them all
+            self.assertLessEqual(small, 1_000)
+            self.assertLessEqual(large, 10 * small)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,13 @@
 """
 Test the Behaviours module
 """
+import json
+import os
+import timeit
 import unittest
 
 from ZMK import Behaviours
+from ZMK.ExportConfig import ZMKJSONEncoder
 from ZMK.KeyCodes import KeyCode, FunctionModifier
 
 class TestKeyPress(unittest.TestCase):
@@ -274,5 +278,168 @@ class TestBluetooth(unittest.TestCase):
     """
 
 
+class TestBehaviourProperties(unittest.TestCase):
+    """
+    Test the property methods shared by all behaviours in AbstractBehaviour
+    """
+
+    def test_get_behaviour_config_properties(self):
+        """
+        Test that the properties are returned with their current value.
+        """
+        properties = Behaviours.LayerTap(1, KeyCode('A')).get_behaviour_config_properties()
+        self.assertEqual([property_dict['property_name'] for property_dict in properties], ['layer', 'binding'])
+        self.assertEqual(properties[0]['current_value'], 1)
+        self.assertEqual(properties[0]['data_types'], [int])
+        self.assertEqual(Behaviours.Transparent().get_behaviour_config_properties(), [])
+
+    def test_set_config_property(self):
+        """
+        Test setting a property by name, including the errors for an unknown property, type or value.
+        """
+        layer_tap = Behaviours.LayerTap(1, KeyCode('A'))
+        layer_tap.set_config_property('layer', 2)
+        self.assertEqual(layer_tap.get_config_property('layer'), 2)
+        self.assertEqual(str(layer_tap), "LayerTap(2, KeyCode('A'))")
+        self.assertRaises(KeyError, layer_tap.set_config_property, 'invalid property', 1)
+        self.assertRaises(KeyError, layer_tap.get_config_property, 'invalid property')
+        self.assertRaises(TypeError, layer_tap.set_config_property, 'layer', '1')
+        self.assertRaises(ValueError, layer_tap.set_config_property, 'layer', -1)
+
+    def test_validate_many(self):
+        """
+        Test validating a batch of property values without creating the behaviours.
+        """
+        Behaviours.LayerTap.validate_many([{'layer': 1, 'binding': KeyCode('A')}, {'layer': 0}])
+        with self.assertRaisesRegex(ValueError, 'position 1'):
+            Behaviours.MomentaryLayer.validate_many([{'layer': 1}, {'layer': -1}])
+        with self.assertRaisesRegex(TypeError, 'position 0'):
+            Behaviours.KeyPress.validate_many([{'binding': 1}])
+        with self.assertRaises(KeyError):
+            Behaviours.KeyPress.validate_many([{'invalid property': 1}])
+
+    def test_slots(self):
+        """
+        Test that the behaviours do not have a __dict__.
+        """
+        self.assertFalse(hasattr(Behaviours.KeyPress(KeyCode('A')), '__dict__'))
+        self.assertFalse(hasattr(Behaviours.Transparent(), '__dict__'))
+
+
+class TestShareBehaviour(unittest.TestCase):
+    """
+    Test sharing behaviours between keymap positions
+    """
+
+    def test_behaviours_without_properties_are_singletons(self):
+        """
+        Test that behaviours without properties only have one instance.
+        """
+        self.assertIs(Behaviours.Transparent(), Behaviours.Transparent())
+        self.assertIs(Behaviours.NoneBehaviour(), Behaviours.NoneBehaviour())
+        self.assertIsNot(Behaviours.Transparent(), Behaviours.NoneBehaviour())
+
+    def test_share_by_value(self):
+        """
+        Test that behaviours with the same values are shared and different ones are not.
+        """
+        shared = Behaviours.share_behaviour(Behaviours.KeyPress(KeyCode('A')))
+        self.assertIs(Behaviours.share_behaviour(Behaviours.KeyPress(KeyCode('A'))), shared)
+        self.assertIsNot(Behaviours.share_behaviour(Behaviours.KeyPress(KeyCode('B'))), shared)
+        layer_tap = Behaviours.share_behaviour(Behaviours.LayerTap(1, FunctionModifier('LC(xx)', KeyCode('A'))))
+        self.assertIs(Behaviours.share_behaviour(Behaviours.LayerTap(1, FunctionModifier('LC(xx)', KeyCode('A')))),
+                      layer_tap)
+        self.assertRaises(TypeError, Behaviours.share_behaviour, KeyCode('A'))
+
+    def test_copy_on_modify(self):
+        """
+        Test that a shared behaviour can't be modified but a copy of it can.
+        """
+        shared = Behaviours.share_behaviour(Behaviours.MomentaryLayer(1))
+        self.assertRaises(ValueError, shared.set_config_property, 'layer', 2)
+        copy = shared.copy()
+        copy.set_config_property('layer', 2)
+        self.assertEqual(str(copy), 'MomentaryLayer(2)')
+        self.assertEqual(str(shared), 'MomentaryLayer(1)')
+
+    def test_argument_not_shared(self):
+        """
+        Test that sharing a behaviour leaves the argument modifiable and that changing its codes afterwards doesn't
+        change the shared behaviour or the key it is shared under.
+        """
+        modifier = FunctionModifier('LC(xx)', KeyCode('A'))
+        key_press = Behaviours.KeyPress(modifier)
+        shared = Behaviours.share_behaviour(key_press)
+        self.assertIsNot(shared, key_press)
+        modifier.set_binding(KeyCode('B'))
+        self.assertEqual(str(shared), "KeyPress(FunctionModifier('LC(xx)', KeyCode('A')))")
+        self.assertIs(Behaviours.share_behaviour(Behaviours.KeyPress(FunctionModifier('LC(xx)', KeyCode('A')))),
+                      shared)
+        self.assertRaises(ValueError, shared.get_config_property('binding').set_binding, KeyCode('C'))
+        key_press.set_config_property('binding', KeyCode('C'))
+        self.assertEqual(str(key_press), "KeyPress(KeyCode('C'))")
+
+
+class TestBehaviourEquality(unittest.TestCase):
+    """
+    Test value equality and hashing of behaviours
+    """
+
+    def test_equal_values(self):
+        """
+        Test that behaviours with equal values are equal and hash the same.
+        """
+        self.assertEqual(Behaviours.KeyPress(KeyCode('A')), Behaviours.KeyPress(KeyCode('A')))
+        self.assertNotEqual(Behaviours.KeyPress(KeyCode('A')), Behaviours.KeyPress(KeyCode('B')))
+        self.assertNotEqual(Behaviours.MomentaryLayer(1), Behaviours.ToggleLayer(1))
+        share = Behaviours.share_behaviour
+        self.assertEqual(len({share(Behaviours.MomentaryLayer(1)), share(Behaviours.MomentaryLayer(1)),
+                              Behaviours.Transparent()}), 2)
+
+    def test_hash_only_shared(self):
+        """
+        Test that a behaviour which can still be modified can't be hashed, and that a shared one hashes by value.
+        """
+        behaviour = Behaviours.MomentaryLayer(1)
+        self.assertRaises(TypeError, hash, behaviour)
+        self.assertEqual(hash(Behaviours.share_behaviour(behaviour)),
+                         hash(Behaviours.share_behaviour(behaviour.copy())))
+        self.assertEqual(hash(Behaviours.Transparent()), hash(Behaviours.Transparent()))
+
+
+class _DirProbingEncoder(json.JSONEncoder):
+    """encoder which checks for an export method with dir() like the encoder did before"""
+
+    def default(self, o):
+        if 'export' in dir(o):
+            return o.export()
+        return super().default(o)
+
+
+class TestExportDispatch(unittest.TestCase):
+    """
+    Test that looking up the export method once per class exports the same as calling dir() for every object of a
+    synthetic 20 layer keymap, and benchmark the two when ZMK_BENCHMARK is set
+    """
+
+    @staticmethod
+    def keymap() -> list:
+        keys = [Behaviours.KeyPress(KeyCode('A')), Behaviours.KeyPress(FunctionModifier('LC(xx)', KeyCode('B'))),
+                Behaviours.MomentaryLayer(1), Behaviours.LayerTap(2, KeyCode('C')), Behaviours.Transparent()]
+        return [[keys[(layer + key) % len(keys)] for key in range(60)] for layer in range(20)]
+
+    def test_same_output(self):
+        keymap = self.keymap()
+        self.assertEqual(json.dumps(keymap, cls=ZMKJSONEncoder), json.dumps(keymap, cls=_DirProbingEncoder))
+
+    @unittest.skipUnless(os.environ.get('ZMK_BENCHMARK'), 'benchmarks only run when ZMK_BENCHMARK is set')
+    def test_speed(self):
+        keymap = self.keymap()
+        dispatch = min(timeit.repeat(lambda: json.dumps(keymap, cls=ZMKJSONEncoder), number=1, repeat=5))
+        probing = min(timeit.repeat(lambda: json.dumps(keymap, cls=_DirProbingEncoder), number=1, repeat=5))
+        print(f"\n20 layer export dispatch: {dispatch * 1000:.2f}ms, dir(): {probing * 1000:.2f}ms")
+        self.assertLess(dispatch, probing)
+
+
 if __name__ == '__main__':
     unittest.main()
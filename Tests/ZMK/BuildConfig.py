@@ -0,0 +1,315 @@
+"""
+Test the BuildConfig module and the incremental build of ZMKConfig
+"""
+import json
+import os
+import tempfile
+import timeit
+import unittest
+from unittest import mock
+
+from ZMK import Behaviours, BuildConfig, ConfigOptions, Drivers, MCUs
+from ZMK.BuildConfig import JOURNAL_NAME, MANIFEST_NAME, TEMPORARY_SUFFIX, ConfigBuilder, get_outputs
+from ZMK.Config import ZMKConfig
+from ZMK.KeyCodes import KeyCode
+from ZMK.Keymap import LayeredKeymap
+from ZMK.Transform import MatrixTransform
+
+A = Behaviours.KeyPress(KeyCode('A'))
+B = Behaviours.KeyPress(KeyCode('B'))
+
+
+def make_config(working_directory: str) -> ZMKConfig:
+    config = ZMKConfig()
+    config.set_config_name('Test Board')
+    config.set_config_id('test_board')
+    config.set_shield_directory('test_board')
+    config.set_working_directory(working_directory)
+    config.set_mcu(MCUs.NiceNanoV2())
+    for col in range(4):
+        config.get_transform().add_key(0, col)
+        config.modify_key_binding(col, A if col % 2 else B)
+    return config
+
+
+class GpioDriver(Drivers.AbstractDriver):
+    """driver with a property which can be set, the kscan node of the overlay is rendered from it"""
+
+    def __init__(self):
+        super().__init__()
+        self.get_properties().append({'name': 'diode-direction', 'types': [str], 'value': 'col2row'})
+
+    def check_property(self, zmk_config: ZMKConfig, property_name: str, value: any = None) -> bool:
+        return isinstance(value, str)
+
+    def build(self, zmk_config: ZMKConfig) -> dict:
+        return {}
+
+    def export(self) -> dict:
+        return {}
+
+    def __str__(self):
+        return 'GpioDriver'
+
+
+class TestBuildConfig(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config = make_config(self.directory.name)
+        self.paths = ConfigBuilder(self.config).get_paths()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self, name: str) -> str:
+        with open(os.path.join(self.directory.name, self.paths[name]), 'r', encoding='utf8') as file:
+            return file.read()
+
+    def test_first_build(self):
+        """
+        Test that the first build writes every file and the manifest with their hashes.
+        """
+        written = self.config.build_config()
+        self.assertEqual(sorted(written), sorted(self.paths.values()))
+        self.assertIn('&kp B &kp A &kp B &kp A', self.read('.keymap'))
+        self.assertIn('#include <behaviors.dtsi>', self.read('.keymap'))
+        self.assertIn('RC(0,0) RC(0,1) RC(0,2) RC(0,3)', self.read('.overlay'))
+        self.assertIn('board: nice_nano_v2', self.read('build.yaml'))
+        with open(os.path.join(self.directory.name, MANIFEST_NAME), 'r', encoding='utf8') as file:
+            manifest = json.load(file)
+        self.assertEqual(set(manifest), set(self.paths.values()))
+        self.assertEqual(manifest[self.paths['.keymap']]['components'], ['keymap', 'transform'])
+
+    def test_incremental_build(self):
+        """
+        Test that only the files depending on a changed component are written, and not at all if the bytes are the same.
+        """
+        self.config.build_config()
+        self.assertEqual(self.config.build_config(), [])
+        self.config.modify_key_binding(0, A)
+        self.assertEqual(self.config.build_config(), [self.paths['.keymap']])
+        self.assertIn('&kp A &kp A &kp B &kp A', self.read('.keymap'))
+        # the behaviour changes and changes back, so the keymap is rendered but it's the same as on disk
+        self.config.modify_key_binding(0, B)
+        self.config.undo()
+        self.assertEqual(self.config.build_config(), [])
+        self.config.set_config_name('Other Board')
+        self.assertEqual(self.config.build_config(), [self.paths['Kconfig.defconfig'], self.paths['keyboard.zmk.yml']])
+        self.assertIn('default "Other Board"', self.read('Kconfig.defconfig'))
+
+    def test_in_place_changes(self):
+        """
+        Test that setting the value of a config option or a property of the driver in place builds the files again.
+        """
+        option = ConfigOptions.BT_MAX_CONN(self.config, 3)
+        self.config.add_config_option(option)
+        self.config.set_driver(GpioDriver())
+        self.config.build_config()
+        option.set_config_property(self.config, 4)
+        self.assertEqual(self.config.build_config(), [self.paths['.conf']])
+        self.assertIn('CONFIG_BT_MAX_CONN=4', self.read('.conf'))
+        self.config.get_driver().set_property(self.config, 'diode-direction', 'row2col')
+        self.assertEqual(self.config.build_config(), [self.paths['.overlay']])
+        self.assertIn('diode-direction = "row2col";', self.read('.overlay'))
+        # a deleted option doesn't change the config anymore
+        self.config.del_config_option(option)
+        self.config.build_config()
+        option.set_config_property(self.config, 5)
+        self.assertEqual(self.config.build_config(), [])
+
+    def test_new_builder(self):
+        """
+        Test that a new builder trusts the manifest on disk and only writes the files which are missing or different.
+        """
+        self.config.build_config()
+        os.remove(os.path.join(self.directory.name, self.paths['.overlay']))
+        config = make_config(self.directory.name)
+        self.assertEqual(config.build_config(), [self.paths['.overlay']])
+        self.assertEqual(sorted(config.build_config(force=True)), sorted(self.paths.values()))
+
+    def test_path_change(self):
+        """
+        Test that changing the shield directory builds every file in the new directory.
+        """
+        self.config.build_config()
+        self.config.set_shield_directory('other_board')
+        written = self.config.build_config()
+        self.assertIn('config/boards/shields/other_board/test_board.keymap', written)
+
+    def test_transform_change(self):
+        """
+        Test that changing the transform rebuilds the keymap as well, its bindings are laid out in the rows of it.
+        """
+        self.config.build_config()
+        transform = MatrixTransform()
+        for key in range(4):
+            transform.add_key(key // 2, key % 2)
+        self.config.set_transform(transform)
+        written = self.config.build_config()
+        self.assertIn(self.paths['.keymap'], written)
+        self.assertIn('&kp B &kp A\n                &kp B &kp A', self.read('.keymap'))
+
+    def test_missing_values(self):
+        """
+        Test that building without a working directory raises a ValueError.
+        """
+        self.assertRaises(ValueError, ZMKConfig().build_config)
+        self.assertIn('.keymap', get_outputs())
+
+
+class TestAtomicWrites(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config = make_config(self.directory.name)
+        self.config.build_config()
+        self.paths = ConfigBuilder(self.config).get_paths()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def snapshot(self) -> dict:
+        files = {}
+        for directory, _, names in os.walk(self.directory.name):
+            for name in names:
+                with open(os.path.join(directory, name), 'rb') as file:
+                    files[os.path.relpath(os.path.join(directory, name), self.directory.name)] = file.read()
+        return files
+
+    def test_failed_write(self):
+        """
+        Test that if writing one of the files fails none of the files or the manifest change, no temporary files are
+        left, and the next build writes the files.
+        """
+        before = self.snapshot()
+        self.config.modify_key_binding(0, A)
+        self.config.get_transform().add_key(1, 0)
+        self.config.get_keymap().set_position_count(5)
+        write_temporary = BuildConfig._write_temporary
+        calls = []
+
+        def fail_second(file_path, content):
+            calls.append(file_path)
+            if len(calls) == 2:
+                raise OSError('disk full')
+            return write_temporary(file_path, content)
+
+        with mock.patch.object(BuildConfig, '_write_temporary', fail_second):
+            self.assertRaises(OSError, self.config.build_config)
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(sorted(self.config.build_config()), sorted([self.paths['.keymap'], self.paths['.overlay']]))
+
+    def test_failed_rename(self):
+        """
+        Test that if renaming one of the files fails, the next build finishes the renames from the journal, so every
+        file and the manifest are the new ones and no temporary files are left.
+        """
+        self.config.modify_key_binding(0, A)
+        self.config.get_transform().add_key(1, 0)
+        self.config.get_keymap().set_position_count(5)
+        replace = os.replace
+        calls = []
+
+        def fail_third(source, destination):
+            calls.append(destination)
+            if len(calls) == 3:
+                raise OSError('disk removed')
+            replace(source, destination)
+
+        with mock.patch.object(os, 'replace', fail_third):
+            self.assertRaises(OSError, self.config.build_config)
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, JOURNAL_NAME)))
+        self.assertEqual(self.config.build_config(), [])
+        files = self.snapshot()
+        self.assertFalse([name for name in files if name.endswith(TEMPORARY_SUFFIX) or name == JOURNAL_NAME])
+        self.assertIn('RC(1,0)', files[self.paths['.overlay']].decode('utf8'))
+        self.assertIn('&kp A &kp A &kp B &kp A\n                &none', files[self.paths['.keymap']].decode('utf8'))
+        directory = tempfile.TemporaryDirectory()
+        self.config.set_working_directory(directory.name)
+        self.config.build_config()
+        with open(os.path.join(directory.name, MANIFEST_NAME), 'rb') as file:
+            self.assertEqual(file.read(), files[MANIFEST_NAME])
+        directory.cleanup()
+
+    def test_left_over_temporary_files(self):
+        """
+        Test that the temporary files of a build which was killed are removed by the next build.
+        """
+        keymap_path = os.path.join(self.directory.name, self.paths['.keymap'])
+        left_over = os.path.join(os.path.dirname(keymap_path), f".keymap.1234{TEMPORARY_SUFFIX}")
+        with open(left_over, 'wb') as file:
+            file.write(b'half written')
+        self.assertEqual(self.config.build_config(), [])
+        self.assertFalse(os.path.exists(left_over))
+
+    @unittest.skipIf(os.name == 'nt', 'file permissions are not used on Windows')
+    def test_permissions(self):
+        """
+        Test that the files get the usual permissions and not the private ones of a temporary file.
+        """
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = os.stat(os.path.join(self.directory.name, self.paths['.keymap'])).st_mode & 0o777
+        self.assertEqual(mode, 0o666 & ~umask)
+
+
+class TestLargeBuild(unittest.TestCase):
+    """
+    Test and benchmark the build of a synthetic 1000 key, 32 layer config
+    """
+
+    @staticmethod
+    def make_large_config(working_directory: str) -> ZMKConfig:
+        config = make_config(working_directory)
+        transform = config.get_transform()
+        for key in range(4, 1000):
+            transform.add_key(key // 20, key % 20)
+        keys = [Behaviours.KeyPress(KeyCode(name)) for name in 'ABCDEFGH'] + \
+               [Behaviours.MomentaryLayer(1), Behaviours.LayerTap(2, KeyCode('C')), Behaviours.Transparent()]
+        config.set_keymap(LayeredKeymap.from_layers(
+            [[keys[(layer * 7 + key) % len(keys)] for key in range(1000)] for layer in range(32)]))
+        return config
+
+    def setUp(self):
+        self.directories = [tempfile.TemporaryDirectory() for _ in range(2)]
+
+    def tearDown(self):
+        for directory in self.directories:
+            directory.cleanup()
+
+    def test_same_output(self):
+        """
+        Test that two configs with the same content build the same files.
+        """
+        contents = []
+        for directory in self.directories:
+            builder = ConfigBuilder(self.make_large_config(directory.name))
+            contents.append({})
+            for relative_path in builder.build():
+                with open(os.path.join(directory.name, relative_path), 'rb') as file:
+                    contents[-1][relative_path] = file.read()
+        self.assertEqual(len(contents[0]), len(get_outputs()))
+        self.assertEqual(contents[0], contents[1])
+
+    @unittest.skipUnless(os.environ.get('ZMK_BENCHMARK'), 'benchmarks only run when ZMK_BENCHMARK is set')
+    def test_speed(self):
+        """
+        Benchmark a full build against the build after changing the name of the config, which doesn't render the
+        keymap. Only run when ZMK_BENCHMARK is set, as timings on a loaded machine can't be compared.
+        """
+        config = self.make_large_config(self.directories[0].name)
+        builder = ConfigBuilder(config)
+        names = iter(range(1000))
+
+        def rename():
+            config.set_config_name(f"Board {next(names)}")
+            builder.build()
+
+        full_time = min(timeit.repeat(lambda: builder.build(force=True), number=1, repeat=5))
+        incremental_time = min(timeit.repeat(rename, number=1, repeat=5))
+        print(f"\n1000 key 32 layer build full: {full_time * 1000:.2f}ms, "
+              f"incremental: {incremental_time * 1000:.2f}ms")
+        self.assertLess(incremental_time * 5, full_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
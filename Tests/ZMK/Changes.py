@@ -0,0 +1,167 @@
+"""
+Test the Changes module and the change notification of ZMKConfig
+"""
+import unittest
+
+from ZMK import Behaviours, ConfigOptions
+from ZMK.Changes import ChangeNotifier, ConfigChange
+from ZMK.Config import ZMKConfig
+from ZMK.KeyCodes import KeyCode
+from ZMK.Keymap import LayeredKeymap
+from ZMK.Transform import MatrixTransform
+
+A = Behaviours.KeyPress(KeyCode('A'))
+B = Behaviours.KeyPress(KeyCode('B'))
+
+
+class TestChangeNotifier(unittest.TestCase):
+    def test_notify(self):
+        """
+        Test that a change outside a batch is sent straight away and only to the callbacks subscribed to it.
+        """
+        notifier = ChangeNotifier()
+        everything, keymap = [], []
+        notifier.subscribe(everything.append)
+        notifier.subscribe(keymap.append, ['keymap'])
+        notifier.notify('keymap', (0, 1))
+        notifier.notify('mcu')
+        self.assertEqual(everything, [[ConfigChange('keymap', (0, 1))], [ConfigChange('mcu')]])
+        self.assertEqual(keymap, [[ConfigChange('keymap', (0, 1))]])
+
+    def test_batch(self):
+        """
+        Test that the changes of nested batches are sent once when the outer batch ends and equal changes are kept once.
+        """
+        notifier = ChangeNotifier()
+        received = []
+        notifier.subscribe(received.append)
+        with notifier.batch():
+            notifier.notify('keymap', (0, 1))
+            with notifier.batch():
+                notifier.notify('keymap', (0, 1))
+                notifier.notify('keymap', (0, 2))
+            self.assertEqual(received, [])
+        self.assertEqual(received, [[ConfigChange('keymap', (0, 1)), ConfigChange('keymap', (0, 2))]])
+
+    def test_unsubscribe(self):
+        """
+        Test that an unsubscribed callback isn't called and unsubscribing it again raises a ValueError.
+        """
+        notifier = ChangeNotifier()
+        received = []
+        notifier.subscribe(received.append)
+        notifier.unsubscribe(received.append)
+        notifier.notify('mcu')
+        self.assertEqual(received, [])
+        self.assertRaises(ValueError, notifier.unsubscribe, received.append)
+        self.assertRaises(TypeError, notifier.subscribe, 'callback')
+
+    def test_dirty(self):
+        """
+        Test that the dirty flags collect the keys of the changes until they're cleared.
+        """
+        notifier = ChangeNotifier()
+        self.assertFalse(notifier.is_dirty())
+        notifier.notify('keymap', (0, 1))
+        notifier.notify('keymap', (1, 3))
+        notifier.notify('mcu')
+        self.assertTrue(notifier.is_dirty('keymap'))
+        self.assertEqual(notifier.get_dirty_keys('keymap'), frozenset({(0, 1), (1, 3)}))
+        self.assertEqual(notifier.get_dirty_components(), ['keymap', 'mcu'])
+        notifier.clear_dirty('keymap')
+        self.assertFalse(notifier.is_dirty('keymap'))
+        self.assertTrue(notifier.is_dirty())
+        notifier.clear_dirty()
+        self.assertFalse(notifier.is_dirty())
+
+
+class TestConfigChanges(unittest.TestCase):
+    def setUp(self):
+        self.config = ZMKConfig()
+        self.received = []
+        self.config.subscribe(self.received.append)
+
+    def changes(self) -> list:
+        changes = [change for changes in self.received for change in changes]
+        self.received.clear()
+        return changes
+
+    def test_key_binding(self):
+        """
+        Test that changing a binding sends the position which changed, also for changes made directly to the keymap.
+        """
+        self.config.modify_key_binding(2, A, layer=0)
+        self.assertIn(ConfigChange('keymap', (0, 2)), self.changes())
+        self.config.get_keymap().set(0, 1, B)
+        self.assertEqual(self.changes(), [ConfigChange('keymap', (0, 1))])
+        self.config.get_keymap().add_layer()
+        self.assertEqual(self.changes(), [ConfigChange('keymap')])
+        self.assertEqual(self.config.get_changes().get_dirty_keys('keymap'), frozenset({None, (0, 1), (0, 2)}))
+
+    def test_replaced_keymap(self):
+        """
+        Test that the changes of a replaced keymap are no longer sent and the ones of the new keymap are.
+        """
+        old_keymap = self.config.get_keymap()
+        keymap = LayeredKeymap(4)
+        self.config.set_keymap(keymap)
+        self.assertEqual(self.changes(), [ConfigChange('keymap')])
+        old_keymap.add_layer()
+        self.assertEqual(self.changes(), [])
+        keymap.set(0, 3, A)
+        self.assertEqual(self.changes(), [ConfigChange('keymap', (0, 3))])
+        self.config.undo()
+        keymap.set(0, 2, A)
+        old_keymap.add_layer()
+        self.assertEqual(self.changes(), [ConfigChange('keymap'), ConfigChange('keymap')])
+
+    def test_transform(self):
+        """
+        Test that adding a key to the transform sends its index.
+        """
+        self.config.get_transform().add_key(0, 0)
+        self.config.get_transform().add_key(0, 1)
+        self.assertEqual(self.changes(), [ConfigChange('transform', 0), ConfigChange('transform', 1)])
+        self.config.set_transform(MatrixTransform())
+        self.config.get_transform().add_key(1, 1)
+        self.assertEqual(self.changes(), [ConfigChange('transform'), ConfigChange('transform', 0)])
+
+    def test_options(self):
+        """
+        Test that the config options and the split config options send their component and side.
+        """
+        self.config.add_config_option(ConfigOptions.BT_MAX_CONN(self.config, 3))
+        self.config.split_config(True)
+        self.config.add_split_config_option('central', ConfigOptions.ZMK_SPLIT_ROLE_CENTRAL(self.config, True))
+        self.assertEqual(self.changes(), [ConfigChange('config_options'), ConfigChange('split_config'),
+                                          ConfigChange('split_config_options', 'central')])
+
+    def test_undo_coalesced(self):
+        """
+        Test that the changes of an undo are sent together once and the dirty flags are set by it.
+        """
+        with self.config.get_history().group('bindings'):
+            for _ in range(3):
+                self.config.modify_key_binding(0, A)
+                self.config.modify_key_binding(0, B)
+        self.changes()
+        self.config.clear_dirty()
+        self.config.undo()
+        self.assertEqual(len(self.received), 1)
+        self.assertIn(ConfigChange('keymap', (0, 0)), self.received[0])
+        self.assertEqual(len(set(self.received[0])), len(self.received[0]))
+        self.assertTrue(self.config.is_dirty('keymap'))
+        self.assertFalse(self.config.is_dirty('mcu'))
+
+    def test_clear_key_data(self):
+        """
+        Test that clearing the key data sends a single batch of the replaced attributes.
+        """
+        self.config.clear_key_data()
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual({change.component for change in self.received[0]},
+                         {'keymap', 'behaviours', 'driver', 'transform'})
+
+
+if __name__ == '__main__':
+    unittest.main()
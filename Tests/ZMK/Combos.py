@@ -0,0 +1,119 @@
+"""
+Test the Combos module
+"""
+import itertools
+import os
+import timeit
+import unittest
+
+from ZMK import Behaviours
+from ZMK.Combos import Combo, ComboFeature
+from ZMK.KeyCodes import KeyCode
+from ZMK.Transform import MatrixTransform
+
+ESC = Behaviours.KeyPress(KeyCode('ESC'))
+
+
+class TestCombo(unittest.TestCase):
+    def test_init_invalid(self):
+        """
+        Test the __init__ method of the Combo class with invalid parameters.
+        """
+        self.assertRaises(TypeError, Combo, 1, [0, 1], ESC)
+        self.assertRaises(ValueError, Combo, 'combo esc', [0, 1], ESC)
+        self.assertRaises(TypeError, Combo, 'combo_esc', [0, '1'], ESC)
+        self.assertRaises(ValueError, Combo, 'combo_esc', [0, -1], ESC)
+        self.assertRaises(ValueError, Combo, 'combo_esc', [1, 1], ESC)
+        self.assertRaises(TypeError, Combo, 'combo_esc', [0, 1], KeyCode('ESC'))
+        self.assertRaises(ValueError, Combo, 'combo_esc', [0, 1], ESC, 0)
+
+    def test_positions(self):
+        """
+        Test that the key positions and layers are stored as bitsets.
+        """
+        combo = Combo('combo_esc', [3, 0], ESC, layers=[1])
+        self.assertEqual(combo.get_key_positions(), (0, 3))
+        self.assertEqual(combo.get_positions_bitset(), 0b1001)
+        self.assertEqual(combo.get_layers(), (1,))
+        self.assertIsNone(Combo('combo_tab', [0, 1], ESC).get_layers())
+
+    def test_build(self):
+        """
+        Test the build method of the Combo class.
+        """
+        self.assertEqual(Combo('combo_esc', [0, 1], ESC, 40, [0]).build()['.keymap']['return'],
+                         'combo_esc {\n    timeout-ms = <40>;\n    key-positions = <0 1>;\n    bindings = <&kp ESC>;\n'
+                         '    layers = <0>;\n};')
+
+
+class TestComboFeature(unittest.TestCase):
+    def test_add_combo(self):
+        """
+        Test that combo names have to be unique.
+        """
+        feature = ComboFeature()
+        feature.add_combo(Combo('combo_esc', [0, 1], ESC))
+        self.assertRaises(ValueError, feature.add_combo, Combo('combo_esc', [2, 3], ESC))
+        self.assertRaises(TypeError, feature.add_combo, ESC)
+        feature.del_combo('combo_esc')
+        self.assertEqual(feature.get_combos(), [])
+        self.assertRaises(KeyError, feature.del_combo, 'combo_esc')
+
+    def test_set_invalid_combos(self):
+        """
+        Test that setting the combos to an invalid value leaves the combos unchanged.
+        """
+        feature = ComboFeature()
+        combo = Combo('combo_esc', [0, 1], ESC)
+        feature.add_combo(combo)
+        self.assertRaises(TypeError, feature.set_feature_config_property, 'combos',
+                          [Combo('combo_a', [2, 3], ESC), ESC])
+        self.assertRaises(ValueError, feature.set_feature_config_property, 'combos',
+                          [Combo('combo_a', [2, 3], ESC), Combo('combo_a', [4, 5], ESC)])
+        self.assertEqual(feature.get_combos(), [combo])
+        feature.set_feature_config_property('combos', [Combo('combo_a', [2, 3], ESC)])
+        self.assertEqual([combo.get_name() for combo in feature.get_combos()], ['combo_a'])
+
+    def test_find_conflicts(self):
+        """
+        Test each kind of conflict.
+        """
+        feature = ComboFeature()
+        feature.set_feature_config_property('combos', [
+            Combo('a', [0, 1], ESC), Combo('b', [1, 0], ESC), Combo('c', [0, 1, 2], ESC), Combo('d', [2, 3], ESC, 80),
+            Combo('e', [4, 5], ESC, layers=[0]), Combo('f', [4, 5], ESC, layers=[1]), Combo('g', [6, 7], ESC)])
+        transform = MatrixTransform()
+        for col in range(7):
+            transform.add_key(0, col)
+        self.assertEqual(feature.find_conflicts(transform), [
+            {'kind': 'position', 'combos': ('g',)},
+            {'kind': 'duplicate', 'combos': ('a', 'b')},
+            {'kind': 'subset', 'combos': ('a', 'c')},
+            {'kind': 'subset', 'combos': ('b', 'c')},
+            {'kind': 'overlap', 'combos': ('c', 'd')},
+            {'kind': 'timeout', 'combos': ('c', 'd')}])
+
+
+class TestFindConflictsScaling(unittest.TestCase):
+    """
+    Benchmark to check that finding conflicts grows about linearly with the number of combos when each key is only
+    used by a few combos, checking every pair would take sixteen times as long for four times the combos. Only run
+    when ZMK_BENCHMARK is set, as timings on a loaded machine can't be compared
+    """
+
+    @staticmethod
+    def time_conflicts(keys: int) -> float:
+        feature = ComboFeature()
+        for index, position in enumerate(itertools.islice(itertools.cycle(range(keys - 1)), keys * 3)):
+            feature.add_combo(Combo(f"combo_{index}", [position, position + 1 + index // keys], ESC))
+        return min(timeit.repeat(feature.find_conflicts, number=1, repeat=5))
+
+    @unittest.skipUnless(os.environ.get('ZMK_BENCHMARK'), 'benchmarks only run when ZMK_BENCHMARK is set')
+    def test_scaling(self):
+        small, large = self.time_conflicts(40), self.time_conflicts(160)
+        print(f"\nfind_conflicts 120 combos: {small * 1000:.2f}ms, 480 combos: {large * 1000:.2f}ms")
+        self.assertLess(large, small * 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
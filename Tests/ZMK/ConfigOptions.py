@@ -0,0 +1,96 @@
+"""
+Test the ConfigOptions module and the config options of ZMKConfig, which are kept by name
+"""
+import unittest
+
+from ZMK import ConfigOptions
+from ZMK.Changes import ConfigChange
+from ZMK.Config import ZMKConfig
+
+
+class TestConfigOption(unittest.TestCase):
+    def test_config_property(self):
+        """
+        Test that a config option keeps its name and value.
+        """
+        option = ConfigOptions.BT_MAX_CONN(ZMKConfig(), 3)
+        self.assertEqual(option.get_name(), 'BT_MAX_CONN')
+        self.assertEqual(option.get_config_property()['value'], 3)
+        self.assertEqual(str(option), 'BT_MAX_CONN=3')
+        self.assertEqual(option.build(ZMKConfig()), {'.conf': 'CONFIG_BT_MAX_CONN=3'})
+
+
+class TestConfigOptionRegistry(unittest.TestCase):
+    def setUp(self):
+        self.config = ZMKConfig()
+        self.conn = ConfigOptions.BT_MAX_CONN(self.config, 3)
+        self.paired = ConfigOptions.BT_MAX_PAIRED(self.config, 3)
+
+    def test_add_change_delete(self):
+        """
+        Test that options are kept in the order they were added, replaced in place and deleted by name.
+        """
+        self.config.add_config_option(self.conn)
+        self.config.add_config_option(self.paired)
+        self.assertRaises(ValueError, self.config.add_config_option, ConfigOptions.BT_MAX_CONN(self.config, 4))
+        conn = ConfigOptions.BT_MAX_CONN(self.config, 4)
+        self.config.change_config_option(conn)
+        self.assertEqual(self.config.get_config_options(), [conn, self.paired])
+        self.assertIs(self.config.get_config_option('BT_MAX_CONN'), conn)
+        self.config.del_config_option('BT_MAX_CONN')
+        self.assertEqual(self.config.get_config_options(), [self.paired])
+        self.assertRaises(KeyError, self.config.del_config_option, self.conn)
+        self.assertRaises(KeyError, self.config.change_config_option, self.conn)
+        self.assertRaises(TypeError, self.config.add_config_option, 3)
+
+    def test_targets(self):
+        """
+        Test that each target keeps its own options.
+        """
+        self.config.add_default_config_option(self.conn)
+        self.config.add_config_option(self.conn)
+        self.config.add_split_config_option('central', self.conn)
+        self.assertEqual(self.config.get_default_config_options(), [self.conn])
+        self.assertEqual(self.config.get_split_config_options(), {'central': [self.conn], 'peripheral': []})
+        self.assertIs(self.config.get_config_option('BT_MAX_CONN', 'central'), self.conn)
+        self.assertRaises(KeyError, self.config.get_config_option, 'BT_MAX_CONN', 'peripheral')
+        self.assertRaises(ValueError, self.config.get_config_option, 'BT_MAX_CONN', 'left')
+        self.assertRaises(ValueError, self.config.add_split_config_option, 'left', self.conn)
+
+    def test_update_options(self):
+        """
+        Test that update_options makes every change at once, as one undo and one batch of changes.
+        """
+        self.config.add_config_option(self.conn)
+        received = []
+        self.config.subscribe(received.append)
+        role = ConfigOptions.ZMK_SPLIT_ROLE_CENTRAL(self.config, True)
+        self.config.update_options({'.conf'            : [self.paired],
+                                    'Kconfig.defconfig': [self.conn],
+                                    'central'          : {'ZMK_SPLIT_ROLE_CENTRAL': role}})
+        self.assertEqual(self.config.get_config_options(), [self.conn, self.paired])
+        self.assertEqual(self.config.get_default_config_options(), [self.conn])
+        self.assertEqual(received, [[ConfigChange('config_options'), ConfigChange('default_config_options'),
+                                     ConfigChange('split_config_options', 'central')]])
+        self.config.update_options({'.conf': {'BT_MAX_CONN': None}})
+        self.assertEqual(self.config.get_config_options(), [self.paired])
+        self.config.undo()
+        self.config.undo()
+        self.assertEqual(self.config.get_config_options(), [self.conn])
+        self.assertEqual(self.config.get_split_config_options()['central'], [])
+
+    def test_update_options_checked_first(self):
+        """
+        Test that nothing is changed if one of the changes is invalid.
+        """
+        for mapping in ({'.conf': [self.paired], 'Kconfig.defconfig': {'BT_MAX_CONN': None}},
+                        {'.conf': [self.paired, ConfigOptions.BT_MAX_PAIRED(self.config, 4)]},
+                        {'.conf': [self.paired], 'left': [self.conn]},
+                        {'.conf': {'BT_MAX_CONN': self.paired}}):
+            self.assertRaises((KeyError, ValueError), self.config.update_options, mapping)
+            self.assertEqual(self.config.get_config_options(), [])
+        self.assertFalse(self.config.get_history().can_undo())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
+import os
+import sys
+import timeit
 import unittest
 
-from ZMK.CustomDataStructures import Array
+from ZMK.CustomDataStructures import Array, SparseArray, TypedArray, IncludeSet
 
 
 class TestArray(unittest.TestCase):
@@ -123,5 +126,225 @@ class TestArray(unittest.TestCase):
         self.assertEqual(test_array[1:3], [1, 2])
 
 
+class TestSparseArray(unittest.TestCase):
+    """
+    Testing the sparse array class, it should behave the same as Array
+    """
+
+    def test_insert(self):
+        """
+        Testing that inserting past the end only changes the length
+        """
+        test_array = SparseArray()
+        test_array.insert(0, 0)
+        test_array.insert(3, 3)
+        test_array[6] = 6
+        self.assertEqual(test_array, [0, None, None, 3, None, None, 6])
+        self.assertEqual(len(test_array), 7)
+        self.assertEqual(test_array[-1], 6)
+        self.assertEqual(test_array[2:4], [None, 3])
+        self.assertRaises(IndexError, test_array.__getitem__, 7)
+
+    def test_pop_and_delitem(self):
+        """
+        Testing that the items after a removed item move down
+        """
+        test_array = SparseArray([0, None, 2, 3])
+        del test_array[1]
+        self.assertEqual(test_array, [0, 2, 3])
+        self.assertEqual(test_array.pop(0), 0)
+        self.assertEqual(test_array.pop(), 3)
+        self.assertEqual(test_array, Array([2]))
+
+    def test_delete_slice(self):
+        """
+        Testing that slices are deleted the same as from Array
+        """
+        for key in (slice(1, 4), slice(None, None, 2), slice(-2, None), slice(5, 1, -2), slice(3, 3)):
+            values = [0, None, 2, 3, None, 5, 6]
+            test_array, expected = SparseArray(values), Array(values.copy())
+            del test_array[key]
+            del expected[key]
+            self.assertEqual(test_array, expected)
+            self.assertEqual(len(test_array), len(expected))
+
+    def test_copy(self):
+        """
+        Testing that a copy is independent of the original
+        """
+        test_array = SparseArray([1, None])
+        copy = test_array.copy()
+        copy.append(2)
+        self.assertEqual(test_array, [1, None])
+        self.assertEqual(copy, [1, None, 2])
+
+
+class TestTypedArray(unittest.TestCase):
+    """
+    Testing the typed array class, it should behave the same as Array but pad with the fill value
+    """
+
+    def test_insert(self):
+        """
+        Testing that inserting past the end pads with the fill value
+        """
+        test_array = TypedArray(typecode='H', fill=0xFFFF)
+        test_array.insert(0, 0)
+        test_array[3] = 3
+        self.assertEqual(test_array, [0, 0xFFFF, 0xFFFF, 3])
+        self.assertEqual(test_array[1:], [0xFFFF, 0xFFFF, 3])
+        self.assertEqual(test_array.get_typecode(), 'H')
+
+    def test_invalid(self):
+        """
+        Testing that only integers can be stored
+        """
+        self.assertRaises(ValueError, TypedArray, typecode='f')
+        self.assertRaises(TypeError, TypedArray([1]).append, None)
+        self.assertRaises(TypeError, TypedArray([1]).insert, 3, 'a')
+
+    def test_pop_and_delitem(self):
+        """
+        Testing the pop and __delitem__ methods
+        """
+        test_array = TypedArray([0, 1, 2, 3])
+        del test_array[1]
+        self.assertEqual(test_array.pop(), 3)
+        self.assertEqual(test_array, [0, 2])
+        self.assertEqual(list(test_array.copy()), [0, 2])
+
+
+class TestArrayModesBenchmark(unittest.TestCase):
+    """
+    Benchmark comparing the three arrays when keys are set out of order far past the end, as happens when a keymap is
+    filled from the last position, against padding one None at a time like Array used to
+    """
+
+    size = 200_000
+
+    @staticmethod
+    def pad_one_at_a_time(size: int) -> list:
+        array = []
+        while len(array) <= size:
+            array.append(None)
+        return array
+
+    def time_fill(self, array_class, **kwargs) -> float:
+        def fill():
+            array = array_class(**kwargs)
+            array[self.size - 1] = 1
+            array[self.size // 2] = 1
+            array[0] = 1
+        return min(timeit.repeat(fill, number=1, repeat=5))
+
+    @unittest.skipUnless(os.environ.get('ZMK_BENCHMARK'), 'benchmarks only run when ZMK_BENCHMARK is set')
+    def test_benchmark(self):
+        """
+        Only run when ZMK_BENCHMARK is set, as timings on a loaded machine can't be compared
+        """
+        loop = min(timeit.repeat(lambda: self.pad_one_at_a_time(self.size), number=1, repeat=5))
+        times = {'Array': self.time_fill(Array), 'SparseArray': self.time_fill(SparseArray),
+                 'TypedArray': self.time_fill(TypedArray, typecode='H')}
+        print(f"\npadding to {self.size:,} one at a time: {loop * 1000:.2f}ms, "
+              + ', '.join(f"{name}: {time * 1000:.2f}ms" for name, time in times.items()))
+        self.assertLess(times['Array'], loop)
+        self.assertLess(times['SparseArray'], times['Array'])
+
+    def test_memory(self):
+        """
+        Testing that the sparse and typed arrays only store what they use and don't allocate the list of Array
+        """
+        sparse, typed = SparseArray(), TypedArray(typecode='H')
+        sparse[self.size - 1] = 1
+        typed[self.size - 1] = 1
+        self.assertLess(sys.getsizeof(typed._TypedArray__array), sys.getsizeof([None] * self.size))
+        self.assertEqual(len(sparse._SparseArray__items), 1)
+        self.assertFalse(hasattr(sparse, '_Array__array'))
+        self.assertFalse(hasattr(typed, '_Array__array'))
+
+
+class TestIncludeSet(unittest.TestCase):
+    """
+    Testing the IncludeSet class to check if it works as intended
+    """
+
+    def test_init(self):
+        """
+        Testing the __init__ method merges the iterables in order without duplicates
+        """
+        self.assertEqual(IncludeSet(), [])
+        self.assertEqual(IncludeSet(['a.h', 'b.h'], ['b.h', 'c.h', 'a.h']), ['a.h', 'b.h', 'c.h'])
+
+    def test_add_and_contains(self):
+        """
+        Testing the add and __contains__ methods
+        """
+        test_set = IncludeSet(['a.h'])
+        test_set.add('b.h')
+        test_set.add('a.h')
+        self.assertIn('b.h', test_set)
+        self.assertNotIn('c.h', test_set)
+        self.assertEqual(len(test_set), 2)
+        self.assertEqual(list(test_set), ['a.h', 'b.h'])
+
+    def test_does_not_modify_arguments(self):
+        """
+        Testing that the lists passed into the set are not modified, unlike list_union
+        """
+        list_a = ['a.h']
+        test_set = IncludeSet(list_a, ['b.h'])
+        test_set.add('c.h')
+        self.assertEqual(list_a, ['a.h'])
+        self.assertEqual(test_set.copy(), IncludeSet(['a.h', 'b.h', 'c.h']))
+
+    def test_add_set(self):
+        """
+        Testing that a referenced set is read in the order it was added, without copying it and only once
+        """
+        child = IncludeSet(['b.h', 'a.h'])
+        test_set = IncludeSet(['a.h'])
+        test_set.add_set(child)
+        test_set.add_set(child)
+        test_set.add('c.h')
+        self.assertEqual(list(test_set), ['a.h', 'b.h', 'c.h'])
+        child.add('d.h')
+        self.assertIn('d.h', test_set)
+        self.assertEqual(len(test_set), 4)
+        test_set.add('e.h')
+        self.assertEqual(list(child), ['b.h', 'a.h', 'd.h'])
+        self.assertEqual(test_set.copy(), ['a.h', 'b.h', 'd.h', 'c.h', 'e.h'])
+        self.assertRaises(TypeError, test_set.add_set, ['f.h'])
+
+    def test_flattened_cache(self):
+        """
+        Testing that the flattened headers are kept between reads and cleared when a set further down changes
+        """
+        grandchild = IncludeSet(['a.h'])
+        child = IncludeSet()
+        child.add_set(grandchild)
+        test_set = IncludeSet(['b.h'])
+        test_set.add_set(child)
+        self.assertIn('a.h', test_set)
+        flattened = test_set._IncludeSet__flattened
+        self.assertEqual(len(test_set), 2)
+        self.assertIs(test_set._IncludeSet__flattened, flattened)
+        grandchild.add('c.h')
+        self.assertIsNone(test_set._IncludeSet__flattened)
+        self.assertEqual(list(test_set), ['b.h', 'a.h', 'c.h'])
+        self.assertEqual(list(child), ['a.h', 'c.h'])
+
+    def test_deep_nesting(self):
+        """
+        Testing that a chain of references deeper than the recursion limit is flattened
+        """
+        test_set = IncludeSet(['a.h'])
+        for depth in range(5000):
+            parent = IncludeSet()
+            parent.add_set(test_set)
+            parent.add(f"{depth % 3}.h")
+            test_set = parent
+        self.assertEqual(list(test_set), ['a.h', '0.h', '1.h', '2.h'])
+
+
 if __name__ == '__main__':
     unittest.main()
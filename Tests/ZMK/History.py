@@ -0,0 +1,126 @@
+"""
+Test the History module and the undo and redo of ZMKConfig
+"""
+import tracemalloc
+import unittest
+
+from ZMK import Behaviours, ConfigOptions
+from ZMK.Config import ZMKConfig
+from ZMK.History import ConfigHistory
+from ZMK.KeyCodes import KeyCode
+from ZMK.Transform import MatrixTransform
+
+A = Behaviours.KeyPress(KeyCode('A'))
+B = Behaviours.KeyPress(KeyCode('B'))
+
+
+class TestConfigHistory(unittest.TestCase):
+    def test_undo_redo(self):
+        """
+        Test that undo and redo run the recorded functions and that a new change clears the redo.
+        """
+        values = []
+        history = ConfigHistory()
+        for value in range(3):
+            values.append(value)
+            history.record(f"append {value}", values.pop, lambda value=value: values.append(value))
+        self.assertEqual(history.undo(), 'append 2')
+        self.assertEqual(history.undo(), 'append 1')
+        self.assertEqual(values, [0])
+        self.assertEqual(history.redo(), 'append 1')
+        self.assertEqual(values, [0, 1])
+        self.assertTrue(history.can_redo())
+        values.append(5)
+        history.record('append 5', values.pop, lambda: values.append(5))
+        self.assertFalse(history.can_redo())
+        self.assertRaises(IndexError, history.redo)
+
+    def test_group(self):
+        """
+        Test that the changes of a group are undone together in reverse order.
+        """
+        values = []
+        history = ConfigHistory()
+        with history.group('append twice'):
+            for value in range(2):
+                values.append(value)
+                history.record('append', values.pop, lambda value=value: values.append(value))
+        self.assertEqual(history.get_undo_descriptions(), ['append twice'])
+        history.undo()
+        self.assertEqual(values, [])
+        history.redo()
+        self.assertEqual(values, [0, 1])
+
+    def test_max_depth(self):
+        """
+        Test that the oldest changes are dropped.
+        """
+        history = ConfigHistory(2)
+        for value in range(5):
+            history.record(str(value), lambda: None, lambda: None)
+        self.assertEqual(history.get_undo_descriptions(), ['3', '4'])
+        history.set_max_depth(1)
+        self.assertEqual(history.get_undo_descriptions(), ['4'])
+        self.assertRaises(ValueError, ConfigHistory, 0)
+
+
+class TestZMKConfigUndo(unittest.TestCase):
+    def test_key_bindings(self):
+        """
+        Test undoing and redoing changes to the keymap.
+        """
+        config = ZMKConfig()
+        config.modify_key_binding(2, A)
+        config.modify_key_binding(2, B)
+        config.modify_key_binding_property(2, 'binding', KeyCode('C'))
+        config.clear_key_binding(2)
+        self.assertEqual(config.get_keymap().get_layer(0), [None, None, None])
+        config.undo()
+        self.assertEqual(config.get_keymap().get(0, 2), Behaviours.KeyPress(KeyCode('C')))
+        config.undo()
+        config.undo()
+        self.assertEqual(config.get_keymap().get(0, 2), A)
+        config.undo()
+        self.assertEqual(config.get_keymap().get_layer(0), [])
+        config.redo()
+        self.assertEqual(config.get_keymap().get_layer(0), [None, None, A])
+
+    def test_attributes_and_options(self):
+        """
+        Test undoing the transform, config options and clear_key_data.
+        """
+        config = ZMKConfig()
+        transform = MatrixTransform()
+        config.set_transform(transform)
+        option_a, option_b = ConfigOptions.BT_MAX_CONN(config, 3), ConfigOptions.BT_MAX_PAIRED(config, 3)
+        config.add_config_option(option_a)
+        config.add_config_option(option_b)
+        config.change_config_option(ConfigOptions.BT_MAX_CONN(config, 4))
+        self.assertEqual(config.get_config_option('BT_MAX_CONN').get_config_property()['value'], 4)
+        config.undo()
+        self.assertEqual(config.get_config_options(), [option_a, option_b])
+        config.modify_key_binding(0, A)
+        config.clear_key_data()
+        self.assertIsNot(config.get_transform(), transform)
+        self.assertEqual(config.undo(), 'clear key data')
+        self.assertIs(config.get_transform(), transform)
+        self.assertEqual(config.get_keymap().get(0, 0), A)
+
+    def test_memory_per_change(self):
+        """
+        Test that the memory of a change doesn't depend on the size of the keymap.
+        """
+        config = ZMKConfig()
+        for index in range(2000):
+            config.modify_key_binding(index, A)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for index in range(100):
+            config.modify_key_binding(index, B)
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        self.assertLess(used / 100, 2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Test the ImportKeymap module
+"""
+import os
+import timeit
+import unittest
+
+from ZMK import Behaviours, ImportKeymap
+from ZMK.KeyCodes import KeyCode, FunctionModifier, BluetoothKeyCode, OutputKeyCode
+
+_keys = [Behaviours.KeyPress(KeyCode('A')), Behaviours.KeyPress(FunctionModifier('LC(xx)', KeyCode('B'))),
+         Behaviours.MomentaryLayer(1), Behaviours.LayerTap(2, KeyCode('SPACE')), Behaviours.ToggleLayer(3),
+         Behaviours.Transparent(), Behaviours.NoneBehaviour(), Behaviours.Reset(), Behaviours.BootloaderReset(),
+         Behaviours.Bluetooth(BluetoothKeyCode('BT_SEL(xx)', 1)), Behaviours.OutputSelection(OutputKeyCode('OUT_USB'))]
+
+
+def _keymap_text(layers: int, keys: int) -> str:
+    """builds a keymap file from the build output of the behaviours"""
+    layer_nodes = []
+    for layer in range(layers):
+        bindings = ' '.join(_keys[(layer + key) % len(_keys)].build()['.keymap']['return'] for key in range(keys))
+        layer_nodes.append(f"        layer_{layer} {{\n            bindings = <{bindings}>;\n        }};")
+    layer_nodes = '\n'.join(layer_nodes)
+    return (f"#include <behaviors.dtsi>\n#include <dt-bindings/zmk/keys.h>\n\n/ {{\n    keymap {{\n"
+            f"        compatible = \"zmk,keymap\";\n{layer_nodes}\n    }};\n}};\n")
+
+
+class TestTokenizer(unittest.TestCase):
+    def test_tokens(self):
+        """
+        Test that comments and white space are skipped and the tokens have the right positions.
+        """
+        tokens = list(ImportKeymap.tokenize_keymap('#include <behaviors.dtsi>\n/* a\n comment */ &kp LC(A); // end'))
+        self.assertEqual(tokens[0], ImportKeymap.Token('include', 'behaviors.dtsi', 1, 1))
+        self.assertEqual(tokens[1], ImportKeymap.Token('reference', 'kp', 3, 13))
+        self.assertEqual([token.value for token in tokens[2:]], ['LC', '(', 'A', ')', ';'])
+
+    def test_invalid_character(self):
+        """
+        Test that an unknown character raises a KeymapSyntaxError at its position.
+        """
+        with self.assertRaises(ImportKeymap.KeymapSyntaxError) as context:
+            list(ImportKeymap.tokenize_keymap('/ {\n  $'))
+        self.assertEqual((context.exception.line, context.exception.column), (2, 3))
+
+
+class TestParseKeymap(unittest.TestCase):
+    def test_round_trip(self):
+        """
+        Test that the build output of the behaviours is read back to equal behaviours.
+        """
+        keymap = ImportKeymap.parse_keymap(_keymap_text(2, len(_keys)))
+        self.assertEqual(keymap['include'], ['behaviors.dtsi', 'dt-bindings/zmk/keys.h'])
+        self.assertEqual([layer['name'] for layer in keymap['layers']], ['layer_0', 'layer_1'])
+        self.assertEqual(keymap['layers'][0]['bindings'], _keys)
+
+    def test_defines_and_skipped_nodes(self):
+        """
+        Test that layers can be #defines and that nodes outside the keymap are skipped.
+        """
+        keymap = ImportKeymap.parse_keymap('''
+            #define LOWER 1
+            &lt { tapping-term-ms = <200>; };
+            / {
+                combos { compatible = "zmk,combos"; combo { key-positions = <0 1>; bindings = <&kp ESC>; }; };
+                keymap {
+                    compatible = "zmk,keymap";
+                    base: base_layer { display-name = "Base"; bindings = <&mo LOWER &kp LC(LS(A))>; };
+                };
+            };''')
+        self.assertEqual(keymap['defines'], {'LOWER': 1})
+        self.assertEqual(len(keymap['layers']), 1)
+        self.assertEqual(keymap['layers'][0]['display_name'], 'Base')
+        self.assertEqual(keymap['layers'][0]['bindings'],
+                         [Behaviours.MomentaryLayer(1),
+                          Behaviours.KeyPress(FunctionModifier('LC(xx)', FunctionModifier('LS(xx)', KeyCode('A'))))])
+
+    def test_shared_bindings(self):
+        """
+        Test that equal bindings are the same shared behaviour.
+        """
+        layers = ImportKeymap.parse_keymap(_keymap_text(2, len(_keys)))['layers']
+        self.assertIs(layers[0]['bindings'][0], layers[1]['bindings'][len(_keys) - 1])
+
+    def test_error_locations(self):
+        """
+        Test that errors are raised at the token which caused them.
+        """
+        cases = [
+            ('/ {\n keymap {\n  l { bindings = <&kp FOO>; };\n };\n};', 3, 23, "unknown key code 'FOO'"),
+            ('/ {\n keymap {\n  l { bindings = <&xx 1>; };\n };\n};', 3, 19, "unknown behaviour '&xx'"),
+            ('/ {\n keymap {\n  l { bindings = <&lt 1>; };\n };\n};', 3, 23, "expected a key code for '&lt'"),
+            ('/ {\n keymap {\n  l { bindings = <&mo A>; };\n };\n};', 3, 23, "expected a layer number"),
+            ('/ {\n a = <1>', 2, 8, "expected ';' but found the end of the keymap"),
+        ]
+        for text, line, column, message in cases:
+            with self.subTest(text=text), self.assertRaises(ImportKeymap.KeymapSyntaxError) as context:
+                ImportKeymap.parse_keymap(text)
+            self.assertEqual((context.exception.line, context.exception.column), (line, column))
+            self.assertTrue(context.exception.message.startswith(message), context.exception.message)
+
+    def test_register_behaviour(self):
+        """
+        Test that register_behaviour checks its parameters.
+        """
+        self.assertRaises(TypeError, ImportKeymap.register_behaviour, 1, Behaviours.KeyPress)
+        self.assertRaises(TypeError, ImportKeymap.register_behaviour, 'kp', KeyCode)
+        self.assertRaises(ValueError, ImportKeymap.register_behaviour, 'kp', Behaviours.KeyPress, ('key',))
+
+
+class TestParseKeymapThroughput(unittest.TestCase):
+    """
+    Benchmark of the bindings read per second, and that a keymap ten times larger takes about ten times as long. Only
+    run when ZMK_BENCHMARK is set, as timings on a loaded machine can't be compared
+    """
+
+    @staticmethod
+    def time_parse(text: str) -> float:
+        return min(timeit.repeat(lambda: ImportKeymap.parse_keymap(text), number=1, repeat=5))
+
+    @unittest.skipUnless(os.environ.get('ZMK_BENCHMARK'), 'benchmarks only run when ZMK_BENCHMARK is set')
+    def test_throughput(self):
+        small, large = _keymap_text(10, 100), _keymap_text(100, 100)
+        small_time, large_time = self.time_parse(small), self.time_parse(large)
+        print(f"\nparse_keymap 1,000 bindings: {small_time * 1000:.2f}ms, 10,000 bindings: {large_time * 1000:.2f}ms "
+              f"({10_000 / large_time:,.0f} bindings/s)")
+        self.assertLess(large_time, small_time * 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
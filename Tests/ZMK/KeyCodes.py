@@ -32,6 +32,21 @@ class TestKeyCodesJSON(unittest.TestCase):
         """
         self.assertIn('A', KeyCodes.KeyCodesJSON())
 
+    def test_contexts(self):
+        """
+        Test the context index of the KeyCodesJSON class.
+        """
+        key_codes = KeyCodes.KeyCodesJSON()
+        self.assertIn('Keyboard', key_codes.get_contexts())
+        self.assertIn(None, key_codes.get_contexts())
+        self.assertIn('A', key_codes.get_context_codes('Keyboard'))
+        self.assertRaises(KeyError, key_codes.get_context_codes, 'invalid context')
+        for context, count in key_codes.get_context_counts().items():
+            self.assertEqual(len(key_codes.get_context_codes(context)), count)
+            for key in key_codes.get_context_codes(context):
+                self.assertEqual(key_codes[key]['context'], context)
+        self.assertEqual(sum(key_codes.get_context_counts().values()), len(list(key_codes)))
+
 
 class TestFunctionModifiersJSON(unittest.TestCase):
     """
@@ -59,6 +74,41 @@ class TestFunctionModifiersJSON(unittest.TestCase):
         self.assertIn('LC(xx)', KeyCodes.FunctionModifiersJSON())
 
 
+class TestHIDUsageTable(unittest.TestCase):
+    """
+    Test the class HIDUsageTable
+    """
+
+    def test_every_key_code_has_a_usage(self):
+        """
+        Test that every keycode in keycodes.json has a usage and that the usage maps back to it.
+        """
+        usage_table = KeyCodes.HIDUsageTable()
+        self.assertEqual(len(usage_table), len(list(KeyCodes.KeyCodesJSON())))
+        for key in KeyCodes.KeyCodesJSON():
+            page, usage_id = usage_table.get_usage(key)
+            self.assertIn(key, usage_table.get_names(page, usage_id, usage_table.get_implicit_modifiers(key)))
+
+    def test_lookup(self):
+        """
+        Test the forward and reverse lookups.
+        """
+        usage_table = KeyCodes.HIDUsageTable()
+        self.assertEqual(usage_table.get_usage('A'), (0x07, 0x04))
+        self.assertEqual(usage_table.get_usage('C_PP'), (0x0C, 0xCD))
+        self.assertEqual(usage_table.get_names(0x07, 0x1E), ('NUMBER_1', 'N1'))
+        self.assertEqual(usage_table.get_canonical_name(0x07, 0x1E, 0x02), 'EXCLAMATION')
+        self.assertRaises(KeyError, usage_table.get_usage, 'invalid name')
+        self.assertRaises(KeyError, usage_table.get_names, 0xFF, 0xFF)
+
+    def test_key_codes_from_usages(self):
+        """
+        Test the bulk conversion of usages into KeyCode objects.
+        """
+        key_codes = KeyCodes.HIDUsageTable().key_codes_from_usages([(0x07, 0x04), 0x0207001E])
+        self.assertEqual([key_code.get_name() for key_code in key_codes], ['A', 'EXCLAMATION'])
+
+
 class TestKeyCode(unittest.TestCase):
     """
     Test the class KeyCode
@@ -130,6 +180,61 @@ class TestFunctionModifier(unittest.TestCase):
         }
         self.assertIsInstance(KeyCodes.FunctionModifier('LC(xx)', KeyCodes.KeyCode('A')).build(), dict)
         self.assertEqual(KeyCodes.FunctionModifier('LC(xx)', KeyCodes.KeyCode('A')).build(), build_output)
+        nested = KeyCodes.FunctionModifier('LC(xx)', KeyCodes.FunctionModifier('LS(xx)', KeyCodes.KeyCode('A')))
+        self.assertEqual(nested.build()['.keymap']['include'], ['dt-bindings/zmk/keys.h'])
+
+
+class TestBuildCache(unittest.TestCase):
+    """
+    Test the cache which is used by the build methods of the codes
+    """
+
+    def setUp(self):
+        KeyCodes.clear_build_cache()
+
+    def test_equal_codes_share_build(self):
+        """
+        Test that two codes with the same value are built once and return equal build outputs.
+        """
+        self.assertEqual(KeyCodes.KeyCode('A').build(), KeyCodes.KeyCode('A').build())
+        self.assertEqual(len(KeyCodes._build_cache), 1)
+        chain_a = KeyCodes.FunctionModifier('LC(xx)', KeyCodes.FunctionModifier('LS(xx)', KeyCodes.KeyCode('A')))
+        chain_b = KeyCodes.FunctionModifier('LC(xx)', KeyCodes.FunctionModifier('LS(xx)', KeyCodes.KeyCode('A')))
+        self.assertEqual(chain_a.build(), chain_b.build())
+        self.assertEqual(len(KeyCodes._build_cache), 3)
+        self.assertNotEqual(KeyCodes.KeyCode('A').build(), KeyCodes.KeyCode('B').build())
+
+    def test_modified_build(self):
+        """
+        Test that modifying a returned build output doesn't change the next build of the code.
+        """
+        build = KeyCodes.KeyCode('A').build()
+        build['.keymap']['include'].add('dt-bindings/zmk/bt.h')
+        build['.keymap']['include'].update(['dt-bindings/zmk/outputs.h'])
+        build['.keymap']['return'] = 'B'
+        self.assertEqual(KeyCodes.KeyCode('A').build(), {
+            '.keymap': {
+                'include': ['dt-bindings/zmk/keys.h'],
+                'return' : 'A'
+            }
+        })
+
+    def test_set_binding_invalidates(self):
+        """
+        Test that changing the binding of a code, or of a code nested in it, changes the build output.
+        """
+        inner = KeyCodes.FunctionModifier('LS(xx)', KeyCodes.KeyCode('A'))
+        outer = KeyCodes.FunctionModifier('LC(xx)', inner)
+        self.assertEqual(outer.build()['.keymap']['return'], 'LC(LS(A))')
+        inner.set_binding(KeyCodes.KeyCode('B'))
+        self.assertEqual(outer.build()['.keymap']['return'], 'LC(LS(B))')
+        outer.set_binding(KeyCodes.KeyCode('C'))
+        self.assertEqual(outer.build()['.keymap']['return'], 'LC(C)')
+
+        bluetooth = KeyCodes.BluetoothKeyCode('BT_SEL(xx)', 1)
+        self.assertEqual(bluetooth.build()['.keymap']['return'], 'BT_SEL 1')
+        bluetooth.set_binding(2)
+        self.assertEqual(bluetooth.build()['.keymap']['return'], 'BT_SEL 2')
 
 
 class TestBluetoothKeyCode_without_parameter(unittest.TestCase):
@@ -226,6 +331,56 @@ class TestBluetoothKeyCode_with_parameter(unittest.TestCase):
         self.assertEqual(KeyCodes.BluetoothKeyCode('BT_SEL(xx)', 1).build(), build_output)
 
 
+class TestValidateMany(unittest.TestCase):
+    """
+    Test the validate_many method of the codes with a binding
+    """
+
+    def test_valid(self):
+        """
+        Test that valid bindings raise no error.
+        """
+        KeyCodes.BluetoothKeyCode.validate_many([('BT_SEL(xx)', 0), ('BT_CLR', None), ('BT_SEL(xx)', 4)])
+        KeyCodes.FunctionModifier.validate_many([('LC(xx)', KeyCodes.KeyCode('A'))])
+
+    def test_invalid(self):
+        """
+        Test that the position of an invalid binding is in the error.
+        """
+        with self.assertRaisesRegex(ValueError, 'position 1'):
+            KeyCodes.BluetoothKeyCode.validate_many([('BT_SEL(xx)', 0), ('BT_SEL(xx)', -1)])
+        with self.assertRaisesRegex(TypeError, 'position 0'):
+            KeyCodes.FunctionModifier.validate_many([('LC(xx)', 'A')])
+
+    def test_get_binding(self):
+        """
+        Test that get_binding returns the schema with the current value.
+        """
+        binding = KeyCodes.BluetoothKeyCode('BT_SEL(xx)', 2).get_binding()
+        self.assertEqual(binding['current_value'], 2)
+        self.assertEqual(binding['data_types'], [int, type(None)])
+
+
+class TestKeyCodeEquality(unittest.TestCase):
+    """
+    Test value equality and hashing of key codes
+    """
+
+    def test_equal_values(self):
+        """
+        Test that codes with equal values are equal and hash the same.
+        """
+        self.assertEqual(KeyCodes.KeyCode('A'), KeyCodes.KeyCode('A'))
+        self.assertNotEqual(KeyCodes.KeyCode('A'), KeyCodes.KeyCode('B'))
+        control_a = KeyCodes.FunctionModifier('LC(xx)', KeyCodes.KeyCode('A'))
+        self.assertEqual(control_a, KeyCodes.FunctionModifier('LC(xx)', KeyCodes.KeyCode('A')))
+        self.assertRaises(TypeError, hash, control_a)
+        self.assertEqual(hash(control_a._frozen_copy()),
+                         hash(KeyCodes.FunctionModifier('LC(xx)', KeyCodes.KeyCode('A'))._frozen_copy()))
+        self.assertNotEqual(control_a, KeyCodes.FunctionModifier('LC(xx)', KeyCodes.KeyCode('B')))
+        self.assertEqual(len({KeyCodes.KeyCode('A'), KeyCodes.KeyCode('A'), KeyCodes.KeyCode('B')}), 2)
+
+
 class TestOutputKeyCode(unittest.TestCase):
     """
     Test the class OutputKeyCode
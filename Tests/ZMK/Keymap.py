@@ -0,0 +1,200 @@
+"""
+Test the Keymap module
+"""
+import json
+import unittest
+
+from ZMK import Behaviours
+from ZMK.ExportConfig import ZMKJSONEncoder
+from ZMK.Keymap import LayeredKeymap
+from ZMK.KeyCodes import KeyCode
+
+A = Behaviours.KeyPress(KeyCode('A'))
+B = Behaviours.KeyPress(KeyCode('B'))
+TRANS = Behaviours.Transparent()
+
+
+class TestLayeredKeymap(unittest.TestCase):
+    def test_init_invalid(self):
+        """
+        Test the __init__ method with invalid parameters.
+        """
+        self.assertRaises(TypeError, LayeredKeymap, '1')
+        self.assertRaises(ValueError, LayeredKeymap, -1)
+        self.assertRaises(ValueError, LayeredKeymap, 1, -1)
+
+    def test_get_and_set(self):
+        """
+        Test that equal behaviours are stored once and unused ones are removed from the table.
+        """
+        keymap = LayeredKeymap(3, 2)
+        self.assertEqual(keymap.get_layers(), [[None] * 3, [None] * 3])
+        keymap.set(0, 0, A)
+        keymap.set(1, 2, Behaviours.KeyPress(KeyCode('A')))
+        self.assertEqual(keymap.get(1, 2), A)
+        self.assertEqual(keymap.get_behaviours(), [A])
+        self.assertEqual(keymap.get_layer_ids(0)[0], keymap.get_layer_ids(1)[2])
+        keymap.set(0, 0, B)
+        keymap.set(1, 2, None)
+        self.assertEqual(keymap.get_behaviours(), [B])
+        self.assertRaises(IndexError, keymap.set, 2, 0, A)
+        self.assertRaises(IndexError, keymap.set, 0, 3, A)
+        self.assertRaises(TypeError, keymap.set, 0, 0, KeyCode('A'))
+
+    def test_set_keeps_argument(self):
+        """
+        Test that the behaviour given to set can still be modified and doesn't change the keymap when it is.
+        """
+        keymap = LayeredKeymap(1)
+        key_press = Behaviours.KeyPress(KeyCode('C'))
+        keymap.set(0, 0, key_press)
+        key_press.set_config_property('binding', KeyCode('D'))
+        self.assertEqual(keymap.get(0, 0), Behaviours.KeyPress(KeyCode('C')))
+
+    def test_layers(self):
+        """
+        Test copying, inserting, deleting and moving layers.
+        """
+        keymap = LayeredKeymap.from_layers([[A, B], [None, A]])
+        self.assertEqual(keymap.copy_layer(0), 2)
+        self.assertEqual(keymap.add_layer(0), 0)
+        self.assertEqual(keymap.get_layers(), [[None, None], [A, B], [None, A], [A, B]])
+        keymap.move_layer(3, 0)
+        self.assertEqual(keymap.get_layers(), [[A, B], [None, None], [A, B], [None, A]])
+        keymap.del_layer(0)
+        keymap.del_layer(1)
+        self.assertEqual(keymap.get_layers(), [[None, None], [None, A]])
+        self.assertEqual(keymap.get_behaviours(), [A])
+        self.assertEqual(len(keymap), 2)
+
+    def test_position_count(self):
+        """
+        Test that changing the number of positions pads or removes positions of every layer.
+        """
+        keymap = LayeredKeymap.from_layers([[A], [A, B]])
+        self.assertEqual(keymap.get_layers(), [[A, None], [A, B]])
+        keymap.set_position_count(1)
+        self.assertEqual(keymap.get_layers(), [[A], [A]])
+        self.assertEqual(keymap.get_behaviours(), [A])
+        keymap.set_position_count(3)
+        self.assertEqual(keymap.get_layers(), [[A, None, None], [A, None, None]])
+
+    def test_equal(self):
+        """
+        Test that keymaps with the same behaviours are equal whatever the ids are.
+        """
+        keymap = LayeredKeymap(2)
+        keymap.set(0, 1, B)
+        keymap.set(0, 0, A)
+        self.assertEqual(keymap, LayeredKeymap.from_layers([[A, B]]))
+        self.assertNotEqual(keymap, LayeredKeymap.from_layers([[A, A]]))
+
+    def test_memory(self):
+        """
+        Test that a layer takes two bytes per position.
+        """
+        keymap = LayeredKeymap(100, 20)
+        for layer in range(20):
+            for position in range(100):
+                keymap.set(layer, position, Behaviours.KeyPress(KeyCode('A' if position % 2 else 'B')))
+        self.assertEqual(keymap.get_layer_ids(0).itemsize * len(keymap.get_layer_ids(0)), 200)
+        self.assertEqual(len(keymap.get_behaviours()), 2)
+
+
+class TestDeltaLayers(unittest.TestCase):
+    @staticmethod
+    def layers(count: int, positions: int) -> list:
+        """a base layer of key presses and layers which are Transparent apart from a few positions"""
+        base = [Behaviours.KeyPress(KeyCode('A' if position % 2 else 'B')) for position in range(positions)]
+        layers = [base]
+        for layer in range(1, count):
+            layers.append([A if position % 20 == layer % 20 else TRANS for position in range(positions)])
+        return layers
+
+    def test_same_behaviours(self):
+        """
+        Test that a delta encoded keymap has the same behaviours as a dense one.
+        """
+        layers = self.layers(4, 40)
+        dense, delta = LayeredKeymap.from_layers(layers), LayeredKeymap.from_layers(layers, delta=True)
+        self.assertTrue(delta.is_delta())
+        self.assertEqual(delta.get_layers(), layers)
+        self.assertEqual(delta, dense)
+        delta.set(1, 1, B)
+        delta.set(1, 1, TRANS)
+        delta.set(2, 3, None)
+        self.assertIsNone(delta.get(2, 3))
+        self.assertEqual(delta.get(2, 4), TRANS)
+        self.assertEqual(delta.add_layer(), 4)
+        self.assertEqual(delta.get_layer(4), [TRANS] * 40)
+        delta.set_delta(False)
+        dense.set(1, 1, TRANS)
+        dense.set(2, 3, None)
+        dense.add_layer()
+        for position in range(40):
+            dense.set(4, position, TRANS)
+        self.assertEqual(delta, dense)
+
+    def test_unused_behaviours_removed(self):
+        """
+        Test that the counts of the behaviours stay right through the delta layers.
+        """
+        keymap = LayeredKeymap.from_layers(self.layers(3, 40), delta=True)
+        keymap.set_position_count(10)
+        keymap.copy_layer(1)
+        keymap.del_layer(1)
+        keymap.del_layer(0)
+        self.assertEqual(keymap.get_behaviours(), [TRANS, A])
+        keymap.set_delta(False)
+        keymap.del_layer(0)
+        keymap.del_layer(0)
+        self.assertEqual(keymap.get_behaviours(), [])
+
+    def test_grow(self):
+        """
+        Test that the positions added to a delta encoded keymap are empty, the same as for a dense keymap.
+        """
+        layers = self.layers(3, 40)
+        dense, delta = LayeredKeymap.from_layers(layers), LayeredKeymap.from_layers(layers, delta=True)
+        for keymap in (dense, delta):
+            keymap.set_position_count(20)
+            keymap.set_position_count(45)
+        self.assertEqual(delta.get_layer(1)[40:], [None] * 5)
+        self.assertEqual(delta.get_layer(1)[:20], layers[1][:20])
+        self.assertEqual(delta, dense)
+        for keymap in (dense, delta):
+            keymap.set(2, 42, TRANS)
+            keymap.set(2, 43, A)
+        self.assertEqual(delta.get(2, 42), TRANS)
+        self.assertEqual(delta, dense)
+
+    def test_empty_positions_not_stored(self):
+        """
+        Test that the empty layers of a new delta keymap and the positions it grows by aren't stored.
+        """
+        keymap = LayeredKeymap(100, 4, delta=True)
+        self.assertEqual(keymap.get_storage_size(), 200)
+        self.assertEqual(keymap.get_layer(3), [None] * 100)
+        keymap.set(2, 10, TRANS)
+        keymap.set(2, 11, A)
+        keymap.set_position_count(150)
+        self.assertEqual(keymap.get_storage_size(), 300 + 8)
+        self.assertEqual(keymap.get(2, 10), TRANS)
+        self.assertEqual(keymap.get(2, 120), None)
+        keymap.set(2, 10, None)
+        keymap.del_layer(2)
+        self.assertEqual(keymap.get_behaviours(), [TRANS])
+
+    def test_size(self):
+        """
+        Test that the storage and the save file of a 32 layer keymap shrink.
+        """
+        layers = self.layers(32, 100)
+        dense, delta = LayeredKeymap.from_layers(layers), LayeredKeymap.from_layers(layers, delta=True)
+        dense_json, delta_json = json.dumps(dense, cls=ZMKJSONEncoder), json.dumps(delta, cls=ZMKJSONEncoder)
+        self.assertLess(delta.get_storage_size() * 5, dense.get_storage_size())
+        self.assertLess(len(delta_json) * 5, len(dense_json))
+
+
+if __name__ == '__main__':
+    unittest.main()
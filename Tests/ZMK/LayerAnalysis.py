@@ -0,0 +1,74 @@
+"""
+Test the LayerAnalysis module
+"""
+import unittest
+
+from ZMK import Behaviours
+from ZMK.KeyCodes import KeyCode
+from ZMK.LayerAnalysis import LayerGraph
+
+A = Behaviours.KeyPress(KeyCode('A'))
+TRANS = Behaviours.Transparent()
+
+
+class TestLayerGraph(unittest.TestCase):
+    def test_init_invalid(self):
+        """
+        Test that invalid keymaps raise errors.
+        """
+        self.assertRaises(TypeError, LayerGraph, (A,))
+        self.assertRaises(TypeError, LayerGraph, [[A, 'A']])
+        self.assertRaises(ValueError, LayerGraph, [[A]], 1)
+
+    def test_reachable_and_dead(self):
+        """
+        Test that layers only reached from a dead layer are dead as well.
+        """
+        graph = LayerGraph([[Behaviours.MomentaryLayer(1), A], [A, A], [Behaviours.LayerTap(3, KeyCode('A')), A],
+                            [A, A]])
+        self.assertEqual(graph.get_reachable_layers(), {0, 1})
+        self.assertEqual(graph.get_dead_layers(), (2, 3))
+        self.assertEqual(graph.get_trapped_layers(), ())
+
+    def test_toggle_trap(self):
+        """
+        Test that a toggled layer without a way to toggle it off is trapped, unless it is transparent at the toggle.
+        """
+        graph = LayerGraph([[Behaviours.ToggleLayer(1), A], [A, A]])
+        self.assertEqual(graph.get_trapped_layers(), (1,))
+        graph.set_binding(1, 0, TRANS)
+        self.assertEqual(graph.get_trapped_layers(), ())
+        graph.set_binding(1, 0, A)
+        graph.set_binding(1, 1, Behaviours.ToggleLayer(1))
+        self.assertEqual(graph.get_trapped_layers(), ())
+        self.assertEqual(graph.get_warnings(), [])
+
+    def test_missing(self):
+        """
+        Test that a binding to a layer which doesn't exist is reported.
+        """
+        graph = LayerGraph([[Behaviours.MomentaryLayer(4)]])
+        self.assertEqual(graph.get_missing_layers(), (4,))
+        self.assertEqual(graph.get_warnings(), ["layer 4 is used by a binding but the keymap has 1 layers"])
+
+    def test_set_binding(self):
+        """
+        Test that set_binding updates the graph and keeps the cache when the layers are not affected.
+        """
+        graph = LayerGraph([[A, A], [A, A]])
+        self.assertEqual(graph.get_dead_layers(), (1,))
+        reachable = graph.get_reachable_layers()
+        graph.set_binding(0, 1, Behaviours.KeyPress(KeyCode('B')))
+        self.assertIs(graph.get_reachable_layers(), reachable)
+        graph.set_binding(0, 0, Behaviours.MomentaryLayer(1))
+        self.assertEqual(graph.get_edges(0), {('hold', 1): 1})
+        self.assertEqual(graph.get_dead_layers(), ())
+        graph.set_binding(0, 0, None)
+        self.assertEqual(graph.get_edges(0), {})
+        self.assertEqual(graph.get_dead_layers(), (1,))
+        self.assertRaises(IndexError, graph.set_binding, 2, 0, A)
+        self.assertRaises(TypeError, graph.set_binding, 0, 0, 'A')
+
+
+if __name__ == '__main__':
+    unittest.main()
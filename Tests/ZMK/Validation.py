@@ -0,0 +1,207 @@
+"""
+Test the Validation module and ZMKConfig.check_config
+"""
+import os
+import tempfile
+import timeit
+import unittest
+
+from ZMK import Behaviours, ConfigOptions, Drivers, MCUs
+from ZMK.Config import ZMKConfig
+from ZMK.KeyCodes import KeyCode
+from ZMK.Keymap import LayeredKeymap
+from ZMK.Validation import AbstractRule, BindingRule, ConfigValidator, get_rules, register_rule
+
+A = Behaviours.KeyPress(KeyCode('A'))
+B = Behaviours.KeyPress(KeyCode('B'))
+
+
+class _Option(ConfigOptions.AbstractConfigOption):
+    # noinspection PyMissingConstructor
+    def __init__(self, valid: bool):
+        self._config_option = {'name': 'TEST_OPTION', 'types': [bool], 'value': valid}
+        self.valid = valid
+
+    def check_config_property(self, zmk_config, value=None) -> bool:
+        return self.valid
+
+    def build(self, zmk_config) -> dict:
+        return {}
+
+    def __str__(self):
+        return 'TEST_OPTION'
+
+
+def make_config(working_directory: str, keys: int = 4, layers: int = 1) -> ZMKConfig:
+    config = ZMKConfig()
+    config.set_config_name('Test Board')
+    config.set_config_id('test_board')
+    config.set_shield_directory('test_board')
+    config.set_working_directory(working_directory)
+    config.set_mcu(MCUs.NiceNanoV2())
+    for key in range(keys):
+        config.get_transform().add_key(key // 20, key % 20)
+    behaviours = [A, B, Behaviours.Transparent()]
+    base = [behaviours[key % 2] for key in range(keys)]
+    # the last positions of the base layer hold the other layers
+    for layer in range(1, layers):
+        base[-layer] = Behaviours.MomentaryLayer(layer)
+    config.set_keymap(LayeredKeymap.from_layers(
+        [base] + [[behaviours[(layer + key) % 3] for key in range(keys)] for layer in range(1, layers)]))
+    return config
+
+
+class TestValidation(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config = make_config(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_valid_config(self):
+        """
+        Test that a complete config has no problems.
+        """
+        self.assertEqual(self.config.get_config_problems(), [])
+        self.assertTrue(self.config.check_config())
+
+    def test_empty_config(self):
+        """
+        Test that an empty config reports the missing values.
+        """
+        problems = ZMKConfig().get_config_problems()
+        self.assertIn("the config id is not set", problems)
+        self.assertIn("the mcu is not set", problems)
+
+    def test_problems(self):
+        """
+        Test that the rules find an invalid keymap, transform and config option.
+        """
+        self.config.get_transform().add_key(0, 1)
+        self.config.modify_key_binding(0, Behaviours.MomentaryLayer(3))
+        self.config.add_config_option(_Option(False))
+        problems = self.config.get_config_problems()
+        self.assertIn("keys 1 and 4 of the transform are both at row 0 column 1", problems)
+        self.assertIn("the keymap has 4 positions but the transform has 5 keys", problems)
+        self.assertIn("layer 3 is used by a binding but the keymap has 1 layers", problems)
+        self.assertIn("the config option TEST_OPTION has an invalid value", problems)
+        self.assertFalse(self.config.check_config())
+
+    def test_only_affected_rules(self):
+        """
+        Test that only the rules reading a changed component are run again.
+        """
+        validator = ConfigValidator(self.config)
+        validator.validate()
+        self.assertEqual(validator.get_last_run(), list(get_rules()))
+        validator.validate()
+        self.assertEqual(validator.get_last_run(), [])
+        self.config.modify_key_binding(2, B)
+        validator.validate()
+        self.assertEqual(validator.get_last_run(), ['KeymapSizeRule', 'BindingRule', 'LayerRule'])
+        self.config.set_config_name('Other Board')
+        validator.validate()
+        self.assertEqual(validator.get_last_run(), ['RequiredValuesRule'])
+
+    def test_in_place_changes(self):
+        """
+        Test that setting an option, a property of the driver or a setting of the mcu in place runs their rules again.
+        """
+        class Driver(Drivers.AbstractDriver):
+            def __init__(self):
+                super().__init__()
+                self.get_properties().append({'name': 'diode-direction', 'types': [str], 'value': 'col2row'})
+
+            def check_property(self, zmk_config, property_name, value=None) -> bool:
+                return True
+
+            def build(self, zmk_config) -> dict:
+                return {}
+
+            def export(self) -> dict:
+                return {}
+
+            def __str__(self):
+                return 'Driver'
+
+        option = ConfigOptions.BT_MAX_CONN(self.config, 3)
+        self.config.add_config_option(option)
+        self.config.set_driver(Driver())
+        validator = ConfigValidator(self.config)
+        validator.validate()
+        option.set_config_property(self.config, 4)
+        validator.validate()
+        self.assertEqual(validator.get_last_run(), ['ConfigOptionRule'])
+        self.config.get_driver().set_property(self.config, 'diode-direction', 'row2col')
+        validator.validate()
+        self.assertEqual(validator.get_last_run(), ['McuRule'])
+        self.config.get_mcu()._changed('interconnect')
+        validator.validate()
+        self.assertEqual(validator.get_last_run(), ['McuRule'])
+
+    def test_binding_cache(self):
+        """
+        Test that the binding rule forgets the behaviours which are no longer in the keymap.
+        """
+        config = make_config(self.directory.name, 8, 3)
+        rule = BindingRule()
+        rule.check(config, None)
+        self.assertEqual(len(rule._BindingRule__built), 5)
+        config.get_keymap().del_layer(2)
+        config.get_keymap().del_layer(1)
+        rule.check(config, {'keymap': frozenset({None})})
+        self.assertEqual(set(rule._BindingRule__built), set(config.get_keymap().get_behaviours()))
+
+    def test_incremental_layers(self):
+        """
+        Test that the layer rule follows single edits the same as a full check.
+        """
+        config = make_config(self.directory.name, 8, 3)
+        self.assertEqual(config.get_config_problems(), [])
+        config.modify_key_binding(6, A)
+        problems = config.get_config_problems()
+        self.assertEqual(problems, ConfigValidator(config).validate())
+        self.assertEqual(problems, ["layer 2 can't be reached from the default layer 0"])
+        config.undo()
+        self.assertEqual(config.get_config_problems(), [])
+
+    def test_register_rule(self):
+        """
+        Test that a rule needs components and is given to validators created afterwards.
+        """
+        class NoComponents(AbstractRule):
+            def check(self, zmk_config, changes):
+                return []
+
+        self.assertRaises(ValueError, register_rule, NoComponents)
+        self.assertRaises(TypeError, register_rule, object)
+
+
+class TestValidationSpeed(unittest.TestCase):
+    """
+    Benchmark of a full validation and of the validation after a single key is edited, for a 1000 key, 32 layer config.
+    Only run when ZMK_BENCHMARK is set, as timings on a loaded machine can't be compared
+    """
+
+    @unittest.skipUnless(os.environ.get('ZMK_BENCHMARK'), 'benchmarks only run when ZMK_BENCHMARK is set')
+    def test_speed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = make_config(directory, 1000, 32)
+            full = min(timeit.repeat(lambda: ConfigValidator(config).validate(), number=1, repeat=5))
+            validator = ConfigValidator(config)
+            validator.validate()
+            keys = iter(range(1000))
+
+            def edit():
+                config.modify_key_binding(next(keys), B, layer=5)
+                validator.validate()
+
+            incremental = min(timeit.repeat(edit, number=1, repeat=20))
+        print(f"\n1000 key 32 layer validation full: {full * 1000:.2f}ms, after editing a key: "
+              f"{incremental * 1000:.3f}ms")
+        self.assertLess(incremental, full)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,74 +4,220 @@ Module for ZMK containing implementing Behaviours
 from __future__ import annotations
 
 __all__ = ['AbstractBehaviour', 'KeyPress', 'MomentaryLayer', 'LayerTap', 'ToggleLayer', 'Transparent', 'NoneBehaviour',
-           'Reset', 'BootloaderReset', 'Bluetooth', 'OutputSelection']
+           'Reset', 'BootloaderReset', 'Bluetooth', 'OutputSelection', 'share_behaviour']
 
 import typing
 import abc
+import weakref
 
 if typing.TYPE_CHECKING:
     from .KeyCodes import KeyCode, FunctionModifier, BluetoothKeyCode, OutputKeyCode
-    from ListUnion import list_union
 
-from .KeyCodes import KeyCode, FunctionModifier, BluetoothKeyCode, OutputKeyCode
-from ListUnion import list_union
+from .KeyCodes import AbstractCode, KeyCode, FunctionModifier, BluetoothKeyCode, OutputKeyCode
+from .CustomDataStructures import IncludeSet
+from .ExportConfig import export_value
+
+
+def _compile_validator(property_dict: dict):
+    """
+    Function turns a property of a behaviour's schema into a function which raises a TypeError or ValueError if a value
+    is not valid for the property. This is done once per class, the data types are put in a frozenset so that checking
+    them is O(1) and a property without 'data_validation' gets a function which skips that check entirely.
+
+    @param property_dict: dictionary of the schema, refer to AbstractBehaviour for its structure
+    """
+    property_name = property_dict['property_name']
+    data_types = property_dict['data_types']
+    type_set = frozenset(data_types)
+    data_validation = property_dict.get('data_validation')
+
+    if data_validation is None:
+        def validator(value):
+            if type(value) not in type_set:
+                raise TypeError(f"property '{property_name}' not in {data_types} so its not a valid datatype")
+        return validator
+
+    def validator(value):
+        if type(value) not in type_set:
+            raise TypeError(f"property '{property_name}' not in {data_types} so its not a valid datatype")
+        if not data_validation(value):
+            raise ValueError(f"property '{property_name}' didn't pass data validation of {data_validation}")
+    return validator
+
+
+_singletons: dict = {}
+"""class -> the only instance of a behaviour class without properties"""
+
+_shared_behaviours = weakref.WeakValueDictionary()
+"""value key -> shared behaviour, a behaviour is removed once no keymap position uses it anymore"""
+
+
+def share_behaviour(behaviour: AbstractBehaviour) -> AbstractBehaviour:
+    """
+    Function returns the shared instance of a behaviour with the same class and property values, if there is none
+    then a frozen copy of the behaviour becomes the shared instance. This way a keymap which has KeyPress(KeyCode('A'))
+    on every layer only stores one object for it. The shared behaviour can't be modified, use copy() to get one that
+    can. The parameter itself is never changed, so the caller can keep modifying it.
+
+    @param behaviour: behaviour to share
+    @return: the shared behaviour which is equal to the parameter
+    """
+    if not isinstance(behaviour, AbstractBehaviour):
+        raise TypeError(f"parameter 'behaviour' of type {type(behaviour)} is not a Behaviour")
+    key = behaviour._value_key()
+    shared = _shared_behaviours.get(key)
+    if shared is None:
+        shared = _shared_behaviours[key] = behaviour._frozen_copy()
+    return shared
 
 
 class AbstractBehaviour:
     """
     Class Behaviour is an abstract class allowing for a specific behaviour and its properties to be implemented
+
+    The properties of a behaviour are described once per class in `_schema`, which is a tuple of dictionaries of this
+    structure:
+    ```python
+    {'property_name': name,
+     'data_types': [list of valid data types],
+     'data_validation': lambda expression}
+    ```
+    the `'data_validation'` key is optional but is used when validation is required. `_schema_index` maps the name of
+    each property to its position in `_schema` and `_validators` holds the compiled validator of each property, both
+    are created for every child class by `__init_subclass__`.
+
+    The instances only store the current values of the properties in `_values`, and as `__slots__` is used they don't
+    have a `__dict__` either, which keeps the memory of a keymap with a lot of behaviours down.
+
+    Behaviours without properties, such as Transparent, only ever have one instance. Behaviours with properties can be
+    shared between keymap positions with share_behaviour, once shared `_shared` is True and the behaviour can no longer
+    be modified, a position is edited by modifying a copy() of it.
     """
+    __slots__ = ('_values', '_shared', '_hash', '__weakref__')
+
+    _schema: tuple = ()
+    _schema_index: dict = {}
+    _validators: tuple = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._schema_index = {property_dict['property_name']: index for index, property_dict in enumerate(cls._schema)}
+        cls._validators = tuple(_compile_validator(property_dict) for property_dict in cls._schema)
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Behaviours without properties are all the same so the same instance is returned every time
+        """
+        if cls._schema:
+            return super().__new__(cls)
+        if cls not in _singletons:
+            _singletons[cls] = super().__new__(cls)
+        return _singletons[cls]
 
     @abc.abstractmethod
     def __init__(self):
         """
         Constructor for the class Behaviour  
-        the `self._properties attribute` is a list of dictionaries containing the properties of the behaviour.  
-        each element in the list _properties will be of this structure:
-        ```python
-        {'property_name': name,
-         'data_types': [list of valid data types],
-         'current_value': value,
-         'data_validation': lambda expression}
-        ```
-        the `'data_validation'` key is optional but is used when validation is required because on the creation of
-        the object, the data type of property is set, so that error checking can be carried out.
-        """
-        self._properties: list = []
+        the `self._values` attribute is a list of the current values of the properties, in the same order as
+        `_schema`. The values start as None, the child classes will then set them with set_config_property so that
+        error checking can be carried out.
+        """
+        self._values: list = [None] * len(self._schema)
+        self._shared: bool = not self._schema
+        self._hash: int | None = None
 
     def get_behaviour_config_properties(self) -> list:
         """
-        Method will return a list of properties for the configuration
+        Method will return a list of properties for the configuration, each element is a dictionary with the structure
+        of the `_schema` and the key `'current_value'` with the value of the property
 
         @return: list of properties
         """
-        return self._properties
+        return [{**property_dict, 'current_value': value} for property_dict, value in zip(self._schema, self._values)]
+
+    def get_config_property(self, property_name: str) -> any:
+        """
+        Method returns the current value of a property
+
+        @param property_name: name of the property
+        """
+        if property_name not in self._schema_index:
+            raise KeyError(f"'{property_name}' not found in the properties of {self.__class__.__name__}")
+        return self._values[self._schema_index[property_name]]
 
     def set_config_property(self, property_name: str, value: any) -> None:
         """
-        This method is used for all behaviours to set the value of the protected property '_properties'  
+        This method is used for all behaviours to set the value of a property  
         This method has standard error and type checking as each behaviour will have a different set of properties  
-        refer to __init__ for the structure of the array.
+        refer to the class docstring for the structure of the schema.
 
         @param property_name: name of the property to be set  
         @param value: value to be set
         """
-        property_found = False
-        for index_dict, property_dict in enumerate(self._properties):
-            # searches for the property in the list of properties
-            if property_name == property_dict['property_name']:
-                property_found = True  # this boolean is used as it would raise an error if there was no property found
-                if type(value) not in property_dict['data_types']:
-                    raise TypeError(
-                        f"property '{property_name}' not in {property_dict['data_types']} so its not a valid datatype")
-                if 'data_validation' in property_dict and not property_dict['data_validation'](value):
-                    raise ValueError(
-                        f"property '{property_name}' didn't pass data validation of {property_dict['data_validation']}")
-                self._properties[index_dict]['current_value'] = value
-                break
         # raises error if property not found
-        if not property_found:
+        if property_name not in self._schema_index:
             raise KeyError(f"'{property_name}' not found in the properties of {self.__class__.__name__}")
+        if self._shared:
+            raise ValueError(f"{self} is shared between keymap positions, modify a copy() of it instead")
+
+        index = self._schema_index[property_name]
+        self._validators[index](value)
+        self._values[index] = value
+
+    def copy(self) -> AbstractBehaviour:
+        """
+        Method returns a copy of the behaviour which is not shared so that it can be modified, the values of the
+        properties are not copied as the codes are not modified in place
+        """
+        if not self._schema:
+            return self
+        behaviour = object.__new__(self.__class__)
+        behaviour._values = self._values.copy()
+        behaviour._shared = False
+        behaviour._hash = None
+        return behaviour
+
+    def _frozen_copy(self) -> AbstractBehaviour:
+        """
+        Method returns a shared copy of the behaviour whose codes are frozen copies as well, so neither the behaviour
+        nor the codes nested in it can change and its value key stays the same
+        """
+        if self._shared:
+            return self
+        behaviour = self.copy()
+        behaviour._values = [value._frozen_copy() if isinstance(value, AbstractCode) else value
+                             for value in behaviour._values]
+        behaviour._shared = True
+        return behaviour
+
+    def _value_key(self) -> tuple:
+        """
+        Method returns a key which is the same for behaviours of the same class with the same property values, the
+        codes are included through the key they use for their build cache
+        """
+        return (self.__class__,) + tuple(value._build_key() if isinstance(value, AbstractCode) else value
+                                         for value in self._values)
+
+    @classmethod
+    def validate_many(cls, values) -> None:
+        """
+        Method checks a batch of property values for this class of behaviour without creating any behaviours, e.g.
+        before a whole keymap is assigned. The same errors as set_config_property are raised, the message has the
+        position of the failing element added to the start.
+
+        @param values: iterable of dictionaries of property name -> value, each dictionary being one behaviour
+        """
+        schema_index = cls._schema_index
+        validators = cls._validators
+        for position, properties in enumerate(values):
+            for property_name, value in properties.items():
+                if property_name not in schema_index:
+                    raise KeyError(f"position {position}: '{property_name}' not found in the properties of "
+                                   f"{cls.__name__}")
+                try:
+                    validators[schema_index[property_name]](value)
+                except (TypeError, ValueError) as error:
+                    raise error.__class__(f"position {position}: {error}") from None
 
     @abc.abstractmethod
     def build(self) -> dict:
@@ -81,6 +227,25 @@ class AbstractBehaviour:
         """
         pass
 
+    def __eq__(self, other: AbstractBehaviour) -> bool:
+        """
+        Two behaviours are equal if they are the same class and their properties have equal values
+        """
+        if not isinstance(other, AbstractBehaviour):
+            return NotImplemented
+        return self is other or self._value_key() == other._value_key()
+
+    def __hash__(self):
+        """
+        Only a shared behaviour can be hashed, as it can't be modified its hash is only calculated once. The properties
+        of any other behaviour can be set which would change its hash while it is in a set or a dictionary
+        """
+        if not self._shared:
+            raise TypeError(f"{self} can be modified so it can't be hashed, hash share_behaviour() of it instead")
+        if self._hash is None:
+            self._hash = hash(self._value_key())
+        return self._hash
+
     @abc.abstractmethod
     def __str__(self):
         pass
@@ -89,12 +254,8 @@ class AbstractBehaviour:
         """
         Method returns a dictionary containing the properties of the behaviour
         """
-        properties_list = []
-        for property_dict in self._properties:
-            if 'export' in dir(property_dict['current_value']):
-                properties_list.append({property_dict['property_name']: property_dict['current_value'].export()})
-            else:
-                properties_list.append({property_dict['property_name']: property_dict['current_value']})
+        properties_list = [{property_dict['property_name']: export_value(value)}
+                           for property_dict, value in zip(self._schema, self._values)]
         return {f"{self.__class__}": {'_properties': properties_list}}
 
 
@@ -104,34 +265,35 @@ class KeyPress(AbstractBehaviour):
     
     The Key press allows a FunctionModifier or KeyCode to be passed as the binding
     """
+    __slots__ = ()
+
+    _schema = (
+        {'property_name': 'binding', 'data_types': [KeyCode, FunctionModifier]},
+    )
 
     def __init__(self, binding: any = None):
         super().__init__()
-        self._properties: list = [
-            {'property_name': 'binding',
-             'data_types'   : [KeyCode, FunctionModifier],
-             'current_value': binding}
-        ]
-
         self.set_config_property('binding', binding)
 
     def build(self) -> dict:
         """
         Refer to the documentation of the method 'build' in the parent class 'Behaviour'
         """
-        if self._properties[0]['current_value'] is None:
+        if self._values[0] is None:
             raise ValueError('the value for the behaviour was never set')
 
-        binding_dict: [KeyCode, FunctionModifier] = self._properties[0]['current_value'].build()
+        binding_dict: [KeyCode, FunctionModifier] = self._values[0].build()
+        includes = IncludeSet(['behaviors.dtsi'])
+        includes.add_set(binding_dict['.keymap']['include'])
         return {
             '.keymap': {
-                'include': list_union(['behaviors.dtsi'], binding_dict['.keymap']['include']),
+                'include': includes,
                 'return' : f"&kp {binding_dict['.keymap']['return']}"
             }
         }
 
     def __str__(self):
-        return f"KeyPress({self._properties[0]['current_value']})"
+        return f"KeyPress({self._values[0]})"
 
 
 class MomentaryLayer(AbstractBehaviour):
@@ -140,30 +302,32 @@ class MomentaryLayer(AbstractBehaviour):
     
     The MomentaryLayer allows an integer to be passed as the layer, which must be greater than or equal to 0
     """
+    __slots__ = ()
+
+    _schema = (
+        {'property_name': 'layer', 'data_types': [int], 'data_validation': lambda x: x >= 0},
+    )
 
     def __init__(self, layer: int = None):
         super().__init__()
-        self._properties = [
-            {'property_name': 'layer', 'data_types': [int], 'current_value': layer, 'data_validation': lambda x: x >= 0}
-        ]
         self.set_config_property('layer', layer)
 
     def build(self) -> dict:
         """
         Refer to the documentation of the method 'build' in the parent class 'Behaviour'
         """
-        if self._properties is None:
+        if self._values[0] is None:
             raise ValueError('the value for the behaviour was never set')
 
         return {
             '.keymap': {
-                'include': ['behaviors.dtsi'],
-                'return' : f"&mo {self._properties[0]['current_value']}"
+                'include': IncludeSet(['behaviors.dtsi']),
+                'return' : f"&mo {self._values[0]}"
             }
         }
 
     def __str__(self):
-        return f"MomentaryLayer({self._properties[0]['current_value']})"
+        return f"MomentaryLayer({self._values[0]})"
 
 
 class LayerTap(AbstractBehaviour):
@@ -173,13 +337,15 @@ class LayerTap(AbstractBehaviour):
     The LayerTap allows an integer to be passed as the layer, which must be greater than or equal to 0, and a
     FunctionModifier or KeyCode to be passed as the binding.
     """
+    __slots__ = ()
+
+    _schema = (
+        {'property_name': 'layer', 'data_types': [int], 'data_validation': lambda x: x >= 0},
+        {'property_name': 'binding', 'data_types': [KeyCode, FunctionModifier]}
+    )
 
     def __init__(self, layer: int = None, binding: any = None):
         super().__init__()
-        self._properties = [
-            {'property_name': 'layer', 'data_types': [int], 'current_value': None, 'data_validation': lambda x: x >= 0},
-            {'property_name': 'binding', 'data_types': [KeyCode, FunctionModifier], 'current_value': None}
-        ]
         self.set_config_property('layer', layer)
         self.set_config_property('binding', binding)
 
@@ -187,19 +353,21 @@ class LayerTap(AbstractBehaviour):
         """
         Refer to the documentation of the method 'build' in the parent class 'Behaviour'
         """
-        if self._properties is None:
+        if None in self._values:
             raise ValueError('the value for the behaviour was never set')
 
-        binding_dict: dict = self._properties[1]['current_value'].build()
+        binding_dict: dict = self._values[1].build()
+        includes = IncludeSet(['behaviors.dtsi'])
+        includes.add_set(binding_dict['.keymap']['include'])
         return {
             '.keymap': {
-                'include': list_union(['behaviors.dtsi'], binding_dict['.keymap']['include']),
-                'return' : f"&lt {self._properties[0]['current_value']} {binding_dict['.keymap']['return']}"
+                'include': includes,
+                'return' : f"&lt {self._values[0]} {binding_dict['.keymap']['return']}"
             }
         }
 
     def __str__(self):
-        return f"LayerTap({self._properties[0]['current_value']}, {self._properties[1]['current_value']})"
+        return f"LayerTap({self._values[0]}, {self._values[1]})"
 
 
 class ToggleLayer(AbstractBehaviour):
@@ -208,31 +376,33 @@ class ToggleLayer(AbstractBehaviour):
     
     The ToggleLayer allows an integer to be passed as the layer, which must be greater than or equal to 0
     """
+    __slots__ = ()
+
+    # the properties for this behaviour
+    _schema = (
+        {'property_name': 'layer', 'data_types': [int], 'data_validation': lambda x: x >= 0},
+    )
 
     def __init__(self, layer: int = None):
         super().__init__()
-        # creates the properties for this behaviour
-        self._properties = [
-            {'property_name': 'layer', 'data_types': [int], 'current_value': layer, 'data_validation': lambda x: x >= 0}
-        ]
         self.set_config_property('layer', layer)
 
     def build(self) -> dict:
         """
         Refer to the documentation of the method 'build' in the parent class 'Behaviour'
         """
-        if self._properties is None:
+        if self._values[0] is None:
             raise ValueError('the value for the behaviour was never set')
 
         return {
             '.keymap': {
-                'include': ['behaviors.dtsi'],
-                'return' : f"&tog {self._properties[0]['current_value']}"
+                'include': IncludeSet(['behaviors.dtsi']),
+                'return' : f"&tog {self._values[0]}"
             }
         }
 
     def __str__(self):
-        return f"ToggleLayer({self._properties[0]['current_value']})"
+        return f"ToggleLayer({self._values[0]})"
 
 
 class Transparent(AbstractBehaviour):
@@ -241,10 +411,10 @@ class Transparent(AbstractBehaviour):
     
     The Transparent behaviour has no properties
     """
+    __slots__ = ()
 
     def __init__(self):
         super().__init__()
-        self._properties = []
 
     def build(self) -> dict:
         """
@@ -252,7 +422,7 @@ class Transparent(AbstractBehaviour):
         """
         return {
             '.keymap': {
-                'include': ['behaviors.dtsi'],
+                'include': IncludeSet(['behaviors.dtsi']),
                 'return' : '&trans'
             }
         }
@@ -267,10 +437,10 @@ class NoneBehaviour(AbstractBehaviour):
     
     The NoneBehaviour behaviour has no properties
     """
+    __slots__ = ()
 
     def __init__(self):
         super().__init__()
-        self._properties = []
 
     def build(self) -> dict:
         """
@@ -278,7 +448,7 @@ class NoneBehaviour(AbstractBehaviour):
         """
         return {
             '.keymap': {
-                'include': ['behaviors.dtsi'],
+                'include': IncludeSet(['behaviors.dtsi']),
                 'return' : '&none'
             }
         }
@@ -293,10 +463,10 @@ class Reset(AbstractBehaviour):
     
     The Reset behaviour has no properties
     """
+    __slots__ = ()
 
     def __init__(self):
         super().__init__()
-        self._properties = []
 
     def build(self) -> dict:
         """
@@ -304,7 +474,7 @@ class Reset(AbstractBehaviour):
         """
         return {
             '.keymap': {
-                'include': ['behaviors.dtsi'],
+                'include': IncludeSet(['behaviors.dtsi']),
                 'return' : '&reset'
             }
         }
@@ -319,10 +489,10 @@ class BootloaderReset(AbstractBehaviour):
     
     The BootloaderReset behaviour has no properties
     """
+    __slots__ = ()
 
     def __init__(self):
         super().__init__()
-        self._properties = []
 
     def build(self) -> dict:
         """
@@ -330,7 +500,7 @@ class BootloaderReset(AbstractBehaviour):
         """
         return {
             '.keymap': {
-                'include': ['behaviors.dtsi'],
+                'include': IncludeSet(['behaviors.dtsi']),
                 'return' : '&bootloader'
             }
         }
@@ -345,32 +515,35 @@ class Bluetooth(AbstractBehaviour):
     
     The Bluetooth behaviour allows a BluetoothKeyCode to be passed as the binding
     """
+    __slots__ = ()
+
+    _schema = (
+        {'property_name': 'binding', 'data_types': [BluetoothKeyCode]},
+    )
 
     def __init__(self, binding: BluetoothKeyCode = None):
         super().__init__()
-        self._properties = [
-            {'property_name': 'binding', 'data_types': [BluetoothKeyCode], 'current_value': None},
-        ]
         self.set_config_property('binding', binding)
 
     def build(self) -> dict:
         """
         Refer to the documentation of the method 'build' in the parent class 'Behaviour'
         """
-        if self._properties is None:
+        if self._values[0] is None:
             raise ValueError('the value for the behaviour was never set')
 
-        binding_dict: dict = self._properties[0]['current_value'].build()
-        print(binding_dict)
+        binding_dict: dict = self._values[0].build()
+        includes = IncludeSet(['behaviors.dtsi'])
+        includes.add_set(binding_dict['.keymap']['include'])
         return {
             '.keymap': {
-                'include': list_union(['behaviors.dtsi'], binding_dict['.keymap']['include']),
+                'include': includes,
                 'return' : f"&bt {binding_dict['.keymap']['return']}"
             }
         }
 
     def __str__(self):
-        return f"Bluetooth({self._properties[0]['current_value']})"
+        return f"Bluetooth({self._values[0]})"
 
 
 class OutputSelection(AbstractBehaviour):
@@ -379,28 +552,32 @@ class OutputSelection(AbstractBehaviour):
     
     The OutputSelection allows an OutputKeyCode to be passed as the binding
     """
+    __slots__ = ()
+
+    _schema = (
+        {'property_name': 'binding', 'data_types': [OutputKeyCode]},
+    )
 
     def __init__(self, binding: OutputKeyCode = None):
         super().__init__()
-        self._properties = [
-            {'property_name': 'binding', 'data_types': [OutputKeyCode], 'current_value': None},
-        ]
         self.set_config_property('binding', binding)
 
     def build(self) -> dict:
         """
         Refer to the documentation of the method 'build' in the parent class 'Behaviour'
         """
-        if self._properties is None:
+        if self._values[0] is None:
             raise ValueError('the value for the behaviour was never set')
 
-        binding_dict: dict = self._properties[0]['current_value'].build()
+        binding_dict: dict = self._values[0].build()
+        includes = IncludeSet(['behaviors.dtsi'])
+        includes.add_set(binding_dict['.keymap']['include'])
         return {
             '.keymap': {
-                'include': list_union(['behaviors.dtsi'], binding_dict['.keymap']['include']),
+                'include': includes,
                 'return' : f"&out {binding_dict['.keymap']['return']}"
             }
         }
 
     def __str__(self):
-        return f"OutputSelection({self._properties[0]['current_value']})"
+        return f"OutputSelection({self._values[0]})"
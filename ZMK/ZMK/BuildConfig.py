@@ -0,0 +1,423 @@
+"""
+Module builds the files of a ZMK config from a ZMKConfig, the files GitHub Actions needs to compile the firmware.
+
+Every output file is rendered from the parts of the config it depends on, its components, which are the names of the
+attributes of ZMKConfig as they are sent by its change notification. The ConfigBuilder remembers which components
+changed since the last build, only the files which depend on one of them are rendered again, and a file is only
+written if the SHA-256 of its content differs from the one in the manifest of the last build. The manifest is stored
+next to the output in the working directory.
+
+The files are rendered one after the other in the order they were registered. Rendering is pure Python which holds
+the GIL, so a thread pool doesn't make it faster, and a process pool would have to pickle the ZMKConfig with its
+history and subscribers. The time saved comes from not rendering the files whose components didn't change.
+
+The files are written atomically, each is rendered into memory, written to a temporary file next to it and flushed to
+the disk. If writing any of them fails the temporary files are removed and nothing changes. Once every file and the
+new manifest have been written, a journal listing the renames is written next to the manifest, and only then are the
+temporary files renamed over the old files. Renaming several files can't be a single step, so if the application is
+killed or a rename fails part way, the journal is still there and the next build finishes the renames before it
+does anything else. The files on disk are never half written, and a build either leaves the old files or, at the
+latest after the next build starts, all the new files together with their manifest.
+"""
+from __future__ import annotations
+
+__all__ = ['ConfigBuilder', 'register_output', 'get_outputs']
+
+import hashlib
+import json
+import os
+import typing
+import uuid
+from os import path, makedirs
+
+from .CustomDataStructures import IncludeSet
+
+if typing.TYPE_CHECKING:
+    from . import Config
+
+MANIFEST_NAME = '.zmk_build_manifest.json'
+"""name of the manifest in the working directory"""
+
+JOURNAL_NAME = '.zmk_build_journal.json'
+"""name of the journal of the renames of a build in the working directory, it only exists while the files are renamed"""
+
+TEMPORARY_SUFFIX = '.zmk_build_tmp'
+"""suffix of the temporary files written during a build, left over ones are removed by the next build"""
+
+_PATH_COMPONENTS = frozenset({'working_directory', 'shield_directory', 'config_id'})
+"""components which change where the files are written, so every file has to be built again"""
+
+_outputs: dict[str, tuple[str, frozenset, typing.Callable[[Config.ZMKConfig], str]]] = {}
+"""output name -> (path template, components, render function)"""
+
+
+def register_output(name: str, path_template: str, components: typing.Iterable[str],
+                    renderer: typing.Callable[[Config.ZMKConfig], str]) -> None:
+    """
+    Function registers a file which is built by the ConfigBuilder, registering a name again replaces the file
+
+    @param name: name of the output, such as '.keymap'
+    @param path_template: path of the file relative to the working directory, '{shield_directory}' and '{config_id}'
+    are replaced with the values of the config
+    @param components: names of the attributes of ZMKConfig the content of the file depends on
+    @param renderer: function taking the ZMKConfig and returning the content of the file
+    """
+    if type(name) is not str:
+        raise TypeError(f"parameter 'name' of type {type(name)} is not a str")
+    if type(path_template) is not str:
+        raise TypeError(f"parameter 'path_template' of type {type(path_template)} is not a str")
+    if not callable(renderer):
+        raise TypeError(f"parameter 'renderer' of type {type(renderer)} is not callable")
+    _outputs[name] = (path_template, frozenset(components), renderer)
+
+
+def get_outputs() -> dict:
+    """
+    Function returns the registered files
+
+    @return: dictionary of name -> {'path': path template, 'components': frozenset of the components}
+    """
+    return {name: {'path': template, 'components': components}
+            for name, (template, components, _) in _outputs.items()}
+
+
+def _fragments(objects: typing.Iterable[any], zmk_config: Config.ZMKConfig, key: str) -> list:
+    """returns the fragments for a file from the build of every object which has one"""
+    fragments = []
+    for obj in objects:
+        fragment = obj.build(zmk_config).get(key)
+        if fragment:
+            fragments.append(fragment)
+    return fragments
+
+
+def _render_keymap(zmk_config: Config.ZMKConfig) -> str:
+    keymap = zmk_config.get_keymap()
+    includes = IncludeSet()
+    bindings = {}
+    """behaviour -> its binding in the keymap, every distinct behaviour is only built once"""
+    for behaviour in keymap.get_behaviours():
+        build = behaviour.build()['.keymap']
+        includes.add_set(build['include'])
+        bindings[behaviour] = build['return']
+
+    # the bindings are laid out in the rows of the transform if it has a key for every position
+    matrix = zmk_config.get_transform().get_matrix() if zmk_config.get_transform() is not None else []
+    if len(matrix) == keymap.get_position_count() and None not in matrix:
+        rows = [key.row for key in matrix]
+    else:
+        rows = [0] * keymap.get_position_count()
+
+    lines = [f"#include <{include}>" for include in includes]
+    lines += ['', '/ {', '    keymap {', '        compatible = "zmk,keymap";']
+    for index in range(keymap.get_layer_count()):
+        ids = keymap.get_layer_ids(index)
+        lines += ['', f"        layer_{index} {{", '            bindings = <']
+        row, line = None, []
+        for position, behaviour_id in enumerate(ids):
+            if rows[position] != row and line:
+                lines.append('                ' + ' '.join(line))
+                line = []
+            row = rows[position]
+            behaviour = keymap.get_behaviour(behaviour_id)
+            line.append('&none' if behaviour is None else bindings[behaviour])
+        if line:
+            lines.append('                ' + ' '.join(line))
+        lines += ['            >;', '        };']
+    lines += ['    };', '};', '']
+    return '\n'.join(lines)
+
+
+def _render_property(value: any) -> str:
+    if isinstance(value, str):
+        return f'"{value}"'
+    if isinstance(value, list | tuple):
+        return '<' + ' '.join(map(str, value)) + '>'
+    return f"<{value}>"
+
+
+def _render_overlay(zmk_config: Config.ZMKConfig) -> str:
+    lines = ['#include <dt-bindings/zmk/matrix_transform.h>', '', '/ {', '    chosen {']
+    driver = zmk_config.get_driver()
+    if driver is not None:
+        lines.append('        zmk,kscan = &kscan0;')
+    lines += ['        zmk,matrix_transform = &default_transform;', '    };']
+
+    transform = zmk_config.get_transform()
+    keys = transform.build(zmk_config)['matrix_transform'] if transform is not None else []
+    lines += ['', '    default_transform: keymap_transform_0 {', '        compatible = "zmk,matrix-transform";',
+              f"        columns = <{max((key.col for key in keys), default=-1) + 1}>;",
+              f"        rows = <{max((key.row for key in keys), default=-1) + 1}>;",
+              '        map = <']
+    row, line = None, []
+    for key in keys:
+        if key.row != row and line:
+            lines.append('            ' + ' '.join(line))
+            line = []
+        row = key.row
+        line.append(f"RC({key.row},{key.col})")
+    if line:
+        lines.append('            ' + ' '.join(line))
+    lines += ['        >;', '    };']
+
+    if driver is not None:
+        lines += ['', '    kscan0: kscan {', f'        compatible = "zmk,kscan-gpio-{_driver_compatible(driver)}";']
+        lines += [f"        {prop['name']} = {_render_property(prop['value'])};" for prop in driver.get_properties()
+                  if prop['value'] is not None]
+        lines.append('    };')
+    lines += ['};', '']
+    return '\n'.join(lines)
+
+
+def _driver_compatible(driver: any) -> str:
+    """returns the end of the compatible of the kscan node, MatrixDriver -> 'matrix'"""
+    name = driver.__class__.__name__
+    return name.removesuffix('Driver').lower()
+
+
+def _render_conf(zmk_config: Config.ZMKConfig) -> str:
+    return ''.join(f"{fragment}\n" for fragment in _fragments(zmk_config.get_config_options(), zmk_config, '.conf'))
+
+
+def _render_defconfig(zmk_config: Config.ZMKConfig) -> str:
+    shield = f"SHIELD_{zmk_config.get_config_id().upper()}"
+    fragments = [f"config ZMK_KEYBOARD_NAME\n    default \"{zmk_config.get_config_name()}\"\n"]
+    if zmk_config.is_split_config():
+        fragments.append("config ZMK_SPLIT\n    default y\n")
+    fragments += [f"{fragment}\n" for fragment in
+                  _fragments(zmk_config.get_default_config_options(), zmk_config, 'Kconfig.defconfig')]
+    return '\n'.join([f"if {shield}", ''] + fragments + ['endif', ''])
+
+
+def _render_shield(zmk_config: Config.ZMKConfig) -> str:
+    config_id = zmk_config.get_config_id()
+    return f"config SHIELD_{config_id.upper()}\n    def_bool $(shields_list_contains,{config_id})\n"
+
+
+def _mcu_fragment(zmk_config: Config.ZMKConfig, key: str) -> dict:
+    mcu = zmk_config.get_mcu()
+    if mcu is None:
+        raise ValueError("the config has no mcu")
+    return mcu.build(zmk_config)[key]
+
+
+def _render_build_yaml(zmk_config: Config.ZMKConfig) -> str:
+    board = _mcu_fragment(zmk_config, 'build.yaml')['board']
+    return f"include:\n  - board: {board}\n    shield: {zmk_config.get_config_id()}\n"
+
+
+def _render_zmk_yml(zmk_config: Config.ZMKConfig) -> str:
+    requires = _mcu_fragment(zmk_config, 'keyboard.zmk.yml')['requires']
+    return (f"file_format: \"1\"\nid: {zmk_config.get_config_id()}\nname: {zmk_config.get_config_name()}\n"
+            f"type: shield\nrequires: [{requires}]\nfeatures:\n  - keys\n")
+
+
+_SHIELD = 'config/boards/shields/{shield_directory}/'
+register_output('.keymap', _SHIELD + '{config_id}.keymap', ('keymap', 'transform'), _render_keymap)
+register_output('.overlay', _SHIELD + '{config_id}.overlay', ('transform', 'driver'), _render_overlay)
+register_output('.conf', _SHIELD + '{config_id}.conf', ('config_options',), _render_conf)
+register_output('Kconfig.defconfig', _SHIELD + 'Kconfig.defconfig',
+                ('default_config_options', 'config_name', 'split_config'), _render_defconfig)
+register_output('Kconfig.shield', _SHIELD + 'Kconfig.shield', (), _render_shield)
+register_output('build.yaml', 'build.yaml', ('mcu',), _render_build_yaml)
+register_output('keyboard.zmk.yml', _SHIELD + '{config_id}.zmk.yml', ('mcu', 'config_name'), _render_zmk_yml)
+
+
+def _write_temporary(file_path: str, content: bytes) -> str:
+    """writes the content to a new temporary file in the directory of the file and flushes it to the disk"""
+    directory, name = path.split(file_path)
+    makedirs(directory, exist_ok=True)
+    temporary_path = path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}{TEMPORARY_SUFFIX}")
+    # os.open creates the file with the same permissions as open() would, unlike tempfile.mkstemp
+    descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    with os.fdopen(descriptor, 'wb') as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    return temporary_path
+
+
+def _fsync_directory(directory: str) -> None:
+    """flushes the renames in a directory to the disk, which isn't possible on Windows"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _commit_files(files: dict[str, bytes], journal_path: str) -> None:
+    """
+    writes every file to a temporary file, then records the renames in the journal before renaming the temporary files
+    over the files. If writing a temporary file or the journal fails the temporary files are removed and none of the
+    files are changed. If a rename fails the journal is kept, and _recover finishes the renames.
+    """
+    temporary_paths = {}
+    journaled = False
+    try:
+        for file_path, content in files.items():
+            temporary_paths[file_path] = _write_temporary(file_path, content)
+        journal = json.dumps([[temporary_path, file_path] for file_path, temporary_path in temporary_paths.items()])
+        temporary_paths[journal_path] = _write_temporary(journal_path, journal.encode('utf8'))
+        os.replace(temporary_paths.pop(journal_path), journal_path)
+        _fsync_directory(path.dirname(journal_path))
+        journaled = True
+    finally:
+        if not journaled:
+            for temporary_path in temporary_paths.values():
+                try:
+                    os.remove(temporary_path)
+                except OSError:
+                    pass
+    _finish_renames(list(temporary_paths.items()), journal_path)
+
+
+def _finish_renames(renames: list, journal_path: str) -> None:
+    """renames the temporary files which are still there over their files, flushes them and removes the journal"""
+    for file_path, temporary_path in renames:
+        if path.exists(temporary_path):
+            os.replace(temporary_path, file_path)
+    for directory in dict.fromkeys(path.dirname(file_path) for file_path, _ in renames):
+        _fsync_directory(directory)
+    os.remove(journal_path)
+    _fsync_directory(path.dirname(journal_path))
+
+
+def _recover(journal_path: str) -> bool:
+    """
+    finishes the renames of a build which was killed or failed while renaming its files
+
+    @return: True if there was a journal, so the files and the manifest on disk changed
+    """
+    try:
+        with open(journal_path, 'r', encoding='utf8') as file:
+            renames = [(file_path, temporary_path) for temporary_path, file_path in json.load(file)]
+    except FileNotFoundError:
+        return False
+    _finish_renames(renames, journal_path)
+    return True
+
+
+def _remove_temporary_files(directories: typing.Iterable[str]) -> None:
+    """removes the temporary files left over by a build which was killed"""
+    for directory in directories:
+        if not path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            if name.endswith(TEMPORARY_SUFFIX):
+                os.remove(path.join(directory, name))
+
+
+class ConfigBuilder:
+    """
+    Class ConfigBuilder builds the files of a ZMKConfig into its working directory, and on the next build only renders
+    the files whose components changed and only writes the files whose content changed.
+    """
+
+    def __init__(self, zmk_config: Config.ZMKConfig):
+        """
+        Constructor for the ConfigBuilder class, the builder subscribes to the changes of the config
+
+        **Attributes**
+        `self.__dirty` - set of the components which changed since the last build, None if every file has to be
+        rendered, which is the case for the first build
+
+        `self.__manifest` - dictionary of path -> {'components': list, 'sha256': hex digest} of the last build, read
+        from the working directory the first time it's needed
+        """
+        self.__config = zmk_config
+        self.__dirty: set | None = None
+        self.__manifest: dict | None = None
+        zmk_config.subscribe(self.__on_changes)
+
+    def __on_changes(self, changes: list) -> None:
+        if self.__dirty is None:
+            return
+        for change in changes:
+            if change.component in _PATH_COMPONENTS:
+                self.__dirty = None
+                self.__manifest = None
+                return
+            self.__dirty.add(change.component)
+
+    def is_dirty(self) -> bool:
+        """Method returns whether a file could have changed since the last build"""
+        return self.__dirty is None or any(components & self.__dirty for _, components, _ in _outputs.values())
+
+    def get_manifest_path(self) -> str:
+        """Method returns the path of the manifest"""
+        return path.join(self.__working_directory(), MANIFEST_NAME)
+
+    def __working_directory(self) -> str:
+        for name in _PATH_COMPONENTS:
+            if getattr(self.__config, f"get_{name}")() is None:
+                raise ValueError(f"the {name.replace('_', ' ')} of the config is not set")
+        return self.__config.get_working_directory()
+
+    def __load_manifest(self) -> dict:
+        if self.__manifest is None:
+            try:
+                with open(self.get_manifest_path(), 'r', encoding='utf8') as file:
+                    self.__manifest = json.load(file)
+            except (FileNotFoundError, ValueError):
+                self.__manifest = {}
+        return self.__manifest
+
+    def get_paths(self) -> dict:
+        """
+        Method returns the path of every output relative to the working directory
+
+        @return: dictionary of output name -> path
+        """
+        self.__working_directory()
+        values = {'shield_directory': self.__config.get_shield_directory(),
+                  'config_id'       : self.__config.get_config_id()}
+        return {name: template.format(**values) for name, (template, _, _) in _outputs.items()}
+
+    def build(self, force: bool = False) -> list:
+        """
+        Method builds the files of the config
+
+        @param force: True to render and write every file even if it didn't change
+        @return: paths, relative to the working directory, of the files which were written
+        """
+        working_directory = self.__working_directory()
+        if _recover(path.join(working_directory, JOURNAL_NAME)):
+            self.__manifest = None
+        manifest = self.__load_manifest()
+        paths = self.get_paths()
+        outputs = []
+        for name, (_, components, renderer) in _outputs.items():
+            relative_path = paths[name]
+            entry = manifest.get(relative_path)
+            if not force and self.__dirty is not None and not components & self.__dirty and entry is not None and \
+                    path.isfile(path.join(working_directory, relative_path)):
+                continue
+            outputs.append((relative_path, components, renderer))
+
+        files = {}
+        """absolute path -> content of the files which changed"""
+        new_manifest = dict(manifest)
+        written = []
+        for relative_path, components, renderer in outputs:
+            content = renderer(self.__config).encode('utf8')
+            digest = hashlib.sha256(content).hexdigest()
+            file_path = path.join(working_directory, relative_path)
+            entry = manifest.get(relative_path)
+            if not force and entry is not None and entry['sha256'] == digest and path.isfile(file_path):
+                continue
+            files[file_path] = content
+            written.append(relative_path)
+            new_manifest[relative_path] = {'components': sorted(components), 'sha256': digest}
+
+        _remove_temporary_files(dict.fromkeys(
+            [working_directory] + [path.dirname(path.join(working_directory, p)) for p in paths.values()]))
+        if files:
+            # the manifest is renamed last, it never claims a file is newer than it is
+            files[self.get_manifest_path()] = json.dumps(new_manifest, indent=4, sort_keys=True).encode('utf8')
+            _commit_files(files, path.join(working_directory, JOURNAL_NAME))
+            self.__manifest = new_manifest
+        self.__dirty = set()
+        return written
@@ -0,0 +1,138 @@
+"""
+Module contains the change notification of ZMKConfig, which lets the application and the file generation find out what
+has changed instead of redrawing or rebuilding everything
+"""
+from __future__ import annotations
+
+__all__ = ['ConfigChange', 'ChangeNotifier']
+
+import contextlib
+import typing
+
+
+class ConfigChange(typing.NamedTuple):
+    """
+    A change to a component of the config. The component is the name of the attribute of ZMKConfig which changed,
+    such as 'keymap', 'transform' or 'config_options', and the key is the part of it which changed, (layer, position)
+    for a position of the keymap, the index for a key of the transform, the side for the split config options, or None
+    when the whole component may have changed.
+    """
+    component: str
+    key: typing.Hashable = None
+
+
+class ChangeNotifier:
+    """
+    Class ChangeNotifier sends the changes made to a config to the callbacks which subscribed to them.
+
+    Changes are coalesced, inside a batch the changes are only collected and equal changes are kept once, they are
+    sent when the outermost batch ends. Outside a batch every change is sent straight away. Every change also marks
+    its component dirty with its key, until the dirty flag of the component is cleared by whoever used the change.
+    """
+
+    def __init__(self):
+        """
+        Constructor for the ChangeNotifier class
+
+        **Attributes**
+        `self.__subscribers` - list of (callback, frozenset of components or None for every component)
+
+        `self.__pending` - dictionary used as an ordered set of the changes of the current batch
+
+        `self.__batch_depth` - number of batches which are open
+
+        `self.__dirty` - dictionary of component -> set of the keys which changed
+        """
+        self.__subscribers: list[tuple[typing.Callable[[list], None], frozenset | None]] = []
+        self.__pending: dict[ConfigChange, None] = {}
+        self.__batch_depth = 0
+        self.__dirty: dict[str, set] = {}
+
+    def subscribe(self, callback: typing.Callable[[list], None], components: typing.Iterable[str] = None) -> None:
+        """
+        Method subscribes a callback to the changes
+
+        @param callback: function which is called with a list of ConfigChange
+        @param components: names of the components the callback is interested in, None for every component
+        """
+        if not callable(callback):
+            raise TypeError(f"parameter 'callback' of type {type(callback)} is not callable")
+        self.__subscribers.append((callback, None if components is None else frozenset(components)))
+
+    def unsubscribe(self, callback: typing.Callable[[list], None]) -> None:
+        """
+        Method removes every subscription of a callback
+        """
+        subscribers = [subscriber for subscriber in self.__subscribers if subscriber[0] != callback]
+        if len(subscribers) == len(self.__subscribers):
+            raise ValueError(f"parameter 'callback' of value {callback} is not subscribed")
+        self.__subscribers = subscribers
+
+    def notify(self, component: str, key: typing.Hashable = None) -> None:
+        """
+        Method is called when a component changes
+
+        @param component: name of the component
+        @param key: part of the component which changed, None for the whole component
+        """
+        self.__dirty.setdefault(component, set()).add(key)
+        self.__pending[ConfigChange(component, key)] = None
+        if not self.__batch_depth:
+            self.__flush()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Method is a context manager which collects the changes made inside it and sends them once it ends
+        """
+        self.__batch_depth += 1
+        try:
+            yield
+        finally:
+            self.__batch_depth -= 1
+            if not self.__batch_depth:
+                self.__flush()
+
+    def __flush(self) -> None:
+        if not self.__pending:
+            return
+        changes, self.__pending = list(self.__pending), {}
+        for callback, components in self.__subscribers:
+            if components is None:
+                callback(changes)
+                continue
+            wanted = [change for change in changes if change.component in components]
+            if wanted:
+                callback(wanted)
+
+    def is_dirty(self, component: str = None) -> bool:
+        """
+        Method returns whether a component has changed since its dirty flag was cleared
+
+        @param component: name of the component, None for any component
+        """
+        if component is None:
+            return bool(self.__dirty)
+        return component in self.__dirty
+
+    def get_dirty_keys(self, component: str) -> frozenset:
+        """
+        Method returns the keys of a component which changed since its dirty flag was cleared, None is one of the keys
+        if the whole component may have changed
+        """
+        return frozenset(self.__dirty.get(component, ()))
+
+    def get_dirty_components(self) -> list:
+        """Method returns the names of the components which are dirty"""
+        return list(self.__dirty)
+
+    def clear_dirty(self, component: str = None) -> None:
+        """
+        Method clears the dirty flag of a component
+
+        @param component: name of the component, None to clear every component
+        """
+        if component is None:
+            self.__dirty.clear()
+        else:
+            self.__dirty.pop(component, None)
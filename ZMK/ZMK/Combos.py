@@ -0,0 +1,279 @@
+"""
+Module for ZMK containing combos, a combo is a behaviour which is triggered by pressing several keys at the same time.
+
+The key positions and the layers of a combo are stored as bitsets in an int, bit n is set if the combo uses the key at
+index n of the MatrixTransform, or is active on layer n. Checking whether two combos overlap is then a single `&`.
+"""
+from __future__ import annotations
+
+__all__ = ['Combo', 'ComboFeature']
+
+import re
+import typing
+
+from .Features import AbstractFeature
+from .Behaviours import AbstractBehaviour
+from .CustomDataStructures import IncludeSet
+
+if typing.TYPE_CHECKING:
+    from .Transform import MatrixTransform
+
+
+def _to_bitset(values: typing.Iterable[int], parameter: str) -> int:
+    bitset = 0
+    for value in values:
+        if type(value) is not int:
+            raise TypeError(f"parameter '{parameter}' contains {value!r} of type {type(value)} which is not an int")
+        if value < 0:
+            raise ValueError(f"parameter '{parameter}' contains {value} which is less than 0")
+        bitset |= 1 << value
+    return bitset
+
+
+def _from_bitset(bitset: int) -> tuple:
+    values = []
+    while bitset:
+        lowest = bitset & -bitset
+        values.append(lowest.bit_length() - 1)
+        bitset ^= lowest
+    return tuple(values)
+
+
+class Combo:
+    """
+    Class Combo has a name, the key positions which have to be pressed together, the behaviour which is triggered,
+    the time in milliseconds in which the keys have to be pressed and optionally the layers it's active on
+    """
+    __slots__ = ('_name', '_positions', '_binding', '_timeout_ms', '_layers')
+
+    def __init__(self, name: str, key_positions: typing.Iterable[int], binding: AbstractBehaviour,
+                 timeout_ms: int = 50, layers: typing.Iterable[int] | None = None):
+        """
+        Constructor for the Combo class
+
+        @param name: name of the combo node in the keymap
+        @param key_positions: indexes of the keys in the MatrixTransform, at least two
+        @param binding: behaviour triggered by the combo
+        @param timeout_ms: time in milliseconds in which all the keys have to be pressed
+        @param layers: layers the combo is active on, None for all the layers
+        """
+        if type(name) is not str:
+            raise TypeError(f"parameter 'name' of type {type(name)} is not a str")
+        if not re.fullmatch(r'[A-Za-z_][\w\-]*', name):
+            raise ValueError(f"parameter 'name' of value {name!r} is not a valid node name")
+        if not isinstance(binding, AbstractBehaviour):
+            raise TypeError(f"parameter 'binding' of type {type(binding)} is not a Behaviour")
+        if type(timeout_ms) is not int:
+            raise TypeError(f"parameter 'timeout_ms' of type {type(timeout_ms)} is not an int")
+        if timeout_ms <= 0:
+            raise ValueError(f"parameter 'timeout_ms' of value {timeout_ms} is not greater than 0")
+
+        positions = _to_bitset(key_positions, 'key_positions')
+        if positions.bit_count() < 2:
+            raise ValueError("parameter 'key_positions' needs at least two different positions")
+
+        self._name = name
+        self._positions = positions
+        self._binding = binding
+        self._timeout_ms = timeout_ms
+        self._layers = None if layers is None else _to_bitset(layers, 'layers')
+
+    def get_name(self) -> str:
+        """Getter for the name"""
+        return self._name
+
+    def get_key_positions(self) -> tuple:
+        """Method returns the key positions in ascending order"""
+        return _from_bitset(self._positions)
+
+    def get_positions_bitset(self) -> int:
+        """Method returns the key positions as a bitset"""
+        return self._positions
+
+    def get_binding(self) -> AbstractBehaviour:
+        """Getter for the binding"""
+        return self._binding
+
+    def get_timeout_ms(self) -> int:
+        """Getter for the timeout"""
+        return self._timeout_ms
+
+    def get_layers(self) -> tuple | None:
+        """Method returns the layers in ascending order, or None if the combo is active on all the layers"""
+        return None if self._layers is None else _from_bitset(self._layers)
+
+    def shares_layer(self, other: Combo) -> bool:
+        """Method returns whether the two combos are active on a common layer"""
+        return self._layers is None or other._layers is None or bool(self._layers & other._layers)
+
+    def build(self) -> dict:
+        """
+        method will return a dictionary containing the necessary bits for the zmk firmware to build it
+        """
+        binding_dict = self._binding.build()
+        lines = [f"{self._name} {{",
+                 f"    timeout-ms = <{self._timeout_ms}>;",
+                 f"    key-positions = <{' '.join(map(str, self.get_key_positions()))}>;",
+                 f"    bindings = <{binding_dict['.keymap']['return']}>;"]
+        if self._layers is not None:
+            lines.append(f"    layers = <{' '.join(map(str, self.get_layers()))}>;")
+        lines.append('};')
+        return {
+            '.keymap': {
+                'include': binding_dict['.keymap']['include'],
+                'return' : '\n'.join(lines)
+            }
+        }
+
+    def export(self) -> dict:
+        """
+        Method returns a dictionary of the combo which is able to be serialised to JSON
+        """
+        return {f"{self.__class__}": {'_name'         : self._name,
+                                      '_key_positions': self.get_key_positions(),
+                                      '_binding'      : self._binding,
+                                      '_timeout_ms'   : self._timeout_ms,
+                                      '_layers'       : self.get_layers()}}
+
+    def __str__(self):
+        return f"Combo('{self._name}', {list(self.get_key_positions())}, {self._binding})"
+
+
+class ComboFeature(AbstractFeature):
+    """
+    Class ComboFeature stores the combos of a keymap and finds the combos which conflict with each other
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.__combos: dict[str, Combo] = {}
+        """name -> combo, in the order they were added"""
+
+    def add_combo(self, combo: Combo) -> None:
+        """
+        Method adds a combo, the names of the combos have to be unique
+        """
+        if not isinstance(combo, Combo):
+            raise TypeError(f"parameter 'combo' of type {type(combo)} is not a Combo")
+        if combo.get_name() in self.__combos:
+            raise ValueError(f"a combo with the name {combo.get_name()!r} already exists")
+        self.__combos[combo.get_name()] = combo
+
+    def del_combo(self, name: str) -> None:
+        """
+        Method deletes the combo with the name
+        """
+        if name not in self.__combos:
+            raise KeyError(f"there is no combo with the name {name!r}")
+        del self.__combos[name]
+
+    def get_combos(self) -> list:
+        """Getter for the combos"""
+        return list(self.__combos.values())
+
+    def find_conflicts(self, transform: MatrixTransform | None = None) -> list:
+        """
+        Method finds the pairs of combos which are active on a common layer and use some of the same keys. The combos
+        using each key are kept as a bitset of the combo indexes, so only the pairs which share a key are looked at,
+        for hundreds of combos on a large keyboard that is about linear in the number of combos and conflicts.
+
+        The kinds of conflicts are:
+        - `'duplicate'`: both combos use the same keys, only one of them can ever be triggered
+        - `'subset'`: all the keys of the first combo are part of the second, pressing the second can trigger the first
+        - `'overlap'`: the combos share some keys
+        - `'timeout'`: the combos share keys but have a different timeout, so which one is triggered depends on how
+          fast the keys are pressed, this is reported as well as one of the kinds above
+        - `'position'`: the combo uses a key which is not in the MatrixTransform, only checked if one is given
+
+        @param transform: MatrixTransform of the keyboard to check the key positions against
+        @return: list of dictionaries `{'kind': kind, 'combos': (name, name)}`, 'position' has a single name
+        """
+        combos = self.get_combos()
+        conflicts = []
+        if transform is not None:
+            valid = (1 << len(transform)) - 1
+            conflicts += [{'kind': 'position', 'combos': (combo.get_name(),)} for combo in combos
+                          if combo.get_positions_bitset() & ~valid]
+
+        combos_by_key: dict[int, int] = {}
+        """key position -> bitset of the indexes of the combos using it"""
+        for index, combo in enumerate(combos):
+            for position in combo.get_key_positions():
+                combos_by_key[position] = combos_by_key.get(position, 0) | 1 << index
+
+        for index, combo in enumerate(combos):
+            positions = combo.get_positions_bitset()
+            candidates = 0
+            for position in combo.get_key_positions():
+                candidates |= combos_by_key[position]
+            # only the combos after this one so every pair is checked once
+            candidates >>= index + 1
+            other_index = index + 1
+            while candidates:
+                lowest = candidates & -candidates
+                other_index += lowest.bit_length() - 1
+                candidates >>= lowest.bit_length()
+                other = combos[other_index]
+                other_index += 1
+                if not combo.shares_layer(other):
+                    continue
+                names = (combo.get_name(), other.get_name())
+                other_positions = other.get_positions_bitset()
+                if positions == other_positions:
+                    conflicts.append({'kind': 'duplicate', 'combos': names})
+                elif positions & other_positions == positions:
+                    conflicts.append({'kind': 'subset', 'combos': names})
+                elif positions & other_positions == other_positions:
+                    conflicts.append({'kind': 'subset', 'combos': names[::-1]})
+                else:
+                    conflicts.append({'kind': 'overlap', 'combos': names})
+                if combo.get_timeout_ms() != other.get_timeout_ms():
+                    conflicts.append({'kind': 'timeout', 'combos': names})
+        return conflicts
+
+    def build_feature(self) -> dict:
+        """
+        Method returns the combos node of the keymap
+        """
+        includes = IncludeSet()
+        nodes = []
+        for combo in self.__combos.values():
+            combo_dict = combo.build()
+            includes.add_set(combo_dict['.keymap']['include'])
+            nodes.append('\n'.join(f"        {line}" for line in combo_dict['.keymap']['return'].split('\n')))
+        return {
+            '.keymap': {
+                'include': includes,
+                'return' : '/ {\n    combos {\n        compatible = "zmk,combos";\n' + '\n'.join(nodes) + '\n    };\n};'
+            }
+        }
+
+    def get_feature_config_properties(self) -> list:
+        """
+        Refer to the documentation of the method in the parent class 'AbstractFeature'
+        """
+        return [{'property_name': 'combos', 'data_type': list, 'current_value': self.get_combos()}]
+
+    def set_feature_config_property(self, property_name: str, value: any) -> None:
+        """
+        Refer to the documentation of the method in the parent class 'AbstractFeature', the combos are replaced. Every
+        combo is checked before any are replaced, so an invalid value leaves the combos unchanged
+        """
+        if property_name != 'combos':
+            raise KeyError(f"property {property_name!r} is not a property of {self.__class__.__name__}")
+        if not isinstance(value, list):
+            raise TypeError(f"parameter 'value' of type {type(value)} is not a list")
+        combos = {}
+        for combo in value:
+            if not isinstance(combo, Combo):
+                raise TypeError(f"parameter 'combo' of type {type(combo)} is not a Combo")
+            if combo.get_name() in combos:
+                raise ValueError(f"a combo with the name {combo.get_name()!r} already exists")
+            combos[combo.get_name()] = combo
+        self.__combos = combos
+
+    def export(self) -> dict:
+        """
+        Method returns a dictionary of the combos which is able to be serialised to JSON
+        """
+        return {f"{self.__class__}": {'_combos': self.get_combos()}}
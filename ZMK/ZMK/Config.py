@@ -14,10 +14,10 @@ from os import path
 
 if TYPE_CHECKING:
     from . import Features, MCUs, Drivers, Behaviours, ConfigOptions, ExportConfig, Shields, \
-        Transform, CustomDataStructures as CusDataStruc  # noqa: E402
+        Transform, Keymap, History, Changes, BuildConfig, Validation, CustomDataStructures as CusDataStruc  # noqa: E402
 
-from . import Features, MCUs, Drivers, Behaviours, ConfigOptions, ExportConfig, Shields, Transform, \
-    CustomDataStructures as CusDataStruc  # noqa: E402
+from . import Features, MCUs, Drivers, Behaviours, ConfigOptions, ExportConfig, Shields, Transform, Keymap, History, \
+    Changes, BuildConfig, Validation, CustomDataStructures as CusDataStruc  # noqa: E402
 
 
 class ZMKConfig:
@@ -45,27 +45,39 @@ class ZMKConfig:
         
         `__mcu` : MCUs.AbstractMCU | None - MCU that the keyboard will use
         
-        `__default_config_options` : list - Default configuration options that will be used by the keyboard, outputted
-        in the .defconfig file
+        `__default_config_options` : dict - name -> default configuration option that will be used by the keyboard,
+        outputted in the .defconfig file
         
-        `__config_options` : list - Configuration options that will be used by the keyboard, outputted in the .conf
-        file
+        `__config_options` : dict - name -> configuration option that will be used by the keyboard, outputted in the
+        .conf file
         
         `__driver` : Drivers.AbstractDriver | None - Driver that the keyboard will use such as a matrix driver, demux
         driver, etc.
         
         `__split_config` : bool - Boolean value which represents if the keyboard is a split keyboard or not
         
-        `__split_config_options` : TypedDict('__split_config_options', {'central': list, 'peripheral': list}) -
-        Configuration options for the respected halves of the split keyboard
+        `__split_config_options` : TypedDict('__split_config_options', {'central': dict, 'peripheral': dict}) -
+        name -> configuration option for the respected halves of the split keyboard
         
         `__behaviours` : list[Behaviours.AbstractBehaviour] - List will store behaviors which are unique configurations
         of a behaviour such as a tap dance
         
-        `__keymap` : CusDataStruc.Array - Array which will store behaviours for the keymap
+        `__keymap` : Keymap.LayeredKeymap - layers of positions which store the behaviours of the keymap
         
         `__transform` : Transform.MatrixTransform | None - Transform which is used to translate the physical layout of
         the keyboard to the logical layout
+
+        `__history` : History.ConfigHistory - journal of the changes made through the methods of the config, used by
+        undo and redo
+
+        `__changes` : Changes.ChangeNotifier - sends the changes made to the config to its subscribers and keeps the
+        dirty flags of the components
+
+        `__builder` : BuildConfig.ConfigBuilder | None - builder of the files of the config, created by the first build
+        so it remembers what changed between builds
+
+        `__validator` : Validation.ConfigValidator | None - checks the config, created by the first check so it only
+        runs the rules affected by the changes made since
         """
         self.__config_name: str | None = None
         self.__config_id: str | None = None
@@ -73,15 +85,153 @@ class ZMKConfig:
         self.__working_directory: str | None = None
         self.__features: list[Features.AbstractFeature] = []
         self.__mcu: MCUs.AbstractMCU | None = None
-        self.__default_config_options: list = []
-        self.__config_options: list = []
+        self.__default_config_options: dict[str, ConfigOptions.AbstractConfigOption] = {}
+        self.__config_options: dict[str, ConfigOptions.AbstractConfigOption] = {}
         self.__driver: Drivers.AbstractDriver | None = None
         self.__split_config: bool = False
-        self.__split_config_options: TypedDict('__split_config_options', {'central': list, 'peripheral': list}) = \
-            {'central': [], 'peripheral': []}
+        self.__split_config_options: TypedDict('__split_config_options', {'central': dict, 'peripheral': dict}) = \
+            {'central': {}, 'peripheral': {}}
         self.__behaviours: list[Behaviours.AbstractBehaviour] = []
-        self.__keymap: CusDataStruc.Array = CusDataStruc.Array([None])
+        self.__keymap: Keymap.LayeredKeymap = Keymap.LayeredKeymap()
         self.__transform: Transform.MatrixTransform | None = Transform.MatrixTransform()
+        self.__history: History.ConfigHistory = History.ConfigHistory()
+        self.__changes: Changes.ChangeNotifier = Changes.ChangeNotifier()
+        self.__builder: BuildConfig.ConfigBuilder | None = None
+        self.__validator: Validation.ConfigValidator | None = None
+        self.__attach_component('keymap', None, self.__keymap)
+        self.__attach_component('transform', None, self.__transform)
+
+    def __attach_component(self, attribute: str, old_value: any, new_value: any) -> None:
+        """
+        Method moves the observer of the keymap, the transform, the driver or the mcu from the old one to the new one,
+        so the changes made directly to them are sent as changes of the config
+        """
+        if attribute not in ('keymap', 'transform', 'driver', 'mcu'):
+            return
+        if old_value is not None and hasattr(old_value, 'set_observer'):
+            old_value.set_observer(None)
+        if new_value is not None and hasattr(new_value, 'set_observer'):
+            new_value.set_observer(lambda key: self.__changes.notify(attribute, key))
+
+    def __set_attribute(self, attribute: str, old_value: any, new_value: any) -> None:
+        """
+        Method sets an attribute when a change is undone or redone and sends the change
+        """
+        setattr(self, f"_ZMKConfig__{attribute}", new_value)
+        self.__attach_component(attribute, old_value, new_value)
+        self.__changes.notify(attribute)
+
+    def __record_attribute(self, description: str, attribute: str, old_value: any) -> None:
+        """
+        Method records the change of an attribute in the history, the attribute has already been set to its new value
+
+        @param description: description of the change  
+        @param attribute: name of the attribute without the leading underscores, such as 'config_name'  
+        @param old_value: value of the attribute before the change
+        """
+        new_value = getattr(self, f"_ZMKConfig__{attribute}")
+        self.__attach_component(attribute, old_value, new_value)
+        self.__changes.notify(attribute)
+        self.__history.record(description, lambda: self.__set_attribute(attribute, new_value, old_value),
+                              lambda: self.__set_attribute(attribute, old_value, new_value))
+
+    def __record_binding(self, description: str, layer: int, index: int, old_binding: any, old_count: int) -> None:
+        """
+        Method records the change of a position of the keymap in the history, the positions of the layers are put back
+        to old_count if the change added positions
+        """
+        keymap = self.__keymap
+        new_binding, new_count = keymap.get(layer, index), keymap.get_position_count()
+
+        def undo():
+            keymap.set(layer, index, old_binding)
+            if new_count != old_count:
+                keymap.set_position_count(old_count)
+
+        def redo():
+            if new_count != old_count:
+                keymap.set_position_count(new_count)
+            keymap.set(layer, index, new_binding)
+
+        self.__history.record(description, undo, redo)
+
+    def __record_options(self, description: str, component: str, options: dict, old_options: dict,
+                         key: str = None) -> None:
+        """
+        Method records the change of one of the dictionaries of config options, only the dictionary is copied
+
+        @param component: name of the attribute the dictionary belongs to, such as 'config_options'  
+        @param key: side of the split config options, None for the other dictionaries
+        """
+        new_options = options.copy()
+        self.__changes.notify(component, key)
+
+        def replace(items):
+            options.clear()
+            options.update(items)
+            self.__changes.notify(component, key)
+
+        self.__history.record(description, lambda: replace(old_options), lambda: replace(new_options))
+
+    def get_history(self) -> History.ConfigHistory:
+        """
+        Method for getting the history of the changes, which can be used to group changes or change the number of
+        changes which can be undone
+        """
+        return self.__history
+
+    def undo(self) -> str:
+        """
+        Method undoes the last change made through the methods of the config
+
+        @return: description of the change
+        """
+        with self.__changes.batch():
+            return self.__history.undo()
+
+    def redo(self) -> str:
+        """
+        Method makes the last undone change again
+
+        @return: description of the change
+        """
+        with self.__changes.batch():
+            return self.__history.redo()
+
+    def get_changes(self) -> Changes.ChangeNotifier:
+        """
+        Method for getting the change notifier, which is used to batch changes together or to look at and clear the
+        dirty flags of the components
+        """
+        return self.__changes
+
+    def subscribe(self, callback, components: list = None) -> None:
+        """
+        Method subscribes a callback to the changes of the config, such as a screen which redraws only the positions
+        of the keymap which changed.
+
+        @param callback: function called with a list of Changes.ConfigChange, the changes made in a batch, an undo or
+        a redo are sent together and equal changes are sent once  
+        @param components: names of the attributes the callback is interested in, such as ['keymap', 'transform'],
+        None for every attribute
+        """
+        self.__changes.subscribe(callback, components)
+
+    def unsubscribe(self, callback) -> None:
+        """Method unsubscribes a callback from the changes of the config"""
+        self.__changes.unsubscribe(callback)
+
+    def is_dirty(self, component: str = None) -> bool:
+        """
+        Method returns whether an attribute changed since its dirty flag was cleared with clear_dirty
+
+        @param component: name of the attribute such as 'keymap', None for any attribute
+        """
+        return self.__changes.is_dirty(component)
+
+    def clear_dirty(self, component: str = None) -> None:
+        """Method clears the dirty flag of an attribute, None clears every attribute"""
+        self.__changes.clear_dirty(component)
 
     def load_config(self, file_path: str) -> None:
         """
@@ -115,7 +265,9 @@ class ZMKConfig:
             raise TypeError(f"parameter 'name' of type {type(name)} is not a string")
         if Shields.is_name_taken(name):
             raise ValueError(f"parameter 'name' of value {name} is keyboard name that already exists")
+        old_value = self.__config_name
         self.__config_name = name
+        self.__record_attribute('set config name', 'config_name', old_value)
 
     def get_config_name(self) -> str:
         """Getter for the configuration name"""
@@ -132,7 +284,9 @@ class ZMKConfig:
             raise TypeError(f"parameter 'config_id' of type {type(config_id)} is not a string")
         if Shields.is_id_taken(config_id):
             raise ValueError(f"parameter 'config_id' of value {config_id} is name id that is already taken")
+        old_value = self.__config_id
         self.__config_id = config_id
+        self.__record_attribute('set config id', 'config_id', old_value)
 
     def get_config_id(self) -> str:
         """Getter for the config id"""
@@ -150,7 +304,9 @@ class ZMKConfig:
         if Shields.is_directory_taken(shield_directory):
             raise ValueError(f"parameter 'shield_directory' of value {shield_directory} is a directory that is already "
                              "taken")
+        old_value = self.__shield_directory
         self.__shield_directory = shield_directory
+        self.__record_attribute('set shield directory', 'shield_directory', old_value)
 
     def get_shield_directory(self) -> str:
         """Getter for the shield directory"""
@@ -167,7 +323,9 @@ class ZMKConfig:
         if not path.isdir(working_directory):
             raise ValueError(f"parameter 'working_directory' of value {working_directory} either does not exist or "
                              "is not a directory")
+        old_value = self.__working_directory
         self.__working_directory = working_directory
+        self.__record_attribute('set working directory', 'working_directory', old_value)
 
     def get_working_directory(self) -> str:
         """Getter for the working directory"""
@@ -191,7 +349,9 @@ class ZMKConfig:
         """Method for setting the mcu"""
         if not isinstance(mcu, MCUs.AbstractMCU):
             raise TypeError(f"parameter 'mcu' of type {type(mcu)} is not an MCU")
+        old_value = self.__mcu
         self.__mcu = mcu
+        self.__record_attribute('set mcu', 'mcu', old_value)
 
     def get_mcu(self) -> MCUs.AbstractMCU:
         """
@@ -201,7 +361,9 @@ class ZMKConfig:
 
     def set_driver(self, driver: Drivers.AbstractDriver) -> None:
         """Method for setting the driver"""
+        old_value = self.__driver
         self.__driver = driver
+        self.__record_attribute('set driver', 'driver', old_value)
 
     def get_driver(self) -> Drivers.AbstractDriver:
         """Method for getting the driver"""
@@ -213,7 +375,9 @@ class ZMKConfig:
         for now the MatrixTransform is the only transform that is available which is why the type hints are not part of
         an abstract class
         """
+        old_value = self.__transform
         self.__transform = transform
+        self.__record_attribute('set transform', 'transform', old_value)
 
     def get_transform(self) -> Transform.MatrixTransform:
         """
@@ -227,85 +391,260 @@ class ZMKConfig:
         """Method for getting the behaviours"""
         return self.__behaviours
 
-    def set_keymap(self, keymap: CusDataStruc.Array) -> None:
+    def set_keymap(self, keymap: Keymap.LayeredKeymap | CusDataStruc.Array | list) -> None:
         """
         Method for setting the keymap.
 
-        @param keymap: List of behaviours which are used to define the keymap
+        @param keymap: LayeredKeymap, or a list of behaviours or None which is used as the only layer of the keymap
         """
+        old_keymap = self.__keymap
+        if isinstance(keymap, Keymap.LayeredKeymap):
+            self.__keymap = keymap
+            self.__record_attribute('set keymap', 'keymap', old_keymap)
+            return
+        if not isinstance(keymap, CusDataStruc.Array | list):
+            raise TypeError(f"parameter 'keymap' of type {type(keymap)} is not a LayeredKeymap, Array or list")
         for index, behaviour in enumerate(keymap):
-            if not issubclass(behaviour, Behaviours.AbstractBehaviour) and behaviour is not None:
-                raise TypeError(f"parameter 'keymap' at index {index} of type {type(behaviour)} is not a Behaviour")
-            elif behaviour is not None:
-                raise ValueError(f"parameter 'keymap' at index {index} of value {behaviour} is not a Behaviour "
-                                 "or a NoneType")
+            if not isinstance(behaviour, Behaviours.AbstractBehaviour) and behaviour is not None:
+                raise TypeError(f"parameter 'keymap' at index {index} of type {type(behaviour)} is not a Behaviour "
+                                "or a NoneType")
 
-        self.__keymap = keymap
+        self.__keymap = Keymap.LayeredKeymap.from_layers([list(keymap)])
+        self.__record_attribute('set keymap', 'keymap', old_keymap)
 
-    def get_keymap(self) -> CusDataStruc.Array:
+    def get_keymap(self) -> Keymap.LayeredKeymap:
         """
         Method for getting the keymap.
 
-        @return: List of behaviours which are used to define the keymap
+        @return: LayeredKeymap which stores the behaviours of every layer
         """
         return self.__keymap
 
-    def modify_key_binding(self, index: int, key_binding: classmethod) -> None:
+    def get_keymap_includes(self) -> CusDataStruc.IncludeSet:
         """
-        Method for modifying a key binding.
+        Method collects the header files included by the behaviours of the keymap, each distinct behaviour is only
+        built once as the keymap stores them in a table.
 
-        @param index: Index of the behaviour in the keymap to be accessed  
-        @param key_binding: Behaviour which is modified in the keymap
+        @return: IncludeSet of the headers in the order the behaviours were first added to the keymap
         """
-        self.__keymap[index] = key_binding
+        includes = CusDataStruc.IncludeSet()
+        for behaviour in self.__keymap.get_behaviours():
+            includes.add_set(behaviour.build()['.keymap']['include'])
+        return includes
 
-    def clear_key_binding(self, index: int) -> None:
+    def modify_key_binding(self, index: int, key_binding: classmethod, layer: int = 0) -> None:
         """
-        Method for clearing a key binding.
+        Method for modifying a key binding. The behaviour is shared with every other position which has an equal
+        behaviour, so it can't be modified afterwards, use modify_key_binding_property to change it. The layers of
+        the keymap grow to include the index.
 
-        @param index: Index of the behaviour in the keymap to be cleared
+        @param index: Index of the behaviour in the keymap to be accessed  
+        @param key_binding: Behaviour which is modified in the keymap  
+        @param layer: Index of the layer
+        """
+        old_count = self.__keymap.get_position_count()
+        old_binding = None
+        if type(index) is int and index >= old_count:
+            self.__keymap.set_position_count(index + 1)
+        elif type(layer) is int and 0 <= layer < self.__keymap.get_layer_count() and type(index) is int and index >= 0:
+            old_binding = self.__keymap.get(layer, index)
+        try:
+            self.__keymap.set(layer, index, key_binding)
+        except (TypeError, IndexError):
+            self.__keymap.set_position_count(old_count)
+            raise
+        self.__record_binding('modify key binding', layer, index, old_binding, old_count)
+
+    def modify_key_binding_property(self, index: int, property_name: str, value: any, layer: int = 0) -> None:
+        """
+        Method for changing a property of the behaviour at a position of the keymap. As behaviours are shared between
+        positions a copy of the behaviour is modified, so that the other positions are left as they were.
+
+        @param index: Index of the behaviour in the keymap to be modified  
+        @param property_name: name of the property of the behaviour  
+        @param value: new value of the property  
+        @param layer: Index of the layer
+        """
+        if self.__keymap.get(layer, index) is None:
+            raise ValueError(f"there is no behaviour at index {index} of layer {layer} of the keymap")
+        old_binding = self.__keymap.get(layer, index)
+        behaviour = old_binding.copy()
+        behaviour.set_config_property(property_name, value)
+        self.__keymap.set(layer, index, behaviour)
+        self.__record_binding(f"modify key binding {property_name}", layer, index, old_binding,
+                              self.__keymap.get_position_count())
+
+    def clear_key_binding(self, index: int, layer: int = 0) -> None:
         """
-        self.__keymap[index] = None
+        Method for clearing a key binding.
+
+        @param index: Index of the behaviour in the keymap to be cleared  
+        @param layer: Index of the layer
+        """
+        old_binding = self.__keymap.get(layer, index) if type(index) is int and type(layer) is int else None
+        self.__keymap.set(layer, index, None)
+        self.__record_binding('clear key binding', layer, index, old_binding, self.__keymap.get_position_count())
+
+    def __get_options(self, target: str) -> tuple[str, str | None, dict]:
+        """
+        Method returns the options of a target, the target is the file they are outputted in, '.conf' or
+        'Kconfig.defconfig', or the side of a split keyboard, 'central' or 'peripheral'
+
+        @return: tuple of the component and key their changes are sent with, and the dictionary of name -> option
+        """
+        if target == '.conf':
+            return 'config_options', None, self.__config_options
+        if target == 'Kconfig.defconfig':
+            return 'default_config_options', None, self.__default_config_options
+        if target in self.__split_config_options:
+            return 'split_config_options', target, self.__split_config_options[target]
+        raise ValueError(f"target: {target} is not a valid target. Valid targets "
+                         f"{['.conf', 'Kconfig.defconfig'] + list(self.__split_config_options)}")
+
+    @staticmethod
+    def __option_name(option: ConfigOptions.AbstractConfigOption | str) -> str:
+        """Method returns the name of an option, a str is taken as the name"""
+        if isinstance(option, str):
+            return option
+        if not isinstance(option, ConfigOptions.AbstractConfigOption):
+            raise TypeError(f"parameter 'option' of type {type(option)} is not a ConfigOption")
+        return option.get_name()
+
+    def __check_option_changes(self, target: str, changes: dict) -> None:
+        """
+        Method checks changes to the options of a target before any of them are made
+
+        @param changes: dictionary of name -> option which is added or replaces the option with the name, or None to
+        delete the option with the name
+        """
+        _, _, options = self.__get_options(target)
+        for name, option in changes.items():
+            if option is None:
+                if name not in options:
+                    raise KeyError(f"there is no config option {name} in {target}")
+            elif self.__option_name(option) != name:
+                raise ValueError(f"config option {option} is given for the name {name}")
+
+    def __set_options(self, description: str, target: str, changes: dict) -> None:
+        """
+        Method makes checked changes to the options of a target, see __check_option_changes, and records them
+        """
+        component, key, options = self.__get_options(target)
+        old_options = options.copy()
+        for name, option in changes.items():
+            if option is None:
+                del options[name]
+            else:
+                options[name] = option
+                option.set_observer(lambda _, changed=option: self.__notify_option(changed))
+        self.__record_options(description, component, options, old_options, key)
+
+    def __notify_option(self, option: ConfigOptions.AbstractConfigOption) -> None:
+        """
+        Method sends the change of an option whose value was set in place for every target it is in, an option which
+        has been deleted from the config keeps its observer but isn't in any target so nothing is sent
+        """
+        targets = ['.conf', 'Kconfig.defconfig'] + list(self.__split_config_options)
+        for component, key, options in map(self.__get_options, targets):
+            if any(value is option for value in options.values()):
+                self.__changes.notify(component, key)
+
+    def __add_option(self, description: str, target: str, option: ConfigOptions.AbstractConfigOption) -> None:
+        name = self.__option_name(option)
+        if name in self.__get_options(target)[2]:
+            raise ValueError(f"config option {name} is already in {target}, it can be changed instead")
+        self.__set_options(description, target, {name: option})
+
+    def __change_option(self, description: str, target: str, option: ConfigOptions.AbstractConfigOption) -> None:
+        name = self.__option_name(option)
+        if name not in self.__get_options(target)[2]:
+            raise KeyError(f"there is no config option {name} in {target}")
+        self.__set_options(description, target, {name: option})
+
+    def __del_option(self, description: str, target: str, option: ConfigOptions.AbstractConfigOption | str) -> None:
+        changes = {self.__option_name(option): None}
+        self.__check_option_changes(target, changes)
+        self.__set_options(description, target, changes)
 
     def add_default_config_option(self, option: ConfigOptions.AbstractConfigOption) -> None:
-        """Method for adding a default config option, there is no error checking for this method yet."""
-        self.__default_config_options.append(option)
+        """Method for adding a default config option, a config option with the same name can't be added twice"""
+        self.__add_option('add default config option', 'Kconfig.defconfig', option)
 
     def change_default_config_option(self, option: ConfigOptions.AbstractConfigOption) -> None:
-        """Method for changing a default config option"""
-        self.__default_config_options.remove(option)
-        self.__default_config_options.append(option)
+        """Method for changing a default config option, it replaces the default config option with the same name"""
+        self.__change_option('change default config option', 'Kconfig.defconfig', option)
 
-    def del_default_config_option(self, option: ConfigOptions.AbstractConfigOption) -> None:
-        """Method for deleting a default config option"""
-        self.__default_config_options.remove(option)
+    def del_default_config_option(self, option: ConfigOptions.AbstractConfigOption | str) -> None:
+        """Method for deleting a default config option, by the option or its name"""
+        self.__del_option('delete default config option', 'Kconfig.defconfig', option)
 
     def get_default_config_options(self) -> list:
         """Method for getting the default config options"""
-        return self.__default_config_options
+        return list(self.__default_config_options.values())
 
     def add_config_option(self, option: ConfigOptions.AbstractConfigOption) -> None:
-        """Method for adding a config option"""
-        self.__config_options.append(option)
+        """Method for adding a config option, a config option with the same name can't be added twice"""
+        self.__add_option('add config option', '.conf', option)
 
     def change_config_option(self, option: ConfigOptions.AbstractConfigOption) -> None:
-        """Method for changing a config option"""
-        self.__config_options.remove(option)
-        self.__config_options.append(option)
+        """Method for changing a config option, it replaces the config option with the same name"""
+        self.__change_option('change config option', '.conf', option)
 
-    def del_config_option(self, option: ConfigOptions.AbstractConfigOption) -> None:
-        """Method for deleting a config option"""
-        self.__config_options.remove(option)
+    def del_config_option(self, option: ConfigOptions.AbstractConfigOption | str) -> None:
+        """Method for deleting a config option, by the option or its name"""
+        self.__del_option('delete config option', '.conf', option)
 
     def get_config_options(self) -> list:
         """Method for getting the config options"""
-        return self.__config_options
+        return list(self.__config_options.values())
+
+    def get_config_option(self, name: str, target: str = '.conf') -> ConfigOptions.AbstractConfigOption:
+        """
+        Method for getting a config option by its name.
+
+        @param name: name of the config option such as 'BT_MAX_CONN'  
+        @param target: '.conf', 'Kconfig.defconfig', 'central' or 'peripheral'
+        """
+        options = self.__get_options(target)[2]
+        if name not in options:
+            raise KeyError(f"there is no config option {name} in {target}")
+        return options[name]
+
+    def update_options(self, mapping: dict) -> None:
+        """
+        Method adds, replaces and deletes config options of several targets at once. Every change is checked before
+        any is made, so either all of them are made or none, and they are undone together and sent as one batch of
+        changes.
+
+        @param mapping: dictionary of target -> changes, the target is '.conf', 'Kconfig.defconfig', 'central' or
+        'peripheral'. The changes are either an iterable of config options, which are added or replace the option with
+        the same name, or a dictionary of name -> config option, or None to delete the option with the name
+        """
+        if not isinstance(mapping, dict):
+            raise TypeError(f"parameter 'mapping' of type {type(mapping)} is not a dict")
+        checked = {}
+        for target, changes in mapping.items():
+            if not isinstance(changes, dict):
+                options, changes = list(changes), {}
+                for option in options:
+                    name = self.__option_name(option)
+                    if name in changes:
+                        raise ValueError(f"config option {name} is given more than once for {target}")
+                    changes[name] = option
+            self.__check_option_changes(target, changes)
+            checked[target] = changes
+
+        with self.__changes.batch(), self.__history.group('update config options'):
+            for target, changes in checked.items():
+                self.__set_options('update config options', target, changes)
 
     def split_config(self, enable_split_config: bool) -> None:
         """Method for setting the split config"""
         if not isinstance(enable_split_config, bool):
             raise TypeError(f"parameter 'enable_split_config' of type {type(enable_split_config)} is not a bool")
+        old_value = self.__split_config
         self.__split_config = enable_split_config
+        self.__record_attribute('set split config', 'split_config', old_value)
 
     def is_split_config(self) -> bool:
         """Method for getting the split config:"""
@@ -313,56 +652,73 @@ class ZMKConfig:
 
     def add_split_config_option(self, side: str, option: ConfigOptions.AbstractConfigOption) -> None:
         """
-        Method for adding a split config option.
+        Method for adding a split config option, a config option with the same name can't be added twice to a side.
 
-        @param side: String which is either 'Primary' or 'Secondary'  
+        @param side: String which is either 'central' or 'peripheral'  
         @param option: ConfigOption which is added to the respected side
         """
-        if side in self.__split_config_options.keys():
-            # noinspection PyTypedDict
-            self.__split_config_options[side].append(option)
-        else:
+        if side not in self.__split_config_options:
             raise ValueError(
                 f"side: {side} is not valid side. Valid sides {[key for key in self.__split_config_options]}")
+        self.__add_option('add split config option', side, option)
 
-    def del_split_config_option(self, side: str, option: classmethod) -> None:
+    def del_split_config_option(self, side: str, option: ConfigOptions.AbstractConfigOption | str) -> None:
         """
         Method for deleting a split config option.
 
-        @param side: String which is either 'Primary' or 'Secondary'  
-        @param option: ConfigOption which is deleted from the respected side
+        @param side: String which is either 'central' or 'peripheral'  
+        @param option: ConfigOption, or its name, which is deleted from the respected side
         """
-        if side in self.__split_config_options:
-            # noinspection PyTypedDict
-            self.__split_config_options[side].remove(option)
-        else:
+        if side not in self.__split_config_options:
             raise ValueError(
                 f"side: {side} is not valid side. Valid sides {[key for key in self.__split_config_options]}")
+        self.__del_option('delete split config option', side, option)
 
     def get_split_config_options(self) -> dict:
-        """Method for getting the split config options"""
-        return self.__split_config_options
+        """Method for getting the split config options, a dictionary of side -> list of config options"""
+        return {side: list(options.values()) for side, options in self.__split_config_options.items()}
 
     def check_config(self) -> bool:
         """
-        Method for checking the config, not implemented yet, but it will return a boolean value of True if the config is
-        okay according to the checks carried out.
+        Method for checking the config with the rules of the Validation module, only the rules affected by the changes
+        made since the last check are run again.
+
+        @return: True if the config is okay according to the checks carried out
         """
-        pass
+        return not self.get_config_problems()
 
-    def build_config(self) -> None:
+    def get_config_problems(self) -> list:
         """
-        Method for building the ZMK config, not yet implemented, but it will create the files for which is pushed to
-        GitHub and GitHub Actions compiles the firmware
+        Method for getting the problems found by checking the config, see check_config
+
+        @return: list of strings describing the problems for the application to show
         """
-        pass
+        if self.__validator is None:
+            self.__validator = Validation.ConfigValidator(self)
+        return self.__validator.validate()
+
+    def build_config(self, force: bool = False) -> list:
+        """
+        Method for building the ZMK config, it creates the files in the working directory which are pushed to GitHub
+        where GitHub Actions compiles the firmware. Only the files whose content changed since the last build are
+        written, see BuildConfig.ConfigBuilder
+
+        @param force: True to write every file again  
+        @return: paths of the files which were written, relative to the working directory
+        """
+        if self.__builder is None:
+            self.__builder = BuildConfig.ConfigBuilder(self)
+        return self.__builder.build(force)
 
     def clear_key_data(self) -> None:
         """
         Method is called when there is a required change to the keymap and removes all the key data for the keymap,
         behaviours, transform and driver. the type of driver and transform will be kept.
         """
-        self.__keymap = []
-        self.__behaviours = []
-        self.__driver = self.__driver.__class__()
-        self.__transform = self.__transform.__class__()
+        with self.__changes.batch(), self.__history.group('clear key data'):
+            for attribute, value in (('keymap', Keymap.LayeredKeymap()), ('behaviours', []),
+                                     ('driver', self.__driver.__class__()),
+                                     ('transform', self.__transform.__class__())):
+                old_value = getattr(self, f"_ZMKConfig__{attribute}")
+                setattr(self, f"_ZMKConfig__{attribute}", value)
+                self.__record_attribute('clear key data', attribute, old_value)
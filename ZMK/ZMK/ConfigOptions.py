@@ -18,6 +18,8 @@ class AbstractConfigOption:
     Class ConfigOption is an abstract class that will store methods and attributes that will form a common interface
     for all config options.
     """
+    # the config options don't call the __init__ of this class, so the observer defaults to the class attribute
+    __observer: typing.Callable[[str], None] | None = None
 
     # noinspection PyUnusedLocal
     @abc.abstractmethod
@@ -26,7 +28,7 @@ class AbstractConfigOption:
         @param zmk_config: the ZMKConfig object is passed into so that it can be passed into the check_config_property
         method can check the value of the property against the config.
         
-        `self.__config_option` is a dictionary containing the properties of the attribute. it will have this structure:
+        `self._config_option` is a dictionary containing the properties of the attribute. it will have this structure:
         ```python
         {'name' : (string) name of the property,
          'types': (list) list of types the property can be,
@@ -34,7 +36,7 @@ class AbstractConfigOption:
         ```
         
         """
-        self.__config_option: dict = {
+        self._config_option: dict = {
             'name' : '',
             'types': [],
             'value': None
@@ -62,11 +64,25 @@ class AbstractConfigOption:
         @param value: value passed into the method which will set the attribute.
         """
         if self.check_config_property(zmk_config, value):
-            self.__config_option['value'] = value
+            self._config_option['value'] = value
+            if self.__observer is not None:
+                self.__observer(self.get_name())
+
+    def set_observer(self, observer: typing.Callable[[str], None] | None) -> None:
+        """
+        Method sets the function which is called with the name of the option when its value is set, None to remove it
+        """
+        if observer is not None and not callable(observer):
+            raise TypeError(f"parameter 'observer' of type {type(observer)} is not callable")
+        self.__observer = observer
 
     def get_config_property(self) -> dict:
         """Getter for the configuration property."""
-        return self.__config_option
+        return self._config_option
+
+    def get_name(self) -> str:
+        """Getter for the name of the config option, such as 'BT_MAX_CONN', a config can only have one of each name"""
+        return self._config_option['name']
 
     @abc.abstractmethod
     def build(self, zmk_config: Config.ZMKConfig) -> dict:
@@ -79,12 +95,12 @@ class AbstractConfigOption:
 
     def __str__(self) -> str:
         """Method will return a string which is used to represent the class in the output of a console"""
-        return f'{self.__config_option["name"]}={self.__config_option["value"]}'
+        return f'{self._config_option["name"]}={self._config_option["value"]}'
 
     def export(self) -> dict:
         """Method will return a dictionary containing the properties of the config options so that it can be exported to
         a json file."""
-        return {f"{self.__class__}": self.__config_option['value']}
+        return {f"{self.__class__}": self._config_option['value']}
 
 
 # General Config Options ===============================================================================================
@@ -114,7 +130,7 @@ class ZMK_KEYBOARD_NAME(AbstractConfigOption):
         The Value of this config option is a string which will be the name of the keyboard. there is no default value
         and the value must be a string of length no more than 16 characters.
         """
-        self.__config_option = {
+        self._config_option = {
             'name' : 'ZMK_KEYBOARD_NAME',
             'types': [str],
             'value': None
@@ -133,7 +149,7 @@ class ZMK_KEYBOARD_NAME(AbstractConfigOption):
         # TODO check if this config option already exists in the config and if it does raise an error
 
         if value is None:
-            value = self.__config_option['value']
+            value = self._config_option['value']
 
         if not isinstance(value, str):
             return False
@@ -178,7 +194,7 @@ class ZMK_HID_CONSUMER_REPORT_SIZE(AbstractConfigOption):
         The Value of this config option is an integer which will correspond to the amount of consumer keys
         simultaneously reportable. The default value is 6
         """
-        self.__config_option = {
+        self._config_option = {
             'name' : 'ZMK_HID_CONSUMER_REPORT_SIZE',
             'types': [int],
             'value': None
@@ -201,7 +217,7 @@ class ZMK_HID_CONSUMER_REPORT_SIZE(AbstractConfigOption):
         # TODO check if this config option already exists in the config and if it does raise an error
 
         if value is None:
-            value = self.__config_option['value']
+            value = self._config_option['value']
 
         if not isinstance(value, int):
             return False
@@ -213,7 +229,7 @@ class ZMK_HID_CONSUMER_REPORT_SIZE(AbstractConfigOption):
         refer to AbstractConfigOption build for information about the purpose of the method and the parameters.
         """
         return {
-            '.conf': f'CONFIG_{self.__config_option["name"]}={self.__config_option["value"]}'
+            '.conf': f'CONFIG_{self._config_option["name"]}={self._config_option["value"]}'
         }
 
 
@@ -252,7 +268,7 @@ class BT_MAX_CONN(AbstractConfigOption):
         only be set on the central half and must be set to one greater than the desired number bluetooth profiles.
         therefor in split config the minimum value for this config option is 2.
         """
-        self.__config_option = {
+        self._config_option = {
             'name' : 'BT_MAX_CONN',
             'types': [int],
             'value': None
@@ -269,7 +285,7 @@ class BT_MAX_CONN(AbstractConfigOption):
         # TODO check if this config option already exists in the config and if it does raise an error
 
         if value is None:
-            value = self.__config_option['value']
+            value = self._config_option['value']
 
         if not isinstance(value, int):
             return False
@@ -281,7 +297,7 @@ class BT_MAX_CONN(AbstractConfigOption):
         # TODO implement this method so that it can figure out which config file it belongs to and return the
         #   appropriate dictionary
         return {
-            '.conf': f'CONFIG_{self.__config_option["name"]}={self.__config_option["value"]}'
+            '.conf': f'CONFIG_{self._config_option["name"]}={self._config_option["value"]}'
         }
 
 
@@ -301,7 +317,7 @@ class BT_MAX_PAIRED(AbstractConfigOption):
         only be set on the central half and must be set to one greater than the desired number bluetooth profiles.
         therefor in split config the minimum value for this config option is 2.
         """
-        self.__config_option = {
+        self._config_option = {
             'name' : 'BT_MAX_PAIRED',
             'types': [int],
             'value': None
@@ -322,7 +338,7 @@ class BT_MAX_PAIRED(AbstractConfigOption):
         # TODO check if this config option already exists in the config and if it does raise an error
 
         if value is None:
-            value = self.__config_option['value']
+            value = self._config_option['value']
 
         if not isinstance(value, int):
             return False
@@ -334,7 +350,7 @@ class BT_MAX_PAIRED(AbstractConfigOption):
         # TODO implement this method so that is can figure out which config file it belongs to and return the
         #   appropriate dictionary
         return {
-            '.conf': f'CONFIG_{self.__config_option["name"]}={self.__config_option["value"]}'
+            '.conf': f'CONFIG_{self._config_option["name"]}={self._config_option["value"]}'
         }
 
 
@@ -369,7 +385,7 @@ class ZMK_SPLIT(AbstractConfigOption):
         The value of this config option is a boolean which corresponds to whether or not the keyboard is a split
         keyboard. The default value is False.
         """
-        self.__config_option = {
+        self._config_option = {
             'name' : 'ZMK_SPLIT',
             'types': [bool],
             'value': None
@@ -389,7 +405,7 @@ class ZMK_SPLIT(AbstractConfigOption):
         # TODO check if this config option already exists in the config and if it does raise an error
 
         if value is None:
-            value = self.__config_option['value']
+            value = self._config_option['value']
 
         if not isinstance(value, bool):
             return False
@@ -418,7 +434,7 @@ class ZMK_SPLIT_ROLE_CENTRAL(AbstractConfigOption):
         if the keyboard is a split keyboard. for example encoders must be on the central half. because as of this time
         encoders are only supported on the central half.
         """
-        self.__config_option = {
+        self._config_option = {
             'name' : 'ZMK_SPLIT_ROLE_CENTRAL',
             'types': [bool],
             'value': None
@@ -438,7 +454,7 @@ class ZMK_SPLIT_ROLE_CENTRAL(AbstractConfigOption):
         # TODO check if this config option already exists in the config and if it does raise an error
 
         if value is None:
-            value = self.__config_option['value']
+            value = self._config_option['value']
 
         if not isinstance(value, bool):
             return False
@@ -1,6 +1,9 @@
 """
 Purpose of this file is to create custom data structures which are used for the ZMK package
 """
+import weakref
+from array import array as _array
+from bisect import bisect_left
 
 
 class Array:
@@ -51,9 +54,10 @@ class Array:
         if not isinstance(index, int):
             raise TypeError(f"parameter 'index' of type {type(index)} is not an int")
 
-        while self.__length <= index:
-            self.__array.append(None)
-            self.__length += 1
+        if self.__length <= index:
+            # pad with a single extend instead of appending None one at a time
+            self.__array.extend([None] * (index + 1 - self.__length))
+            self.__length = index + 1
 
         self.__array[index] = item
 
@@ -96,3 +100,349 @@ class Array:
     def __list__(self):
         """__list__"""
         return self.__array.copy()
+
+
+class SparseArray(Array):
+    """
+    Class is an Array backed by a dictionary of index -> item, only the items which are not None are stored. It is
+    meant for very large arrays which are mostly empty, where inserting far past the end doesn't create any padding.
+    """
+
+    def __init__(self, *args):
+        """
+        Constructor for the SparseArray class.  
+        The method allows for the array to be initialized with a list if the first parameter is a list.
+
+        **Attributes**
+        `self.__items` - dictionary of index -> item for the items which are not None
+
+        `self.__length` - length of the array including the None items which are not stored
+        """
+        # Array.__init__ isn't called as every method is overridden, so the list of Array is never allocated
+        self.__items: dict = {}
+        self.__length = 0
+        if len(args) and isinstance(args[0], list):
+            self.__items = {index: item for index, item in enumerate(args[0]) if item is not None}
+            self.__length = len(args[0])
+
+    def __index(self, index: int) -> int:
+        if not isinstance(index, int):
+            raise TypeError(f"parameter 'index' of type {type(index)} is not an int")
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError(f"index {index} is out of range")
+        return index
+
+    def append(self, item):
+        """append"""
+        if item is not None:
+            self.__items[self.__length] = item
+        self.__length += 1
+
+    def clear(self):
+        """clear"""
+        self.__items.clear()
+        self.__length = 0
+
+    def copy(self):
+        """copy"""
+        array = SparseArray()
+        array.__items = self.__items.copy()
+        array.__length = self.__length
+        return array
+
+    def insert(self, index: int, item):
+        """insert, an index past the end only changes the length"""
+        if not isinstance(index, int):
+            raise TypeError(f"parameter 'index' of type {type(index)} is not an int")
+        if self.__length <= index:
+            self.__length = index + 1
+        index = self.__index(index)
+        if item is None:
+            self.__items.pop(index, None)
+        else:
+            self.__items[index] = item
+
+    def pop(self, index: int = -1):
+        """pop"""
+        index = self.__index(index)
+        item = self.__items.get(index)
+        self.__delitem__(index)
+        return item
+
+    def __setitem__(self, key, value):
+        """__setitem__"""
+        self.insert(key, value)
+
+    def __delitem__(self, key):
+        """
+        __delitem__, the key is an index or a slice like for Array. The indexes of the items after the deleted ones are
+        moved down in a single pass over the stored items, so a delete is O(stored items × log(deleted indexes))
+        """
+        if isinstance(key, slice):
+            deleted = sorted(range(*key.indices(self.__length)))
+        else:
+            deleted = [self.__index(key)]
+        if not deleted:
+            return
+        items = {}
+        for index, item in self.__items.items():
+            shift = bisect_left(deleted, index)
+            if shift == len(deleted) or deleted[shift] != index:
+                items[index - shift] = item
+        self.__items = items
+        self.__length -= len(deleted)
+
+    def __getitem__(self, key):
+        """__getitem__"""
+        if isinstance(key, slice):
+            return [self.__items.get(index) for index in range(*key.indices(self.__length))]
+        return self.__items.get(self.__index(key))
+
+    def __eq__(self, other):
+        """__eq__"""
+        return list(self) == (list(other) if isinstance(other, Array) else other)
+
+    def __iter__(self):
+        """__iter__"""
+        return (self.__items.get(index) for index in range(self.__length))
+
+    def __len__(self):
+        """__len__"""
+        return self.__length
+
+    def __str__(self):
+        """__str__"""
+        return list(self).__str__()
+
+    def __list__(self):
+        """__list__"""
+        return list(self)
+
+
+class TypedArray(Array):
+    """
+    Class is an Array of integers backed by the array module, which stores them as C values instead of Python objects.
+    As None can't be stored the array is padded with the fill value instead.
+    """
+
+    def __init__(self, *args, typecode: str = 'l', fill: int = 0):
+        """
+        Constructor for the TypedArray class.  
+        The method allows for the array to be initialized with a list if the first parameter is a list.
+
+        @param typecode: typecode of the array module, such as 'H' for unsigned 16 bit integers
+        @param fill: value used to pad the array when an index past the end is set
+
+        **Attributes**
+        `self.__array` - array.array which stores the integers
+        """
+        # Array.__init__ isn't called as every method is overridden, so the list of Array is never allocated
+        if typecode not in 'bBhHiIlLqQ' or len(typecode) != 1:
+            raise ValueError(f"parameter 'typecode' of value {typecode!r} is not an integer typecode")
+        if type(fill) is not int:
+            raise TypeError(f"parameter 'fill' of type {type(fill)} is not an int")
+        self.__fill = fill
+        self.__array = _array(typecode, args[0] if len(args) and isinstance(args[0], list) else [])
+
+    @staticmethod
+    def __check_item(item):
+        if type(item) is not int:
+            raise TypeError(f"parameter 'item' of type {type(item)} is not an int")
+
+    def append(self, item):
+        """append"""
+        self.__check_item(item)
+        self.__array.append(item)
+
+    def clear(self):
+        """clear"""
+        del self.__array[:]
+
+    def copy(self):
+        """copy"""
+        return TypedArray(self.__array.tolist(), typecode=self.__array.typecode, fill=self.__fill)
+
+    def insert(self, index: int, item):
+        """insert"""
+        if not isinstance(index, int):
+            raise TypeError(f"parameter 'index' of type {type(index)} is not an int")
+        self.__check_item(item)
+        if len(self.__array) <= index:
+            self.__array.extend(_array(self.__array.typecode, [self.__fill]) * (index + 1 - len(self.__array)))
+        self.__array[index] = item
+
+    def pop(self, index: int = -1):
+        """pop"""
+        if not isinstance(index, int):
+            raise TypeError(f"parameter 'index' of type {type(index)} is not an int")
+        return self.__array.pop(index)
+
+    def __setitem__(self, key, value):
+        """__setitem__"""
+        self.insert(key, value)
+
+    def __delitem__(self, key):
+        """__delitem__"""
+        del self.__array[key]
+
+    def __getitem__(self, key):
+        """__getitem__"""
+        if isinstance(key, slice):
+            return self.__array[key].tolist()
+        return self.__array[key]
+
+    def __eq__(self, other):
+        """__eq__"""
+        return self.__array.tolist() == (list(other) if isinstance(other, Array) else other)
+
+    def __iter__(self):
+        """__iter__"""
+        return self.__array.__iter__()
+
+    def __len__(self):
+        """__len__"""
+        return len(self.__array)
+
+    def __str__(self):
+        """__str__"""
+        return self.__array.tolist().__str__()
+
+    def __list__(self):
+        """__list__"""
+        return self.__array.tolist()
+
+    def get_typecode(self) -> str:
+        """Method returns the typecode of the array"""
+        return self.__array.typecode
+
+
+class IncludeSet:
+    """
+    Class is used to collect the header files which are included by the build of behaviours and keycodes. It works as
+    an ordered set, the headers keep the order they were first added in and checking if a header is already in the set
+    is O(1) as it is backed by a dictionary, unlike the lists which were merged with list_union.
+
+    A set can also hold references to other IncludeSets with add_set, their headers are part of the set without being
+    copied, so a build nested many levels deep only references the includes of the level below it. The references are
+    flattened the first time the headers are read, once for the whole tree, and a set referenced several times is only
+    visited once. The flattened headers are kept so reading them again is O(1), every referenced set knows the sets
+    referencing it and a header added to any of them clears the flattened headers of the sets above it.
+    """
+
+    def __init__(self, *iterables):
+        """
+        Constructor for the IncludeSet class.  
+        Any iterables passed in are added to the set in order.
+
+        **Attributes**
+        `self.__includes` - dictionary whose keys are the headers added directly to the set, the values are not used.
+        Dictionaries keep the order of insertion which is what makes the set ordered.
+
+        `self.__parts` - list of the headers and the referenced IncludeSets in the order they were added
+
+        `self.__flattened` - dictionary of the headers of the set and the sets it references, None until they are read
+
+        `self.__parents` - the sets referencing this set, by id, weak so a set doesn't keep the sets above it alive
+        """
+        self.__includes = {}
+        self.__parts: list = []
+        self.__flattened: dict | None = None
+        self.__parents = weakref.WeakValueDictionary()
+        for iterable in iterables:
+            self.update(iterable)
+
+    def add(self, include: str):
+        """add"""
+        if include not in self.__includes:
+            self.__includes[include] = None
+            self.__parts.append(include)
+            self.__invalidate()
+
+    def update(self, iterable):
+        """adds every header in the iterable which is not already in the set"""
+        for include in iterable:
+            self.add(include)
+
+    def add_set(self, include_set: 'IncludeSet'):
+        """adds a reference to another IncludeSet, its headers are read when the headers of this set are"""
+        if not isinstance(include_set, IncludeSet):
+            raise TypeError(f"parameter 'include_set' of type {type(include_set)} is not an IncludeSet")
+        if include_set is not self:
+            self.__parts.append(include_set)
+            include_set.__parents[id(self)] = self
+            self.__invalidate()
+
+    def __invalidate(self):
+        """clears the flattened headers of the set and of every set referencing it"""
+        if self.__flattened is None and not self.__parents:
+            return
+        stack, visited = [self], {id(self)}
+        while stack:
+            include_set = stack.pop()
+            include_set.__flattened = None
+            for parent_id, parent in list(include_set.__parents.items()):
+                if parent_id not in visited:
+                    visited.add(parent_id)
+                    stack.append(parent)
+
+    def __flatten(self) -> dict:
+        """returns a dictionary of the headers of the set and every set it references, in order"""
+        if len(self.__parts) == len(self.__includes):
+            return self.__includes
+        if self.__flattened is not None:
+            return self.__flattened
+        headers = {}
+        visited = {id(self)}
+        stack = [iter(self.__parts)]
+        while stack:
+            for part in stack[-1]:
+                if isinstance(part, IncludeSet):
+                    if id(part) in visited:
+                        continue
+                    visited.add(id(part))
+                    if part.__flattened is not None:
+                        headers.update(part.__flattened)
+                        continue
+                    stack.append(iter(part.__parts))
+                    break
+                headers[part] = None
+            else:
+                stack.pop()
+        self.__flattened = headers
+        return headers
+
+    def copy(self):
+        """copy, the headers of the referenced sets are copied as well"""
+        return IncludeSet(self.__flatten())
+
+    def __contains__(self, item):
+        """__contains__"""
+        return item in self.__flatten()
+
+    def __eq__(self, other):
+        """__eq__, an IncludeSet is equal to a list or another IncludeSet with the same headers in the same order"""
+        if isinstance(other, IncludeSet):
+            return list(self.__flatten()) == list(other)
+        return list(self.__flatten()) == other
+
+    def __iter__(self):
+        """__iter__"""
+        return iter(self.__flatten())
+
+    def __len__(self):
+        """__len__"""
+        return len(self.__flatten())
+
+    def __str__(self):
+        """__str__"""
+        return list(self.__flatten()).__str__()
+
+    def __repr__(self):
+        """__repr__"""
+        return f"IncludeSet({list(self.__flatten())})"
+
+    def __list__(self):
+        """__list__"""
+        return list(self.__flatten())
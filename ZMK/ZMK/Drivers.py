@@ -33,6 +33,7 @@ class AbstractDriver:
         ```
         """
         self.__properties: list = []
+        self.__observer: typing.Callable[[str], None] | None = None
 
     @abc.abstractmethod
     def check_property(self, zmk_config: Config.ZMKConfig, property_name: str, value: any = None) -> bool:
@@ -60,8 +61,18 @@ class AbstractDriver:
             for index, _property in enumerate(self.__properties):
                 if _property['name'] == property_name:
                     self.__properties[index]['value'] = value
+                    if self.__observer is not None:
+                        self.__observer(property_name)
                     break
 
+    def set_observer(self, observer: typing.Callable[[str], None] | None) -> None:
+        """
+        Method sets the function which is called with the name of a property when it's set, None to remove it
+        """
+        if observer is not None and not callable(observer):
+            raise TypeError(f"parameter 'observer' of type {type(observer)} is not callable")
+        self.__observer = observer
+
     def get_properties(self) -> list:
         """
         @return: list of dictionaries containing the properties
@@ -3,7 +3,7 @@ Module is used to Export the ZMKConfig to a JSON file
 """
 from __future__ import annotations
 
-__all__ = ['ZMKJSONEncoder', 'export_config']
+__all__ = ['ZMKJSONEncoder', 'export_config', 'export_value', 'get_exporter', 'register_exporter']
 
 import json
 import typing
@@ -11,6 +11,50 @@ import typing
 if typing.TYPE_CHECKING:
     from . import Config
 
+_exporters: dict[type, typing.Callable[[any], any] | None] = {}
+"""Dictionary of class -> export function, None if the class has no export method, filled the first time a class is
+exported"""
+
+
+def register_exporter(cls: type, exporter: typing.Callable[[any], any]) -> None:
+    """
+    Function registers an export function for a class, which is used instead of the export method of the class
+    @param cls: class the export function is for
+    @param exporter: function taking an object of the class and returning something that can be serialised to JSON
+    """
+    if not isinstance(cls, type):
+        raise TypeError(f"parameter 'cls' of type {type(cls)} is not a class")
+    if not callable(exporter):
+        raise TypeError(f"parameter 'exporter' of type {type(exporter)} is not callable")
+    _exporters[cls] = exporter
+
+
+def get_exporter(cls: type) -> typing.Callable[[any], any] | None:
+    """
+    Function returns the export function for a class, or None if the class can't be exported.  
+    The lookup is only done once per class instead of calling dir() for every object that is exported
+    @param cls: class of the object to export
+    @return: export function or None
+    """
+    try:
+        return _exporters[cls]
+    except KeyError:
+        exporter = getattr(cls, 'export', None)
+        _exporters[cls] = exporter if callable(exporter) else None
+        return _exporters[cls]
+
+
+def export_value(value: any) -> any:
+    """
+    Function exports a value if its class has an export function, otherwise the value is returned as it is
+    @param value: value to export
+    @return: exported value
+    """
+    exporter = get_exporter(value.__class__)
+    if exporter is None:
+        return value
+    return exporter(value)
+
 
 class ZMKJSONEncoder(json.JSONEncoder):
     """This class is used to encode the ZMKConfig to a JSON file"""
@@ -25,8 +69,9 @@ class ZMKJSONEncoder(json.JSONEncoder):
         The object in question should be objects of the ZMK package which have an export method which converts the
         attributes of to a format which can be exported to a json file and then imported again
         """
-        if 'export' in dir(o):
-            return o.export()
+        exporter = get_exporter(o.__class__)
+        if exporter is not None:
+            return exporter(o)
         return super().default(o)
 
 
@@ -0,0 +1,157 @@
+"""
+Module contains the journal of the changes made to a ZMKConfig, which is used to undo and redo them
+"""
+from __future__ import annotations
+
+__all__ = ['ConfigHistory']
+
+import contextlib
+import typing
+from collections import deque
+
+
+class ConfigHistory:
+    """
+    Class ConfigHistory is a journal of operations. Every change made through the methods of ZMKConfig records a pair
+    of functions, one which undoes it and one which does it again. The functions only hold on to the values which
+    were changed, the old and new behaviours of a position for example, and those are the same objects the config
+    uses, so undo and redo take time and memory in proportion to the change and not to the size of the config.
+
+    The journal keeps at most `max_depth` entries, the oldest are dropped when there are more. Making a new change
+    clears the changes which could be redone.
+    """
+
+    def __init__(self, max_depth: int = 100):
+        """
+        Constructor for the ConfigHistory class
+
+        @param max_depth: maximum number of changes which can be undone
+
+        **Attributes**
+        `self.__undo` - deque of entries, each a tuple of the description and a list of (undo, redo) functions
+
+        `self.__redo` - list of the entries which were undone, the last one is redone first
+
+        `self.__group` - entry the changes are collected in while a group is open, otherwise None
+
+        `self.__replaying` - True while undoing or redoing so the changes made by the functions aren't recorded
+        """
+        if type(max_depth) is not int:
+            raise TypeError(f"parameter 'max_depth' of type {type(max_depth)} is not an int")
+        if max_depth < 1:
+            raise ValueError(f"parameter 'max_depth' of value {max_depth} is less than 1")
+        self.__undo: deque = deque(maxlen=max_depth)
+        self.__redo: list = []
+        self.__group: tuple | None = None
+        self.__group_depth = 0
+        self.__replaying = False
+
+    def record(self, description: str, undo: typing.Callable[[], None], redo: typing.Callable[[], None]) -> None:
+        """
+        Method records a change which has already been made
+
+        @param description: short description of the change for the application to show
+        @param undo: function which undoes the change
+        @param redo: function which makes the change again
+        """
+        if self.__replaying:
+            return
+        if self.__group is not None:
+            self.__group[1].append((undo, redo))
+            return
+        self.__undo.append((description, [(undo, redo)]))
+        self.__redo.clear()
+
+    @contextlib.contextmanager
+    def group(self, description: str):
+        """
+        Method is a context manager which records every change made inside it as a single entry, groups inside a group
+        are part of the outer group
+
+        @param description: short description of the changes
+        """
+        if self.__group_depth == 0:
+            self.__group = (description, [])
+        self.__group_depth += 1
+        try:
+            yield
+        finally:
+            self.__group_depth -= 1
+            if self.__group_depth == 0:
+                group, self.__group = self.__group, None
+                if group[1] and not self.__replaying:
+                    self.__undo.append(group)
+                    self.__redo.clear()
+
+    def undo(self) -> str:
+        """
+        Method undoes the last change
+
+        @return: description of the change which was undone
+        """
+        if not self.__undo:
+            raise IndexError("there is no change to undo")
+        entry = self.__undo.pop()
+        self.__replay(undo for undo, _ in reversed(entry[1]))
+        self.__redo.append(entry)
+        return entry[0]
+
+    def redo(self) -> str:
+        """
+        Method makes the last undone change again
+
+        @return: description of the change which was redone
+        """
+        if not self.__redo:
+            raise IndexError("there is no change to redo")
+        entry = self.__redo.pop()
+        self.__replay(redo for _, redo in entry[1])
+        self.__undo.append(entry)
+        return entry[0]
+
+    def __replay(self, functions: typing.Iterable[typing.Callable[[], None]]) -> None:
+        self.__replaying = True
+        try:
+            for function in functions:
+                function()
+        finally:
+            self.__replaying = False
+
+    def can_undo(self) -> bool:
+        """Method returns whether there is a change to undo"""
+        return bool(self.__undo)
+
+    def can_redo(self) -> bool:
+        """Method returns whether there is a change to redo"""
+        return bool(self.__redo)
+
+    def get_undo_descriptions(self) -> list:
+        """Method returns the descriptions of the changes which can be undone, the most recent last"""
+        return [description for description, _ in self.__undo]
+
+    def get_redo_descriptions(self) -> list:
+        """Method returns the descriptions of the changes which can be redone, the next one last"""
+        return [description for description, _ in self.__redo]
+
+    def get_max_depth(self) -> int:
+        """Getter for the maximum number of changes which can be undone"""
+        return self.__undo.maxlen
+
+    def set_max_depth(self, max_depth: int) -> None:
+        """
+        Method changes the maximum number of changes which can be undone, the oldest are dropped if there are more
+        """
+        if type(max_depth) is not int:
+            raise TypeError(f"parameter 'max_depth' of type {type(max_depth)} is not an int")
+        if max_depth < 1:
+            raise ValueError(f"parameter 'max_depth' of value {max_depth} is less than 1")
+        self.__undo = deque(self.__undo, maxlen=max_depth)
+
+    def clear(self) -> None:
+        """Method forgets every change"""
+        self.__undo.clear()
+        self.__redo.clear()
+
+    def __len__(self):
+        """__len__, the number of changes which can be undone"""
+        return len(self.__undo)
@@ -0,0 +1,411 @@
+"""
+Purpose of this module is to be able to import an existing ZMK .keymap file, the devicetree of the file is read with a
+tokenizer and the bindings of the layers are turned straight into the objects of the Behaviours and KeyCodes modules.
+
+Only the subset of devicetree which is found in keymap files is understood: `#include` and simple `#define` lines,
+nodes with labels, and properties with strings or `<...>` cells. Nodes and properties which aren't part of the keymap,
+such as combos or macros, are read but skipped.
+"""
+from __future__ import annotations
+
+__all__ = ['KeymapSyntaxError', 'Token', 'tokenize_keymap', 'register_behaviour', 'parse_keymap', 'import_keymap']
+
+import re
+import typing
+
+from . import Behaviours
+from .CustomDataStructures import IncludeSet
+from .KeyCodes import KeyCode, FunctionModifier, BluetoothKeyCode, OutputKeyCode, FunctionModifiersJSON, \
+    BluetoothKeyCodesJSON
+
+
+class KeymapSyntaxError(ValueError):
+    """
+    Error raised when a keymap can't be read, the line and column are of the token where the problem was found and
+    start at 1 like they do in an editor
+    """
+
+    def __init__(self, message: str, line: int, column: int):
+        super().__init__(f"line {line}, column {column}: {message}")
+        self.message = message
+        self.line = line
+        self.column = column
+
+
+class Token(typing.NamedTuple):
+    """
+    Token of a keymap file, kind is one of 'include', 'define', 'string', 'reference', 'identifier', 'number' or
+    'punctuation'
+    """
+    kind: str
+    value: str
+    line: int
+    column: int
+
+
+_token_pattern = re.compile(r'''
+    (?P<newline>\n)
+  | (?P<space>[ \t\r\f\v]+|\\\n)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*.*?\*/)
+  | \#[ \t]*include[ \t]*(?:<(?P<include>[^>\n]*)>|"(?P<quoted_include>[^"\n]*)")
+  | \#[ \t]*define[ \t]+(?P<define>[^\n]*)
+  | (?P<directive>\#[ \t]*(?:undef|ifdef|ifndef|if|elif|else|endif|pragma|error|warning)\b[^\n]*)
+  | "(?P<string>(?:[^"\\\n]|\\.)*)"
+  | &(?P<reference>[A-Za-z_][\w\-]*)
+  | (?P<identifier>\#?[A-Za-z_][\w\-@.]*)
+  | (?P<number>0[xX][0-9a-fA-F]+|\d+)
+  | (?P<punctuation>[{}<>;=,():/\[\]])
+  | (?P<mismatch>.)
+''', re.VERBOSE | re.DOTALL)
+
+
+def tokenize_keymap(text: str) -> typing.Iterator[Token]:
+    """
+    Generator yields the tokens of a keymap file one at a time, white space, comments and preprocessor lines other
+    than `#include` and `#define` are skipped
+
+    @param text: contents of the keymap file
+    @raise KeymapSyntaxError: if there is a character which can't start a token
+    """
+    line = 1
+    line_start = 0
+    for match in _token_pattern.finditer(text):
+        kind = match.lastgroup
+        if kind == 'newline':
+            line += 1
+            line_start = match.end()
+            continue
+        if kind == 'space' or kind == 'line_comment' or kind == 'directive':
+            if kind == 'space' and match.group().endswith('\n'):
+                line += 1
+                line_start = match.end()
+            continue
+        if kind == 'block_comment':
+            newlines = match.group().count('\n')
+            if newlines:
+                line += newlines
+                line_start = match.start() + match.group().rindex('\n') + 1
+            continue
+        column = match.start() - line_start + 1
+        if kind == 'mismatch':
+            raise KeymapSyntaxError(f"unexpected character {match.group()!r}", line, column)
+        if kind == 'quoted_include':
+            kind = 'include'
+        yield Token(kind, match.group(kind), line, column)
+
+
+_argument_kinds = ('layer', 'key_code', 'bluetooth', 'output')
+
+_behaviour_parsers: dict[str, tuple[type, tuple[str, ...]]] = {}
+"""reference name of a behaviour -> (behaviour class, kinds of its arguments)"""
+
+
+def register_behaviour(reference: str, behaviour_class: type, arguments: tuple = ()) -> None:
+    """
+    Function registers the class of a behaviour so that it can be created from a binding in a keymap
+
+    @param reference: name of the behaviour without the '&', for example 'kp'
+    @param behaviour_class: child class of AbstractBehaviour which is created for the binding
+    @param arguments: kind of each argument of the binding in the order they are written, the kinds are 'layer',
+    'key_code', 'bluetooth' and 'output'
+    """
+    if type(reference) is not str:
+        raise TypeError(f"parameter 'reference' of type {type(reference)} is not a str")
+    if not (isinstance(behaviour_class, type) and issubclass(behaviour_class, Behaviours.AbstractBehaviour)):
+        raise TypeError(f"parameter 'behaviour_class' of type {type(behaviour_class)} is not a Behaviour class")
+    for argument in arguments:
+        if argument not in _argument_kinds:
+            raise ValueError(f"parameter 'arguments' expected kinds from {_argument_kinds} but received {argument!r}")
+    _behaviour_parsers[reference] = (behaviour_class, tuple(arguments))
+
+
+register_behaviour('kp', Behaviours.KeyPress, ('key_code',))
+register_behaviour('mo', Behaviours.MomentaryLayer, ('layer',))
+register_behaviour('lt', Behaviours.LayerTap, ('layer', 'key_code'))
+register_behaviour('tog', Behaviours.ToggleLayer, ('layer',))
+register_behaviour('trans', Behaviours.Transparent)
+register_behaviour('none', Behaviours.NoneBehaviour)
+register_behaviour('reset', Behaviours.Reset)
+register_behaviour('sys_reset', Behaviours.Reset)
+register_behaviour('bootloader', Behaviours.BootloaderReset)
+register_behaviour('bt', Behaviours.Bluetooth, ('bluetooth',))
+register_behaviour('out', Behaviours.OutputSelection, ('output',))
+
+
+class _KeymapParser:
+    """
+    Recursive descent parser over the tokens of a keymap, it keeps a single token of look ahead, and a name is put
+    back when it turns out to be the start of a child node, so the tokens are only read once
+    """
+
+    def __init__(self, tokens: typing.Iterator[Token]):
+        self._tokens = tokens
+        self._pushed: list = []
+        self._token: Token | None = next(self._tokens, None)
+        self._last: Token | None = None
+        self._bindings: dict = {}
+        """token values of a binding -> shared behaviour, keymaps repeat the same bindings a lot"""
+        self.includes = IncludeSet()
+        self.defines: dict = {}
+        self.layers: list = []
+
+    def _error(self, message: str, token: Token | None = None) -> KeymapSyntaxError:
+        token = token or self._token or self._last
+        if token is None:
+            return KeymapSyntaxError(message, 1, 1)
+        return KeymapSyntaxError(message, token.line, token.column)
+
+    def _advance(self) -> Token:
+        if self._token is None:
+            raise self._error('unexpected end of the keymap')
+        self._last = self._token
+        self._token = self._pushed.pop() if self._pushed else next(self._tokens, None)
+        return self._last
+
+    def _is(self, kind: str, value: str = None) -> bool:
+        return self._token is not None and self._token.kind == kind and (value is None or self._token.value == value)
+
+    def _expect(self, kind: str, value: str = None) -> Token:
+        if not self._is(kind, value):
+            expected = repr(value) if value is not None else kind
+            found = 'the end of the keymap' if self._token is None else repr(self._token.value)
+            raise self._error(f"expected {expected} but found {found}")
+        return self._advance()
+
+    def parse(self) -> None:
+        """reads the whole keymap"""
+        while self._token is not None:
+            if self._is('include'):
+                self.includes.add(self._advance().value)
+            elif self._is('define'):
+                self._define(self._advance())
+            else:
+                self._node(in_keymap=False)
+
+    def _define(self, token: Token) -> None:
+        name, value = (token.value.split(None, 1) + [''])[:2]
+        value = value.strip()
+        if re.fullmatch(r'\d+', value):
+            self.defines[name] = int(value)
+        elif re.fullmatch(r'0[xX][0-9a-fA-F]+', value):
+            self.defines[name] = int(value, 16)
+        else:
+            self.defines[name] = value
+        self._bindings.clear()
+
+    def _node(self, in_keymap: bool) -> None:
+        """
+        node := [label ':'] name '{' (property | node)* '}' ';'
+        a node is the keymap if it's called keymap or has `compatible = "zmk,keymap"`, its child nodes are the layers
+        """
+        if self._is('reference') or self._is('punctuation', '/'):
+            name = self._advance().value
+        else:
+            name = self._expect('identifier').value
+            if self._is('punctuation', ':'):
+                self._advance()
+                name = self._expect('identifier').value
+        self._expect('punctuation', '{')
+
+        is_keymap = name == 'keymap'
+        layer = {'name': name, 'display_name': None, 'bindings': None} if in_keymap else None
+        while not self._is('punctuation', '}'):
+            if self._is('include'):
+                self.includes.add(self._advance().value)
+                continue
+            if self._is('define'):
+                self._define(self._advance())
+                continue
+            if self._token is None:
+                raise self._error('unexpected end of the keymap, expected a property, a node or }')
+            name_token = self._advance()
+            if self._is('punctuation', ':') or self._is('punctuation', '{'):
+                self._put_back(name_token)
+                self._node(in_keymap=is_keymap)
+                continue
+            if name_token.kind != 'identifier':
+                raise self._error(f"expected the name of a property or a node but found {name_token.value!r}",
+                                  name_token)
+            value = self._property(name_token, layer is not None)
+            if name_token.value == 'compatible' and value == 'zmk,keymap':
+                is_keymap = True
+            elif layer is not None and name_token.value == 'bindings':
+                layer['bindings'] = value
+            elif layer is not None and name_token.value in ('display-name', 'label'):
+                layer['display_name'] = value
+        self._advance()
+        self._expect('punctuation', ';')
+
+        if layer is not None and layer['bindings'] is not None:
+            self.layers.append(layer)
+
+    def _put_back(self, token: Token) -> None:
+        self._pushed.append(self._token)
+        self._token = token
+
+    def _property(self, name_token: Token, in_layer: bool) -> any:
+        """
+        property := name ['=' value (',' value)*] ';'
+        returns the string of a string property, the behaviours of the bindings of a layer or None otherwise
+        """
+        result = None
+        if self._is('punctuation', '='):
+            self._advance()
+            while True:
+                if self._is('string'):
+                    result = self._advance().value
+                elif self._is('punctuation', '<'):
+                    self._advance()
+                    if in_layer and name_token.value == 'bindings':
+                        result = self._bindings_cells()
+                    else:
+                        self._skip_until('>')
+                elif self._is('punctuation', '['):
+                    self._advance()
+                    self._skip_until(']')
+                else:
+                    found = 'the end of the keymap' if self._token is None else repr(self._token.value)
+                    raise self._error(f"expected a value for the property '{name_token.value}' but found {found}")
+                if not self._is('punctuation', ','):
+                    break
+                self._advance()
+        self._expect('punctuation', ';')
+        return result
+
+    def _skip_until(self, value: str) -> None:
+        while not self._is('punctuation', value):
+            self._advance()
+        self._advance()
+
+    def _bindings_cells(self) -> list:
+        """
+        reads the bindings of a layer up to the closing '>', each binding is a reference followed by its arguments
+        """
+        behaviours = []
+        while not self._is('punctuation', '>'):
+            reference = self._expect('reference')
+            arguments = []
+            while self._token is not None and not self._is('reference') and not self._is('punctuation', '>'):
+                arguments.append(self._advance())
+            key = (reference.value, *[token.value for token in arguments])
+            behaviour = self._bindings.get(key)
+            if behaviour is None:
+                behaviour = self._bindings[key] = Behaviours.share_behaviour(self._binding(reference, arguments))
+            behaviours.append(behaviour)
+        self._advance()
+        return behaviours
+
+    def _binding(self, reference: Token, arguments: list) -> Behaviours.AbstractBehaviour:
+        """creates the behaviour of a binding through the registered class of its reference"""
+        if reference.value not in _behaviour_parsers:
+            raise self._error(f"unknown behaviour '&{reference.value}'", reference)
+        behaviour_class, argument_kinds = _behaviour_parsers[reference.value]
+        cursor = _Cursor(self, reference, arguments)
+        values = [getattr(cursor, argument_kind)() for argument_kind in argument_kinds]
+        if cursor.index < len(arguments):
+            raise self._error(f"unexpected argument {arguments[cursor.index].value!r} for '&{reference.value}'",
+                              arguments[cursor.index])
+        try:
+            return behaviour_class(*values)
+        except (TypeError, ValueError, KeyError) as error:
+            raise self._error(f"invalid binding '&{reference.value}': {error}", reference) from error
+
+
+class _Cursor:
+    """
+    Reads the arguments of a single binding, there is a method for every kind of argument a behaviour can have
+    """
+
+    def __init__(self, parser: _KeymapParser, reference: Token, arguments: list):
+        self._parser = parser
+        self._reference = reference
+        self._arguments = arguments
+        self.index = 0
+
+    def _next(self, expected: str) -> Token:
+        if self.index >= len(self._arguments):
+            last = self._arguments[-1] if self._arguments else self._reference
+            raise self._parser._error(f"expected {expected} for '&{self._reference.value}'", last)
+        token = self._arguments[self.index]
+        self.index += 1
+        return token
+
+    def _peek_is(self, value: str) -> bool:
+        return self.index < len(self._arguments) and self._arguments[self.index].value == value
+
+    def layer(self) -> int:
+        token = self._next('a layer')
+        value = self._parser.defines.get(token.value, token.value) if token.kind == 'identifier' else token.value
+        if type(value) is int:
+            return value
+        if token.kind == 'number' or re.fullmatch(r'0[xX][0-9a-fA-F]+|\d+', str(value)):
+            return int(str(value), 0)
+        raise self._parser._error(f"expected a layer number or a #define of one but found {token.value!r}", token)
+
+    def key_code(self) -> KeyCode | FunctionModifier:
+        token = self._next('a key code')
+        if token.kind != 'identifier':
+            raise self._parser._error(f"expected a key code but found {token.value!r}", token)
+        if not self._peek_is('('):
+            try:
+                return KeyCode(token.value)
+            except KeyError:
+                raise self._parser._error(f"unknown key code {token.value!r}", token) from None
+        name = f"{token.value}(xx)"
+        if name not in FunctionModifiersJSON():
+            raise self._parser._error(f"unknown modifier function {token.value!r}", token)
+        self.index += 1
+        binding = self.key_code()
+        closing = self._next("')'")
+        if closing.value != ')':
+            raise self._parser._error(f"expected ')' but found {closing.value!r}", closing)
+        return FunctionModifier(name, binding)
+
+    def bluetooth(self) -> BluetoothKeyCode:
+        token = self._next('a bluetooth key code')
+        if f"{token.value}(xx)" in BluetoothKeyCodesJSON():
+            profile = self._next('a bluetooth profile')
+            if profile.kind != 'number':
+                raise self._parser._error(f"expected a bluetooth profile number but found {profile.value!r}", profile)
+            return BluetoothKeyCode(f"{token.value}(xx)", int(profile.value, 0))
+        try:
+            return BluetoothKeyCode(token.value)
+        except KeyError:
+            raise self._parser._error(f"unknown bluetooth key code {token.value!r}", token) from None
+
+    def output(self) -> OutputKeyCode:
+        token = self._next('an output key code')
+        try:
+            return OutputKeyCode(token.value)
+        except KeyError:
+            raise self._parser._error(f"unknown output key code {token.value!r}", token) from None
+
+
+def parse_keymap(text: str) -> dict:
+    """
+    Function reads the contents of a keymap file into the behaviours of its layers. Equal bindings are shared with
+    Behaviours.share_behaviour so they are only created once.
+
+    @param text: contents of the keymap file
+    @return: dictionary of this structure
+    ```python
+    {'include': IncludeSet of the included headers,
+     'defines': {name: int or str},
+     'layers' : [{'name': node name, 'display_name': str or None, 'bindings': [behaviours]}]}
+    ```
+    @raise KeymapSyntaxError: with the line and column of the problem if the keymap can't be read
+    """
+    if type(text) is not str:
+        raise TypeError(f"parameter 'text' of type {type(text)} is not a str")
+    parser = _KeymapParser(tokenize_keymap(text))
+    parser.parse()
+    return {'include': parser.includes, 'defines': parser.defines, 'layers': parser.layers}
+
+
+def import_keymap(file: any) -> dict:
+    """
+    Function reads a keymap file, refer to parse_keymap for the returned dictionary
+    @param file: file object created by open()
+    """
+    return parse_keymap(file.read())
@@ -5,13 +5,73 @@ from __future__ import annotations
 
 __all__ = ["AbstractJSONDictionary", "KeyCodesJSON", "FunctionModifiersJSON",
            'BluetoothKeyCodesJSON',
-           'OutputKeyCodesAbstractJSON', 'KeyCode', 'FunctionModifier', 'BluetoothKeyCode', 'OutputKeyCode']
+           'OutputKeyCodesAbstractJSON', 'HIDUsageTable', 'KeyCode', 'FunctionModifier', 'BluetoothKeyCode',
+           'OutputKeyCode', 'clear_build_cache']
 
 import abc
+import copy
+import functools
 import json
+from array import array
 
 from pkg_resources import resource_filename
-from ListUnion import list_union
+
+from .CustomDataStructures import IncludeSet
+from .ExportConfig import export_value
+
+
+def _read_resource(file_name: str) -> dict:
+    """
+    Function reads the keycode resource file, which holds all the keycode data of the package in one file so that it
+    is only opened and decoded once. The file has this structure:
+    ```python
+    {'strings': [list of every string used in the file, each only once],
+     'sections': {'key_codes': {'type': 'code', 'rows': [[name, description, context], ...]},
+                  'hid_usages': {'type': 'usage', 'rows': [[name, page, id, modifiers], ...]}, ...}}
+    ```
+    the names, descriptions and contexts are indexes into the string table, context can also be null. so aliases which
+    share a description also share the string object.
+
+    @param file_name: name of the resource file in the package
+    @return: dictionary of section name -> dictionary of name -> {'description', 'context'} for 'code' sections, or
+    a list of [name, page, id, modifiers] rows for 'usage' sections
+    """
+    with open(resource_filename(__name__, file_name), 'r', encoding='utf8') as file:
+        resource = json.load(file)
+
+    strings = resource['strings']
+    sections = {}
+    for section_name, section in resource['sections'].items():
+        if section['type'] == 'code':
+            sections[section_name] = {
+                strings[name]: {'description': strings[description],
+                                'context'    : None if context is None else strings[context]}
+                for name, description, context in section['rows']
+            }
+        elif section['type'] == 'usage':
+            sections[section_name] = [[strings[name], page, usage_id, modifiers]
+                                      for name, page, usage_id, modifiers in section['rows']]
+        else:
+            raise ValueError(f"section '{section_name}' of {file_name} has an unknown type {section['type']}")
+    return sections
+
+
+_resource: dict = _read_resource('keycodes.json')
+"""sections of keycodes.json, shared by the JSON dictionary classes and HIDUsageTable"""
+
+
+def _index_contexts(dictionary: dict) -> dict:
+    """
+    Function groups the keys of a JSON dictionary by their 'context', e.g. "Keyboard" or "Consumer". The contexts keep
+    the order they first appear in the JSON file and so do the codes within them.
+
+    @param dictionary: dictionary loaded from one of the JSON files
+    @return: dictionary of context -> tuple of the names of the codes in that context
+    """
+    contexts = {}
+    for name, code in dictionary.items():
+        contexts.setdefault(code['context'], []).append(name)
+    return {context: tuple(names) for context, names in contexts.items()}
 
 
 class AbstractJSONDictionary:
@@ -23,6 +83,7 @@ class AbstractJSONDictionary:
     @abc.abstractmethod
     def __init__(self):
         self._dictionary = {}
+        self._contexts = {}
 
     def __iter__(self):
         return iter(self._dictionary)
@@ -35,17 +96,42 @@ class AbstractJSONDictionary:
     def __contains__(self, item):
         return item in self._dictionary
 
+    def get_contexts(self) -> list:
+        """
+        Method returns the contexts of the codes in the order they appear in the JSON file, the context of some codes
+        is null which is returned as None
+        """
+        return list(self._contexts)
+
+    def get_context_codes(self, context: str | None) -> tuple:
+        """
+        Method returns the names of the codes in a context, the groups are created when the JSON file is loaded
+
+        @param context: context of the codes, such as "Keyboard"
+        """
+        if context not in self._contexts:
+            raise KeyError(f"context {context} is not in the dictionary")
+        return self._contexts[context]
+
+    def get_context_counts(self) -> dict:
+        """
+        Method returns a dictionary of each context and the number of codes in it
+        """
+        return {context: len(names) for context, names in self._contexts.items()}
+
 
 class KeyCodesJSON(AbstractJSONDictionary):
     """
     this class will act as a dictionary which is protected, as the JSON files are used frequently and otherwise the
     program would have to read the file several times
     """
-    _dictionary = json.load(open(resource_filename(__name__, 'key_codes.json'), 'r', encoding='utf8'))
+    _dictionary = _resource['key_codes']
+    _contexts = _index_contexts(_dictionary)
 
     def __init__(self):
         super().__init__()
         self._dictionary = KeyCodesJSON._dictionary
+        self._contexts = KeyCodesJSON._contexts
 
 
 class FunctionModifiersJSON(AbstractJSONDictionary):
@@ -53,11 +139,13 @@ class FunctionModifiersJSON(AbstractJSONDictionary):
     this class will act as a dictionary which is protected, as the JSON files are used frequently and otherwise the
     program would have to read the file several times
     """
-    _dictionary = json.load(open(resource_filename(__name__, 'function_modifiers.json'), 'r', encoding='utf8'))
+    _dictionary = _resource['function_modifiers']
+    _contexts = _index_contexts(_dictionary)
 
     def __init__(self):
         super().__init__()
         self._dictionary = FunctionModifiersJSON._dictionary
+        self._contexts = FunctionModifiersJSON._contexts
 
 
 class BluetoothKeyCodesJSON(AbstractJSONDictionary):
@@ -65,11 +153,13 @@ class BluetoothKeyCodesJSON(AbstractJSONDictionary):
     this class will act as a dictionary which is protected, as the JSON files are used frequently and otherwise the
     program would have to read the file several times
     """
-    _dictionary = json.load(open(resource_filename(__name__, 'bluetooth_keycodes.json'), 'r', encoding='utf8'))
+    _dictionary = _resource['bluetooth_keycodes']
+    _contexts = _index_contexts(_dictionary)
 
     def __init__(self):
         super().__init__()
         self._dictionary = BluetoothKeyCodesJSON._dictionary
+        self._contexts = BluetoothKeyCodesJSON._contexts
 
 
 class OutputKeyCodesAbstractJSON(AbstractJSONDictionary):
@@ -77,11 +167,145 @@ class OutputKeyCodesAbstractJSON(AbstractJSONDictionary):
     this class will act as a dictionary which is protected, as the JSON files are used frequently and otherwise the
     program would have to read the file several times
     """
-    _dictionary = json.load(open(resource_filename(__name__, 'output_keycodes.json'), 'r', encoding='utf8'))
+    _dictionary = _resource['output_keycodes']
+    _contexts = _index_contexts(_dictionary)
 
     def __init__(self):
         super().__init__()
         self._dictionary = OutputKeyCodesAbstractJSON._dictionary
+        self._contexts = OutputKeyCodesAbstractJSON._contexts
+
+
+class HIDUsageTable:
+    """
+    this class holds the HID usage page and id of every keycode in keycodes.json so that a keymap which only has the
+    numeric usages (e.g. from another tool) can be turned into KeyCode objects. Like the JSON dictionaries it is loaded
+    once, the pages, ids and implicit modifiers are stored in arrays where row i belongs to the i-th name.
+
+    Some keycodes such as EXCL are a usage with an implicit modifier, EXCL is LS(N1). The modifiers use the bits of the
+    HID modifier byte (0x02 is left shift) and are packed into a single integer the same way ZMK does it
+    `modifiers << 24 | page << 16 | id`.
+    """
+    _rows = _resource['hid_usages']
+    _names: tuple = tuple(row[0] for row in _rows)
+    _pages: array = array('H', (row[1] for row in _rows))
+    _ids: array = array('H', (row[2] for row in _rows))
+    _modifiers: array = array('B', (row[3] for row in _rows))
+    _index: dict = {name: row for row, name in enumerate(_names)}
+    """name -> row of the arrays"""
+    _reverse: dict = {}
+    """packed usage -> tuple of names, the first name being the canonical one as it comes first in keycodes.json"""
+    for _row, _name in enumerate(_names):
+        _packed = _modifiers[_row] << 24 | _pages[_row] << 16 | _ids[_row]
+        _reverse[_packed] = _reverse.get(_packed, ()) + (_name,)
+    del _rows, _row, _name, _packed
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __row(self, name: str) -> int:
+        """returns the row of the name in the arrays"""
+        if name not in self._index:
+            raise KeyError(f"parameter 'name' expected to be from the key_codes of keycodes.json but received {name}")
+        return self._index[name]
+
+    def get_usage(self, name: str) -> tuple[int, int]:
+        """
+        Method returns the HID usage of a keycode
+
+        @param name: name of the keycode, such as 'A'
+        @return: tuple of the usage page and the usage id, e.g. (7, 4) for 'A'
+        """
+        row = self.__row(name)
+        return self._pages[row], self._ids[row]
+
+    def get_implicit_modifiers(self, name: str) -> int:
+        """
+        Method returns the implicit modifiers of a keycode, this will be 0 for most keycodes
+        """
+        return self._modifiers[self.__row(name)]
+
+    def get_names(self, page: int, usage_id: int, modifiers: int = 0) -> tuple:
+        """
+        Method returns the names of the keycodes for a usage, the canonical name first followed by its aliases
+
+        @param page: HID usage page, e.g. 7 for the keyboard page
+        @param usage_id: HID usage id within the page
+        @param modifiers: implicit modifiers of the keycode, for example 0x02 with (7, 0x1E) gives EXCLAMATION
+        """
+        packed = modifiers << 24 | page << 16 | usage_id
+        if packed not in self._reverse:
+            raise KeyError(f"usage page {page:#x} id {usage_id:#x} with modifiers {modifiers:#x} has no keycode")
+        return self._reverse[packed]
+
+    def get_canonical_name(self, page: int, usage_id: int, modifiers: int = 0) -> str:
+        """
+        Method returns the canonical name of the keycode for a usage, refer to get_names for the parameters
+        """
+        return self.get_names(page, usage_id, modifiers)[0]
+
+    def key_codes_from_usages(self, usages) -> list:
+        """
+        Method converts a series of usages into KeyCode objects using the canonical names
+
+        @param usages: iterable where each usage is either a (page, id) tuple or an integer packed like ZMK does
+        @return: list of KeyCode objects
+        """
+        key_codes = []
+        for usage in usages:
+            if isinstance(usage, int):
+                packed = usage
+            else:
+                packed = usage[0] << 16 | usage[1]
+            if packed not in self._reverse:
+                raise KeyError(f"usage {packed:#x} has no keycode")
+            key_codes.append(KeyCode(self._reverse[packed][0]))
+        return key_codes
+
+
+_build_cache: dict = {}
+"""
+Results of `build()` shared between all codes of equal value, keyed on `AbstractCode._build_key()`. a keymap will use
+the same handful of keycodes at a lot of positions, so every one after the first is a dictionary lookup.
+"""
+
+
+def _memoize_build(build):
+    """
+    Decorator for the build methods of the codes, it will return the result from `_build_cache` if a code with the same
+    key has already been built. Every caller gets its own copy of the dictionaries, the include set of the copy only
+    references the cached one, so modifying a result doesn't change the cache.
+    """
+
+    @functools.wraps(build)
+    def wrapper(self) -> dict:
+        key = self._build_key()
+        try:
+            result = _build_cache[key]
+        except KeyError:
+            result = _build_cache[key] = build(self)
+        return _copy_build(result)
+
+    return wrapper
+
+
+def _copy_build(result: dict) -> dict:
+    """returns a copy of a cached build result, whose include sets are new sets referencing the cached ones"""
+    copied = {}
+    for file, parts in result.items():
+        copied[file] = dict(parts)
+        if isinstance(parts.get('include'), IncludeSet):
+            copied[file]['include'] = IncludeSet()
+            copied[file]['include'].add_set(parts['include'])
+    return copied
+
+
+def clear_build_cache() -> None:
+    """Function will empty the cache of build results, e.g. if the JSON files were to change at runtime"""
+    _build_cache.clear()
 
 
 class AbstractCode:
@@ -102,6 +326,7 @@ class AbstractCode:
         self._name = None
         self._description = None
         self._context = None
+        self._hash = None
 
     def get_name(self) -> str:
         """getter for the protected attribute _name"""
@@ -115,6 +340,19 @@ class AbstractCode:
         """getter for the protected attribute _context"""
         return self._context
 
+    def _build_key(self) -> tuple:
+        """
+        method returns the key used for `_build_cache`, two codes with the same key will have the same build output
+        """
+        return self.__class__, self._name
+
+    def _frozen_copy(self) -> AbstractCode:
+        """
+        method returns a copy of the code which can't be changed, a code without a binding can't be changed anyway so
+        it is returned itself
+        """
+        return self
+
     @abc.abstractmethod
     def build(self) -> dict:
         """
@@ -122,6 +360,22 @@ class AbstractCode:
         """
         pass
 
+    def __eq__(self, other: AbstractCode) -> bool:
+        """
+        two codes are equal if they have the same class and the same values, which is what `_build_key` returns
+        """
+        if not isinstance(other, AbstractCode):
+            return NotImplemented
+        return self._build_key() == other._build_key()
+
+    def __hash__(self):
+        """
+        the name of a code can't be changed so the hash is only calculated once
+        """
+        if self._hash is None:
+            self._hash = hash(self._build_key())
+        return self._hash
+
     @abc.abstractmethod
     def __str__(self):
         pass
@@ -133,42 +387,129 @@ class AbstractCode:
         return {f"{self.__class__}": {'_name': self._name}}
 
 
+def _compile_binding_validator(binding_schema: dict):
+    """
+    Function turns the binding schema of a class into a function which raises a TypeError or ValueError if a value is
+    not a valid binding. It is called once per class, the data types are put in a frozenset so that checking them is
+    O(1) and when there is no 'data_validation' that check is skipped entirely.
+
+    @param binding_schema: refer to AbstractCodeWithBinding for the structure of the dictionary
+    """
+    data_types = binding_schema['data_types']
+    type_set = frozenset(data_types)
+    data_validation = binding_schema.get('data_validation')
+
+    if data_validation is None:
+        def validator(name: str, value: any) -> None:
+            if type(value) not in type_set:
+                raise TypeError(f"parameter 'value' expected {data_types} but received {type(value)}")
+        return validator
+
+    def validator(name: str, value: any) -> None:
+        # checks for the correct data type
+        if type(value) not in type_set:
+            raise TypeError(f"parameter 'value' expected {data_types} but received {type(value)}")
+        # if there is data validation, and it is not passed then raise error
+        if not data_validation(name, value):
+            raise ValueError(f"parameter 'value' failed data validation for {name} with the value {value!r}")
+    return validator
+
+
 class AbstractCodeWithBinding(AbstractCode):
     """
-    AbstractCodeWithBinding is an abstract class which will have a property attribute _binding which is a dictionary
-    with the following structure:
+    AbstractCodeWithBinding is an abstract class for codes which have a binding. The binding is described once per
+    class in the class attribute _binding_schema which is a dictionary with the following structure:
     ```python
     {'property_name': str,
      'data_types': list of classes,
-     'current_value': value,
      'data_validation': lambda expression}
     ```
-    `'data_validation'` is an optional attribute which uses a lambda expression to validate the data
+    `'data_validation'` is an optional attribute which uses a lambda expression to validate the data, it is given the
+    name of the code and the value. The schema is compiled into a validator the first time it is used, and the
+    current value of the binding is stored in the attribute _binding_value.
     """
+    _binding_schema: dict = {}
 
     @abc.abstractmethod
     def __init__(self):
         super().__init__()
-        self._binding = {}
+        self._binding_value = None
+        self._frozen = False
+
+    @classmethod
+    def _get_binding_validator(cls):
+        """
+        method returns the compiled validator of the class, it is compiled the first time and stored on the class
+        """
+        if '_binding_validator' not in cls.__dict__:
+            cls._binding_validator = staticmethod(_compile_binding_validator(cls._binding_schema))
+        return cls._binding_validator
 
     def get_binding(self) -> dict:
         """
-        getter for the protected attribute _binding
+        getter for the binding, returns the schema with the key 'current_value' added
         """
-        return self._binding
+        return {**self._binding_schema, 'current_value': self._binding_value}
 
     def set_binding(self, value) -> None:
         """
-        setter for the protected attribute _binding
+        setter for the binding, the binding is part of the key used for the build cache so a new value will not return
+        the old build output
         """
-        # checks for the correct data type
-        if type(value) not in self._binding['data_types']:
-            raise TypeError(f"parameter 'value' expected {self._binding['data_types']} but received {type(value)}")
-        # if there is data validation, and it is not passed then raise error
-        if 'data_validation' in self._binding and not self._binding['data_validation'](value):
-            raise ValueError(f"parameter 'value' failed data validation")
+        if self._frozen:
+            raise ValueError(f"{self} is frozen as it is part of a shared behaviour, bind a new code instead")
+        self._get_binding_validator()(self._name, value)
+        self._binding_value = value
 
-        self._binding['current_value'] = value
+    def _frozen_copy(self) -> AbstractCode:
+        """
+        method returns a copy of the code which can't be changed with set_binding, the codes nested in its binding are
+        frozen copies as well
+        """
+        if self._frozen:
+            return self
+        code = copy.copy(self)
+        if isinstance(code._binding_value, AbstractCode):
+            code._binding_value = code._binding_value._frozen_copy()
+        code._frozen = True
+        return code
+
+    @classmethod
+    def validate_many(cls, bindings) -> None:
+        """
+        method checks a batch of bindings for this class without creating any codes, e.g. when a project is imported.
+        The same errors as set_binding are raised, the message has the position of the failing binding added to the
+        start.
+
+        @param bindings: iterable of (name, value) tuples
+        """
+        validator = cls._get_binding_validator()
+        for position, (name, value) in enumerate(bindings):
+            try:
+                validator(name, value)
+            except (TypeError, ValueError) as error:
+                raise error.__class__(f"position {position}: {error}") from None
+
+    def _build_key(self) -> tuple:
+        """
+        method returns the key used for `_build_cache`, nested codes are included through their own key so a change
+        further down a chain like LC(LS(A)) will also change the key
+        """
+        value = self._binding_value
+        if isinstance(value, AbstractCode):
+            value = value._build_key()
+        return self.__class__, self._name, value
+
+    def __hash__(self):
+        """
+        only a frozen code can be hashed, the binding of any other code can be changed with set_binding which would
+        change its hash while it is in a set or a dictionary
+        """
+        if not self._frozen:
+            raise TypeError(f"{self} can be changed so it can't be hashed, hash a frozen copy of it instead")
+        if self._hash is None:
+            self._hash = hash(self._build_key())
+        return self._hash
 
     def export(self, recursion: dict = None) -> dict:
         """
@@ -176,11 +517,9 @@ class AbstractCodeWithBinding(AbstractCode):
         """
         if recursion is None:
             return_dict = super().export()
-            return_dict[f"{self.__class__}"]['_binding'] = self.export(recursion=self._binding)
+            return_dict[f"{self.__class__}"]['_binding'] = self.export(recursion=self.get_binding())
             return return_dict
-        if 'export' in dir(recursion['current_value']):
-            return recursion['current_value'].export()
-        return recursion['current_value']
+        return export_value(recursion['current_value'])
 
 
 class KeyCode(AbstractCode):
@@ -194,19 +533,20 @@ class KeyCode(AbstractCode):
         if type(name) is not str:
             raise TypeError(f"parameter 'name' expected {str} but received {type(name)}")
         if name not in KeyCodesJSON():
-            raise KeyError(f"parameter 'name' expected to be from key_codes.json but received {name}")
+            raise KeyError(f"parameter 'name' expected to be from the key_codes of keycodes.json but received {name}")
 
         self._name = name
         self._description = KeyCodesJSON()[name]["description"]
         self._context = KeyCodesJSON()[name]["context"]
 
+    @_memoize_build
     def build(self) -> dict:
         """
         method will return a dictionary containing the necessary bits for the zmk firmware to build it
         """
         return {
             '.keymap': {
-                'include': ['dt-bindings/zmk/keys.h'],
+                'include': IncludeSet(['dt-bindings/zmk/keys.h']),
                 'return' : self._name
             }
         }
@@ -223,34 +563,41 @@ class FunctionModifier(AbstractCodeWithBinding):
 
     def __init__(self, name: str, binding: any):
         super().__init__()
-        self._binding = {
-            'property_name': 'binding',
-            'data_types'   : [FunctionModifier, KeyCode]
-        }
         if type(name) is not str:
             raise TypeError(f"parameter 'name' expected {str} but received {type(name)}")
         if name not in FunctionModifiersJSON():
-            raise KeyError("parameter 'name' required a valid name from function_modifiers.json")
+            raise KeyError("parameter 'name' required a valid name from the function_modifiers of keycodes.json")
 
         self._name: str = name
         self._description: str = FunctionModifiersJSON()[name]["description"]
         self._context: str = FunctionModifiersJSON()[name]["context"]
         self.set_binding(binding)
 
+    @_memoize_build
     def build(self) -> dict:
         """
         method will return a dictionary containing the necessary bits for the zmk firmware to build it
         """
-        built_binding_dict = self._binding['current_value'].build()
+        built_binding_dict = self._binding_value.build()
+        includes = IncludeSet()
+        includes.add_set(built_binding_dict['.keymap']['include'])
+        includes.add('dt-bindings/zmk/keys.h')
         return {
             '.keymap': {
-                'include': list_union(built_binding_dict['.keymap']['include'], ['dt-bindings/zmk/keys.h']),
+                'include': includes,
                 'return' : self._name.replace('xx', built_binding_dict['.keymap']['return'])
             }
         }
 
     def __str__(self):
-        return f"FunctionModifier('{self._name}', {self._binding['current_value']})"
+        return f"FunctionModifier('{self._name}', {self._binding_value})"
+
+
+# the schema is set after the class as a FunctionModifier can be bound to another FunctionModifier
+FunctionModifier._binding_schema = {
+    'property_name': 'binding',
+    'data_types'   : [FunctionModifier, KeyCode]
+}
 
 
 class BluetoothKeyCode(AbstractCodeWithBinding):
@@ -258,40 +605,40 @@ class BluetoothKeyCode(AbstractCodeWithBinding):
     Class BluetoothKeyCode has protected attributes which ensures that its parameters are not tampered with and thus
     not cause errors on the build of the firmware.
     """
+    _binding_schema = {
+        'property_name'  : 'binding',
+        'data_types'     : [int, type(None)],
+        'data_validation': lambda name, value: (name == 'BT_SEL(xx)' and type(value) is int and 0 <= value) or (
+                name != 'BT_SEL(xx)' and value is None)
+    }
 
     def __init__(self, name: str, binding: any = None):
         super().__init__()
-        self._binding = {
-            'property_name'  : 'binding',
-            'data_types'     : [int, type(None)],
-            'data_validation': lambda value: (self._name == 'BT_SEL(xx)' and type(value) is int and 0 <= value) or (
-                    name != 'BT_SEL(xx)' and value is None),
-            'current_value'  : None
-        }
-
         if type(name) is not str:
             raise TypeError(f"parameter 'name' expected {str} but received {type(name)}")
         if name not in BluetoothKeyCodesJSON():
-            raise KeyError(f"parameter 'name' expected to be from bluetooth_key_codes.json but received {name}")
+            raise KeyError(
+                f"parameter 'name' expected to be from the bluetooth_keycodes of keycodes.json but received {name}")
 
         self._name = name
         self._description = BluetoothKeyCodesJSON()[name]["description"]
         self._context = BluetoothKeyCodesJSON()[name]["context"]
         self.set_binding(binding)
 
+    @_memoize_build
     def build(self) -> dict:
         """
         method will return a dictionary containing the necessary bits for the zmk firmware to build it
         """
         return {
             '.keymap': {
-                'include': ['dt-bindings/zmk/bt.h'],
-                'return' : self._name.replace('(xx)', f" {self._binding['current_value']}")
+                'include': IncludeSet(['dt-bindings/zmk/bt.h']),
+                'return' : self._name.replace('(xx)', f" {self._binding_value}")
             }
         }
 
     def __str__(self):
-        return f"BluetoothKeyCode('{self._name}', {self._binding['current_value']})"
+        return f"BluetoothKeyCode('{self._name}', {self._binding_value})"
 
 
 class OutputKeyCode(AbstractCode):
@@ -305,19 +652,21 @@ class OutputKeyCode(AbstractCode):
         if type(name) is not str:
             raise TypeError(f"parameter 'name' expected {str} but received {type(name)}")
         if name not in OutputKeyCodesAbstractJSON():
-            raise KeyError(f"parameter 'name' expected to be from output_key_codes.json but received {name}")
+            raise KeyError(
+                f"parameter 'name' expected to be from the output_keycodes of keycodes.json but received {name}")
 
         self._name = name
         self._description = OutputKeyCodesAbstractJSON()[name]["description"]
         self._context = OutputKeyCodesAbstractJSON()[name]["context"]
 
+    @_memoize_build
     def build(self) -> dict:
         """
         method will return a dictionary containing the necessary bits for the zmk firmware to build it
         """
         return {
             '.keymap': {
-                'include': ['dt-bindings/zmk/outputs.h'],
+                'include': IncludeSet(['dt-bindings/zmk/outputs.h']),
                 'return' : self._name
             }
         }
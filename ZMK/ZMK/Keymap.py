@@ -0,0 +1,491 @@
+"""
+Module contains the store of the keymap, which has layers of positions like the keymap of the firmware
+"""
+from __future__ import annotations
+
+__all__ = ['LayeredKeymap']
+
+import typing
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from . import Behaviours
+
+_EMPTY = 0
+"""id of an empty position"""
+
+_MAX_ID = 0xFFFF
+"""largest id an array('H') can store"""
+
+
+class _DeltaLayer:
+    """
+    Layer which only stores the positions which are not the default id, which is the id of Transparent. The positions
+    are a sorted array('H') and the ids of them are in a second array('H') at the same index, so getting a position
+    is a binary search. It is indexed and iterated like the dense array('H') of a layer.
+
+    The positions from `empty_from` to the end aren't stored either when they are empty, which is the case for the
+    layers of a new keymap and for the positions added when the layer grows, so they cost nothing until they are set.
+    """
+    __slots__ = ('positions', 'ids', 'length', 'default', 'empty_from')
+
+    def __init__(self, length: int, default: int, empty_from: int | None = None):
+        self.positions = array('H')
+        self.ids = array('H')
+        self.length = length
+        self.default = default
+        self.empty_from = length if empty_from is None else empty_from
+
+    @classmethod
+    def from_ids(cls, ids: typing.Sequence[int], length: int, default: int) -> _DeltaLayer:
+        empty_from = length
+        while empty_from and ids[empty_from - 1] == _EMPTY:
+            empty_from -= 1
+        layer = cls(length, default, empty_from)
+        for position in range(empty_from):
+            if ids[position] != default:
+                layer.positions.append(position)
+                layer.ids.append(ids[position])
+        return layer
+
+    def implicit(self, position: int) -> int:
+        """returns the id of a position which isn't stored"""
+        return self.default if position < self.empty_from else _EMPTY
+
+    def __getitem__(self, position: int) -> int:
+        index = bisect_left(self.positions, position)
+        if index < len(self.positions) and self.positions[index] == position:
+            return self.ids[index]
+        return self.implicit(position)
+
+    def __setitem__(self, position: int, behaviour_id: int) -> None:
+        index = bisect_left(self.positions, position)
+        found = index < len(self.positions) and self.positions[index] == position
+        if behaviour_id == self.implicit(position):
+            if found:
+                del self.positions[index]
+                del self.ids[index]
+        elif found:
+            self.ids[index] = behaviour_id
+        else:
+            self.positions.insert(index, position)
+            self.ids.insert(index, behaviour_id)
+        if position == self.empty_from and behaviour_id != _EMPTY:
+            self.__move_empty_from(index)
+
+    def __move_empty_from(self, index: int) -> None:
+        """
+        moves empty_from past the run of stored positions starting at it, the ones storing the default id become
+        implicit, so a layer filled in order from the start only stores the positions which aren't the default
+        """
+        end = index
+        while end < len(self.positions) and self.positions[end] == self.empty_from:
+            self.empty_from += 1
+            end += 1
+        kept = [i for i in range(index, end) if self.ids[i] != self.default]
+        self.positions[index:end] = array('H', (self.positions[i] for i in kept))
+        self.ids[index:end] = array('H', (self.ids[i] for i in kept))
+
+    def to_array(self) -> array:
+        """returns the dense ids of the layer"""
+        dense = array('H', [self.default]) * self.empty_from + array('H', [_EMPTY]) * (self.length - self.empty_from)
+        for position, behaviour_id in zip(self.positions, self.ids):
+            dense[position] = behaviour_id
+        return dense
+
+    def copy(self) -> _DeltaLayer:
+        layer = _DeltaLayer(self.length, self.default, self.empty_from)
+        layer.positions = array('H', self.positions)
+        layer.ids = array('H', self.ids)
+        return layer
+
+    def resize(self, length: int) -> array:
+        """changes the length and returns the ids of the positions which were removed, new positions are empty"""
+        index = bisect_left(self.positions, length)
+        removed = self.ids[index:]
+        del self.positions[index:]
+        del self.ids[index:]
+        self.empty_from = min(self.empty_from, length, self.length)
+        self.length = length
+        return removed
+
+    def __iter__(self):
+        return iter(self.to_array())
+
+    def __len__(self):
+        return self.length
+
+
+class LayeredKeymap:
+    """
+    Class LayeredKeymap stores a keymap of layers × positions. Instead of a list of behaviour objects per layer, every
+    layer is an `array('H')` of small integer ids into a table of the behaviours, which only holds each distinct
+    behaviour once. A layer of 100 positions is then 200 bytes however many behaviours are used, and copying a layer
+    is a copy of its array.
+
+    The behaviours in the table are shared with Behaviours.share_behaviour, so they are found by value and can't be
+    modified in place. The number of positions which use each id is counted so an id is freed and reused once no
+    position uses its behaviour anymore. Id 0 is an empty position, which is returned as None.
+
+    With `delta=True` every layer after the base layer is delta encoded, as most of the positions of those layers are
+    Transparent only the positions which aren't are stored, as a sorted array of positions and an array of their ids.
+    The layers are made dense again by get_layer and get_layer_ids when the keymap is built. New layers of a delta
+    keymap are Transparent instead of empty.
+    """
+
+    def __init__(self, positions: int = 0, layers: int = 1, delta: bool = False):
+        """
+        Constructor for the LayeredKeymap class
+
+        @param positions: number of positions of every layer
+        @param layers: number of empty layers to start with
+        @param delta: whether the layers after the base layer are delta encoded relative to Transparent
+
+        **Attributes**
+        `self.__layers` - list of array('H'), one per layer, of the ids of the behaviours of the positions
+
+        `self.__behaviours` - table of id -> behaviour, None for id 0 and for freed ids
+
+        `self.__ids` - dictionary of behaviour -> id, the reverse of the table
+
+        `self.__counts` - number of positions using each id, empty positions are not counted
+
+        `self.__free` - freed ids which can be reused
+
+        `self.__transparent` - id of Transparent if the keymap is delta encoded, otherwise None. Its count is kept
+        above 0 so it's never freed
+
+        `self.__observer` - function called with (layer, position) when a position changes, or with None when the
+        layers or the number of positions change, see set_observer
+        """
+        if type(positions) is not int:
+            raise TypeError(f"parameter 'positions' of type {type(positions)} is not an int")
+        if type(layers) is not int:
+            raise TypeError(f"parameter 'layers' of type {type(layers)} is not an int")
+        if positions < 0:
+            raise ValueError(f"parameter 'positions' of value {positions} is less than 0")
+        if layers < 0:
+            raise ValueError(f"parameter 'layers' of value {layers} is less than 0")
+        if type(delta) is not bool:
+            raise TypeError(f"parameter 'delta' of type {type(delta)} is not a bool")
+
+        self.__positions = positions
+        self.__layers: list[array] = [array('H', bytes(2 * positions)) for _ in range(layers)]
+        self.__behaviours: list = [None]
+        self.__ids: dict = {}
+        self.__counts: list[int] = [0]
+        self.__free: list[int] = []
+        self.__transparent: int | None = None
+        self.__observer: typing.Callable[[tuple | None], None] | None = None
+        if delta:
+            self.set_delta(True)
+
+    @classmethod
+    def from_layers(cls, layers: list, delta: bool = False) -> LayeredKeymap:
+        """
+        Method creates a keymap from a list of layers, each a list of behaviours or None, the layers may have a
+        different length and are padded to the longest with empty positions
+
+        @param layers: list of layers such as the ones returned by ImportKeymap.parse_keymap
+        @param delta: whether the layers after the base layer are delta encoded
+        """
+        keymap = cls(max((len(layer) for layer in layers), default=0), len(layers), delta)
+        for layer_index, layer in enumerate(layers):
+            for position, behaviour in enumerate(layer):
+                if behaviour is not None or (delta and layer_index):
+                    keymap.set(layer_index, position, behaviour)
+        return keymap
+
+    def is_delta(self) -> bool:
+        """Method returns whether the layers after the base layer are delta encoded"""
+        return self.__transparent is not None
+
+    def set_delta(self, delta: bool) -> None:
+        """
+        Method changes the encoding of the layers after the base layer, the behaviours of the positions stay the same
+
+        @param delta: True to delta encode the layers relative to Transparent, False to store every position
+        """
+        if type(delta) is not bool:
+            raise TypeError(f"parameter 'delta' of type {type(delta)} is not a bool")
+        if delta == self.is_delta():
+            return
+        if delta:
+            self.__transparent = self.__id(Behaviours.Transparent())
+            self.__counts[self.__transparent] += 1
+            for index in range(1, len(self.__layers)):
+                dense = self.__layers[index]
+                self.__counts[self.__transparent] -= dense.count(self.__transparent)
+                self.__layers[index] = _DeltaLayer.from_ids(dense, self.__positions, self.__transparent)
+            return
+        transparent, self.__transparent = self.__transparent, None
+        for index, layer in enumerate(self.__layers):
+            if isinstance(layer, _DeltaLayer):
+                dense = layer.to_array()
+                self.__counts[transparent] += dense.count(transparent)
+                self.__layers[index] = dense
+        self.__release(transparent)
+
+    def set_observer(self, observer: typing.Callable[[tuple | None], None] | None) -> None:
+        """
+        Method sets the function which is told about the changes of the keymap, ZMKConfig uses it to send the changes
+        to its subscribers. Changing the encoding with set_delta is not a change as the behaviours stay the same
+
+        @param observer: function called with (layer, position) or None when more than a position changed, None to
+        remove the observer
+        """
+        if observer is not None and not callable(observer):
+            raise TypeError(f"parameter 'observer' of type {type(observer)} is not callable")
+        self.__observer = observer
+
+    def __changed(self, key: tuple | None) -> None:
+        if self.__observer is not None:
+            self.__observer(key)
+
+    def __check_layer(self, layer: int) -> None:
+        if type(layer) is not int:
+            raise TypeError(f"parameter 'layer' of type {type(layer)} is not an int")
+        if not 0 <= layer < len(self.__layers):
+            raise IndexError(f"layer {layer} is out of range")
+
+    def __check_position(self, position: int) -> None:
+        if type(position) is not int:
+            raise TypeError(f"parameter 'position' of type {type(position)} is not an int")
+        if not 0 <= position < self.__positions:
+            raise IndexError(f"position {position} is out of range")
+
+    def __id(self, behaviour: Behaviours.AbstractBehaviour | None) -> int:
+        """returns the id of the behaviour, adding it to the table if it isn't in it"""
+        if behaviour is None:
+            return _EMPTY
+        if not isinstance(behaviour, Behaviours.AbstractBehaviour):
+            raise TypeError(f"parameter 'behaviour' of type {type(behaviour)} is not a Behaviour or None")
+        behaviour = Behaviours.share_behaviour(behaviour)
+        behaviour_id = self.__ids.get(behaviour)
+        if behaviour_id is not None:
+            return behaviour_id
+        if self.__free:
+            behaviour_id = self.__free.pop()
+            self.__behaviours[behaviour_id] = behaviour
+        else:
+            behaviour_id = len(self.__behaviours)
+            if behaviour_id > _MAX_ID:
+                raise ValueError(f"the keymap can't have more than {_MAX_ID} different behaviours")
+            self.__behaviours.append(behaviour)
+            self.__counts.append(0)
+        self.__ids[behaviour] = behaviour_id
+        return behaviour_id
+
+    def __release(self, behaviour_id: int, count: int = 1) -> None:
+        """lowers the count of an id and frees it when no position uses it"""
+        if behaviour_id == _EMPTY:
+            return
+        self.__counts[behaviour_id] -= count
+        if not self.__counts[behaviour_id]:
+            del self.__ids[self.__behaviours[behaviour_id]]
+            self.__behaviours[behaviour_id] = None
+            self.__free.append(behaviour_id)
+
+    def __count_layer(self, layer: array | _DeltaLayer, sign: int, delta: bool = False) -> None:
+        """changes the counts of the ids stored by a layer, Transparent isn't counted in a delta layer as it's covered
+        by the count Transparent always keeps. delta is True for ids which were stored by a delta layer"""
+        delta = delta or isinstance(layer, _DeltaLayer)
+        ids = layer.ids if isinstance(layer, _DeltaLayer) else layer
+        for behaviour_id, count in Counter(ids).items():
+            if behaviour_id == _EMPTY or (delta and behaviour_id == self.__transparent):
+                continue
+            if sign > 0:
+                self.__counts[behaviour_id] += count
+            else:
+                self.__release(behaviour_id, count)
+
+    def get(self, layer: int, position: int) -> Behaviours.AbstractBehaviour | None:
+        """
+        Method returns the behaviour of a position
+
+        @param layer: index of the layer
+        @param position: index of the position
+        """
+        return self.__behaviours[self.__layers[layer][position]]
+
+    def set(self, layer: int, position: int, behaviour: Behaviours.AbstractBehaviour | None) -> None:
+        """
+        Method sets the behaviour of a position, the behaviour is shared so an equal behaviour is stored once
+
+        @param layer: index of the layer
+        @param position: index of the position
+        @param behaviour: behaviour or None to empty the position
+        """
+        self.__check_layer(layer)
+        self.__check_position(position)
+        behaviour_id = self.__id(behaviour)
+        if behaviour_id != _EMPTY:
+            self.__counts[behaviour_id] += 1
+        ids = self.__layers[layer]
+        if isinstance(ids, _DeltaLayer):
+            # Transparent isn't counted in a delta layer, stored or not
+            if behaviour_id == self.__transparent:
+                self.__counts[behaviour_id] -= 1
+            if ids[position] != self.__transparent:
+                self.__release(ids[position])
+        else:
+            self.__release(ids[position])
+        ids[position] = behaviour_id
+        self.__changed((layer, position))
+
+    def get_layer(self, layer: int) -> list:
+        """
+        Method returns the behaviours of a layer
+
+        @param layer: index of the layer
+        @return: list of behaviours or None
+        """
+        self.__check_layer(layer)
+        behaviours = self.__behaviours
+        return [behaviours[behaviour_id] for behaviour_id in self.get_layer_ids(layer)]
+
+    def get_layers(self) -> list:
+        """Method returns a list of the behaviours of every layer"""
+        return [self.get_layer(layer) for layer in range(len(self.__layers))]
+
+    def get_layer_ids(self, layer: int) -> array:
+        """
+        Method returns a copy of the ids of a layer, the behaviour of an id is returned by get_behaviour
+        """
+        self.__check_layer(layer)
+        ids = self.__layers[layer]
+        if isinstance(ids, _DeltaLayer):
+            return ids.to_array()
+        return array('H', ids)
+
+    def get_behaviour(self, behaviour_id: int) -> Behaviours.AbstractBehaviour | None:
+        """Method returns the behaviour of an id"""
+        return self.__behaviours[behaviour_id]
+
+    def get_behaviours(self) -> list:
+        """Method returns every distinct behaviour used by the keymap, in the order they were first added"""
+        return [behaviour for behaviour in self.__behaviours if behaviour is not None]
+
+    def get_position_count(self) -> int:
+        """Method returns the number of positions of every layer"""
+        return self.__positions
+
+    def get_layer_count(self) -> int:
+        """Method returns the number of layers"""
+        return len(self.__layers)
+
+    def set_position_count(self, positions: int) -> None:
+        """
+        Method changes the number of positions of every layer, new positions are empty and the positions past the new
+        count are removed
+        """
+        if type(positions) is not int:
+            raise TypeError(f"parameter 'positions' of type {type(positions)} is not an int")
+        if positions < 0:
+            raise ValueError(f"parameter 'positions' of value {positions} is less than 0")
+        for ids in self.__layers:
+            if isinstance(ids, _DeltaLayer):
+                self.__count_layer(ids.resize(positions), -1, delta=True)
+            elif positions < len(ids):
+                self.__count_layer(ids[positions:], -1)
+                del ids[positions:]
+            else:
+                ids.frombytes(bytes(2 * (positions - len(ids))))
+        self.__positions = positions
+        self.__changed(None)
+
+    def add_layer(self, index: int = None) -> int:
+        """
+        Method inserts an empty layer, or a Transparent layer if the keymap is delta encoded
+
+        @param index: index of the new layer, None to add it after the last layer
+        @return: index of the new layer
+        """
+        if self.is_delta() and self.__layers:
+            return self.__insert_layer(_DeltaLayer(self.__positions, self.__transparent), index)
+        return self.__insert_layer(array('H', bytes(2 * self.__positions)), index)
+
+    def copy_layer(self, source: int, index: int = None) -> int:
+        """
+        Method inserts a copy of a layer
+
+        @param source: index of the layer to copy
+        @param index: index of the new layer, None to add it after the last layer
+        @return: index of the new layer
+        """
+        self.__check_layer(source)
+        ids = self.__layers[source]
+        ids = ids.copy() if isinstance(ids, _DeltaLayer) else array('H', ids)
+        self.__count_layer(ids, 1)
+        return self.__insert_layer(ids, index)
+
+    def __insert_layer(self, ids: array, index: int | None) -> int:
+        if index is None:
+            index = len(self.__layers)
+        if type(index) is not int:
+            raise TypeError(f"parameter 'index' of type {type(index)} is not an int")
+        if not 0 <= index <= len(self.__layers):
+            raise IndexError(f"index {index} is out of range")
+        self.__layers.insert(index, ids)
+        self.__changed(None)
+        return index
+
+    def del_layer(self, layer: int) -> None:
+        """
+        Method deletes a layer, the layers after it move down by one
+        """
+        self.__check_layer(layer)
+        self.__count_layer(self.__layers.pop(layer), -1)
+        self.__changed(None)
+
+    def move_layer(self, source: int, destination: int) -> None:
+        """
+        Method moves a layer to another index, the layers in between move up or down by one
+        """
+        self.__check_layer(source)
+        self.__check_layer(destination)
+        self.__layers.insert(destination, self.__layers.pop(source))
+        self.__changed(None)
+
+    def get_storage_size(self) -> int:
+        """Method returns the number of bytes used to store the ids of the positions of every layer"""
+        size = 0
+        for ids in self.__layers:
+            if isinstance(ids, _DeltaLayer):
+                size += ids.positions.itemsize * len(ids.positions) + ids.ids.itemsize * len(ids.ids)
+            else:
+                size += ids.itemsize * len(ids)
+        return size
+
+    def __len__(self):
+        """__len__, the number of layers"""
+        return len(self.__layers)
+
+    def __iter__(self):
+        """__iter__, the behaviours of every layer"""
+        return iter(self.get_layers())
+
+    def __eq__(self, other: LayeredKeymap) -> bool:
+        """two keymaps are equal if they have the same behaviours at the same positions, whatever their ids are"""
+        if not isinstance(other, LayeredKeymap):
+            return NotImplemented
+        return self.__positions == other.__positions and self.get_layers() == other.get_layers()
+
+    __hash__ = None
+
+    def export(self) -> dict:
+        """
+        Method returns a dictionary of the keymap which is able to be serialised to JSON, a delta encoded layer is
+        exported as its positions, the behaviours of them and the position from which the positions not stored are
+        empty instead of Transparent
+        """
+        layers = []
+        for index, ids in enumerate(self.__layers):
+            if isinstance(ids, _DeltaLayer):
+                layers.append({'_positions' : ids.positions.tolist(),
+                               '_bindings'  : [self.__behaviours[behaviour_id] for behaviour_id in ids.ids],
+                               '_empty_from': ids.empty_from})
+            else:
+                layers.append(self.get_layer(index))
+        return {f"{self.__class__}": {'_positions': self.__positions, '_delta': self.is_delta(), '_layers': layers}}
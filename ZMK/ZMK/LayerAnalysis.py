@@ -0,0 +1,235 @@
+"""
+Module analyses how the layers of a keymap can be reached through its MomentaryLayer, LayerTap and ToggleLayer
+behaviours, so that unreachable layers and layers which can't be left are found before the firmware is flashed
+"""
+from __future__ import annotations
+
+__all__ = ['LayerGraph', 'register_layer_behaviour']
+
+from collections import Counter, deque
+
+from . import Behaviours
+
+_layer_behaviours: dict[type, str] = {}
+"""behaviour class -> 'hold' if the layer is left when the key is released or 'toggle' if it stays active"""
+
+
+def register_layer_behaviour(behaviour_class: type, kind: str) -> None:
+    """
+    Function registers a behaviour class which changes the layer, the behaviour must have a 'layer' property
+
+    @param behaviour_class: child class of AbstractBehaviour
+    @param kind: 'hold' if the layer is only active while the key is held or 'toggle' if it stays active
+    """
+    if not (isinstance(behaviour_class, type) and issubclass(behaviour_class, Behaviours.AbstractBehaviour)):
+        raise TypeError(f"parameter 'behaviour_class' of type {type(behaviour_class)} is not a Behaviour class")
+    if kind not in ('hold', 'toggle'):
+        raise ValueError(f"parameter 'kind' expected 'hold' or 'toggle' but received {kind!r}")
+    _layer_behaviours[behaviour_class] = kind
+
+
+register_layer_behaviour(Behaviours.MomentaryLayer, 'hold')
+register_layer_behaviour(Behaviours.LayerTap, 'hold')
+register_layer_behaviour(Behaviours.ToggleLayer, 'toggle')
+
+
+def _layer_edge(behaviour: Behaviours.AbstractBehaviour | None) -> tuple[str, int] | None:
+    """returns (kind, layer) if the behaviour changes the layer"""
+    kind = _layer_behaviours.get(behaviour.__class__)
+    if kind is None:
+        return None
+    return kind, behaviour.get_config_property('layer')
+
+
+class LayerGraph:
+    """
+    Class LayerGraph is a graph of which layers can be activated from which layer, it is built in a single scan of the
+    keymap.
+
+    For every layer the number of bindings going to each (kind, target layer) is counted, so when a single binding
+    is changed with set_binding only the counts of that layer are updated. The analysis is done with breadth first
+    searches which are cached until a change could affect them, changing a KeyPress to another KeyPress doesn't.
+
+    - a layer is **reachable** if it can be activated starting from the default layer
+    - a layer is **dead** if it's not reachable
+    - a reachable layer is **trapped** if there is no way back to the default layer from it. A layer held with
+      MomentaryLayer or LayerTap is left when the key is released, a layer turned on with ToggleLayer is only left if
+      it has a ToggleLayer for itself, or is transparent at the position of the ToggleLayer which turned it on
+    - a layer is **missing** if a binding goes to it but the keymap doesn't have that many layers
+    """
+
+    def __init__(self, layers: list, default_layer: int = 0):
+        """
+        Constructor for the LayerGraph class
+
+        @param layers: list of layers, each a list of the behaviours, or None, of every position of the layer
+        @param default_layer: index of the layer the keyboard starts on
+        """
+        if not isinstance(layers, list):
+            raise TypeError(f"parameter 'layers' of type {type(layers)} is not a list")
+        if type(default_layer) is not int:
+            raise TypeError(f"parameter 'default_layer' of type {type(default_layer)} is not an int")
+        if layers and not 0 <= default_layer < len(layers):
+            raise ValueError(f"parameter 'default_layer' of value {default_layer} is not a layer of the keymap")
+
+        self.__layers: list[list] = []
+        self.__edges: list[dict[tuple[str, int], int]] = []
+        self.__default_layer = default_layer
+        self.__analysis: dict | None = None
+        for index, layer in enumerate(layers):
+            layer = list(layer)
+            # the layers of a keymap share the same few behaviour objects, so they are counted and every distinct
+            # object is only checked once
+            distinct = {id(behaviour): behaviour for behaviour in layer}
+            edges = {}
+            for key, count in Counter(map(id, layer)).items():
+                behaviour = distinct[key]
+                if behaviour is not None and not isinstance(behaviour, Behaviours.AbstractBehaviour):
+                    position = next(position for position, item in enumerate(layer) if item is behaviour)
+                    self.__check_behaviour(behaviour, f"layer {index} position {position}")
+                edge = _layer_edge(behaviour)
+                if edge is not None:
+                    edges[edge] = edges.get(edge, 0) + count
+            self.__layers.append(layer)
+            self.__edges.append(edges)
+
+    @staticmethod
+    def __check_behaviour(behaviour: any, location: str) -> None:
+        if behaviour is not None and not isinstance(behaviour, Behaviours.AbstractBehaviour):
+            raise TypeError(f"behaviour at {location} of type {type(behaviour)} is not a Behaviour")
+
+    def __len__(self):
+        return len(self.__layers)
+
+    def set_binding(self, layer: int, position: int, behaviour: Behaviours.AbstractBehaviour | None) -> None:
+        """
+        Method changes the behaviour of a single position and updates the graph
+
+        @param layer: index of the layer
+        @param position: index of the position in the layer
+        @param behaviour: new behaviour of the position or None
+        """
+        if not 0 <= layer < len(self.__layers):
+            raise IndexError(f"parameter 'layer' of value {layer} is not a layer of the keymap")
+        if not 0 <= position < len(self.__layers[layer]):
+            raise IndexError(f"parameter 'position' of value {position} is not a position of layer {layer}")
+        self.__check_behaviour(behaviour, f"layer {layer} position {position}")
+
+        old_behaviour = self.__layers[layer][position]
+        self.__layers[layer][position] = behaviour
+        old_edge, new_edge = _layer_edge(old_behaviour), _layer_edge(behaviour)
+        if old_edge == new_edge:
+            if old_edge is not None or isinstance(old_behaviour, Behaviours.Transparent) != isinstance(
+                    behaviour, Behaviours.Transparent):
+                # the positions of toggles and transparent keys are used to find the way back from a toggled layer
+                self.__analysis = None
+            return
+
+        edges = self.__edges[layer]
+        if old_edge is not None:
+            edges[old_edge] -= 1
+            if not edges[old_edge]:
+                del edges[old_edge]
+        if new_edge is not None:
+            edges[new_edge] = edges.get(new_edge, 0) + 1
+        self.__analysis = None
+
+    def get_edges(self, layer: int) -> dict:
+        """
+        Method returns the layer changes of a layer
+
+        @param layer: index of the layer
+        @return: dictionary of (kind, target layer) -> number of bindings
+        """
+        return dict(self.__edges[layer])
+
+    def __toggled_off(self, source: int, target: int) -> bool:
+        """whether the target layer, turned on by a toggle on the source layer, can be turned off again"""
+        if ('toggle', target) in self.__edges[target]:
+            return True
+        source_layer, target_layer = self.__layers[source], self.__layers[target]
+        for position in range(min(len(source_layer), len(target_layer))):
+            if _layer_edge(source_layer[position]) == ('toggle', target) and isinstance(target_layer[position],
+                                                                                        Behaviours.Transparent):
+                return True
+        return False
+
+    def __analyse(self) -> dict:
+        if self.__analysis is not None:
+            return self.__analysis
+
+        layer_count = len(self.__layers)
+        missing = set()
+        returns: list[list[int]] = [[] for _ in range(layer_count)]
+        """target layer -> source layers which can be returned to from it"""
+        for source, edges in enumerate(self.__edges):
+            for kind, target in edges:
+                if target >= layer_count:
+                    missing.add(target)
+                elif target != source and (kind == 'hold' or self.__toggled_off(source, target)):
+                    returns[target].append(source)
+
+        reachable = set()
+        if layer_count:
+            reachable.add(self.__default_layer)
+            queue = deque([self.__default_layer])
+            while queue:
+                for _, target in self.__edges[queue.popleft()]:
+                    if target < layer_count and target not in reachable:
+                        reachable.add(target)
+                        queue.append(target)
+
+        # a layer has a way back if the default layer can be reached from it following the return edges, which is a
+        # search from the default layer over the return edges reversed
+        way_back = set()
+        if layer_count:
+            leads_to: list[list[int]] = [[] for _ in range(layer_count)]
+            for target, sources in enumerate(returns):
+                for source in sources:
+                    leads_to[source].append(target)
+            way_back.add(self.__default_layer)
+            queue = deque([self.__default_layer])
+            while queue:
+                for target in leads_to[queue.popleft()]:
+                    if target not in way_back:
+                        way_back.add(target)
+                        queue.append(target)
+
+        self.__analysis = {
+            'reachable': frozenset(reachable),
+            'dead'     : tuple(layer for layer in range(layer_count) if layer not in reachable),
+            'trapped'  : tuple(sorted(reachable - way_back)),
+            'missing'  : tuple(sorted(missing))
+        }
+        return self.__analysis
+
+    def get_reachable_layers(self) -> frozenset:
+        """Method returns the layers which can be activated from the default layer"""
+        return self.__analyse()['reachable']
+
+    def get_dead_layers(self) -> tuple:
+        """Method returns the layers which can't be activated from the default layer"""
+        return self.__analyse()['dead']
+
+    def get_trapped_layers(self) -> tuple:
+        """Method returns the reachable layers which have no way back to the default layer"""
+        return self.__analyse()['trapped']
+
+    def get_missing_layers(self) -> tuple:
+        """Method returns the layers which bindings go to but which are not in the keymap"""
+        return self.__analyse()['missing']
+
+    def get_warnings(self) -> list:
+        """
+        Method returns a message for every problem found, for the application to show
+
+        @return: list of strings
+        """
+        analysis = self.__analyse()
+        warnings = [f"layer {layer} can't be reached from the default layer {self.__default_layer}"
+                    for layer in analysis['dead']]
+        warnings += [f"layer {layer} has no way back to the default layer {self.__default_layer}"
+                     for layer in analysis['trapped']]
+        warnings += [f"layer {layer} is used by a binding but the keymap has {len(self.__layers)} layers"
+                     for layer in analysis['missing']]
+        return warnings
@@ -151,14 +151,32 @@ class AbstractMCU:
         `AbstractInterconnect` or `None` if it has not been set yet.
         """
         self.__interconnect: [AbstractInterconnect, None] = None
+        self.__observer: typing.Callable[[str], None] | None = None
 
     def get_interconnect(self) -> AbstractInterconnect:
         """Getter for the interconnect"""
         return self.__interconnect
 
+    def set_observer(self, observer: typing.Callable[[str], None] | None) -> None:
+        """
+        Method sets the function which is called with the name of a setting of the MCU when it's changed, None to
+        remove it
+        """
+        if observer is not None and not callable(observer):
+            raise TypeError(f"parameter 'observer' of type {type(observer)} is not callable")
+        self.__observer = observer
+
+    def _changed(self, name: str) -> None:
+        """Method is called by the MCUs which have settings when one of them is changed in place"""
+        if self.__observer is not None:
+            self.__observer(name)
+
     @abc.abstractmethod
     def check_config(self, config: Config.ZMKConfig) -> bool:
         """Check method which checks if the config is compatible with the MCU"""
+        # Config imports this module, so it's only imported once the check is run
+        from . import Config
+
         # error checking
         if not isinstance(config, Config.ZMKConfig):
             raise TypeError(f"parameter 'config' of type {type(config)} is not a ZMKConfig")
@@ -198,6 +216,9 @@ class NiceNanoV2(AbstractMCU):
     def check_config(self, config: Config.ZMKConfig) -> bool:
         """Check method which checks if the config is compatible with the MCU"""
         # TODO: implement the error checking on this method if needed
+        # Config imports this module, so it's only imported once the check is run
+        from . import Config
+
         # error checking
         if not isinstance(config, Config.ZMKConfig):
             raise TypeError(f"parameter 'config' of type {type(config)} is not a ZMKConfig")
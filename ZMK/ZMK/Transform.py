@@ -15,24 +15,17 @@ if typing.TYPE_CHECKING:
 
 
 # noinspection PyMissingOrEmptyDocstring
-@dataclass
+@dataclass(frozen=True)
 class RowCol:
     """
-    Class RowCol represents a row and a column
+    Class RowCol represents a row and a column, it is frozen so the dataclass creates __eq__ and __hash__ from the row
+    and column which allows it to be used in sets and as a dictionary key
     """
     row: int
     """store for the row of a key"""
     col: int
     """store for the column of a key"""
 
-    def __eq__(self, other: RowCol) -> bool:
-        """
-        Method to compare two RowCol objects
-        """
-        if not isinstance(other, RowCol):
-            return False
-        return self.row == other.row and self.col == other.col
-
 
 class MatrixTransform:
     """
@@ -44,6 +37,7 @@ class MatrixTransform:
         The list will store None values if the key has not been set yet
         """
         self.__matrix: Array([None | RowCol]) = Array()
+        self.__observer: typing.Callable[[int], None] | None = None
 
     def get_matrix(self) -> Array([None | RowCol]):
         """
@@ -65,9 +59,19 @@ class MatrixTransform:
 
         if index is None:
             self.__matrix.append(RowCol(row, col))
-            return
+            index = len(self.__matrix) - 1
+        else:
+            self.__matrix.insert(index, RowCol(row, col))
+        if self.__observer is not None:
+            self.__observer(index)
 
-        self.__matrix.insert(index, RowCol(row, col))
+    def set_observer(self, observer: typing.Callable[[int], None] | None) -> None:
+        """
+        Method sets the function which is called with the index of a key when it's added, None to remove it
+        """
+        if observer is not None and not callable(observer):
+            raise TypeError(f"parameter 'observer' of type {type(observer)} is not callable")
+        self.__observer = observer
 
     def get_key(self, index: int) -> RowCol or None:
         """
@@ -106,6 +110,17 @@ class MatrixTransform:
         """
         return len(self.__matrix)
 
+    def __eq__(self, other: MatrixTransform) -> bool:
+        """
+        Two matrix transforms are equal if they have the same keys at the same indexes
+        """
+        if not isinstance(other, MatrixTransform):
+            return NotImplemented
+        return self.__matrix == other.__matrix
+
+    # the matrix can be changed with add_key, so a transform can't be used in a set or as a dictionary key
+    __hash__ = None
+
 
 if __name__ == '__main__':
     test_matrix_transform = MatrixTransform()
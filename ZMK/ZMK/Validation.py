@@ -0,0 +1,261 @@
+"""
+Module validates a whole ZMKConfig with a set of rules, it is used by ZMKConfig.check_config.
+
+Every rule declares the components of the config it reads, which are the names of the attributes of ZMKConfig as they
+are sent by its change notification. The ConfigValidator keeps the problems found by every rule and when the config
+is checked again only the rules reading a component which changed are run, and they are told which keys of the
+components changed, so a rule such as the one for the layers only updates the positions which were edited.
+"""
+from __future__ import annotations
+
+__all__ = ['AbstractRule', 'ConfigValidator', 'register_rule', 'get_rules']
+
+import abc
+import typing
+
+from . import Behaviours
+from .LayerAnalysis import LayerGraph
+
+if typing.TYPE_CHECKING:
+    from . import Config
+
+_rules: dict[str, type] = {}
+"""rule name -> rule class, in the order they were registered"""
+
+
+class AbstractRule:
+    """
+    Class AbstractRule is the parent of the rules. A ConfigValidator creates one instance of every rule, so a rule can
+    keep what it needs to check the config again quickly in its attributes.
+    """
+
+    components: tuple = ()
+    """names of the components of the config the rule reads"""
+
+    @abc.abstractmethod
+    def check(self, zmk_config: Config.ZMKConfig, changes: dict | None) -> list:
+        """
+        Method checks the config
+
+        @param zmk_config: config to check
+        @param changes: dictionary of component -> frozenset of the keys which changed since the rule was last run,
+        only the components of the rule are included, None is one of the keys if the whole component may have changed.
+        changes is None the first time the rule is run
+        @return: list of the problems found, as strings for the application to show
+        """
+        return []
+
+
+def register_rule(rule_class: type) -> None:
+    """
+    Function registers a rule which is checked by every ConfigValidator created afterwards, the name of the rule is the
+    name of the class
+    """
+    if not (isinstance(rule_class, type) and issubclass(rule_class, AbstractRule)):
+        raise TypeError(f"parameter 'rule_class' of type {type(rule_class)} is not a child class of AbstractRule")
+    if not rule_class.components:
+        raise ValueError(f"rule {rule_class.__name__} doesn't read any components")
+    _rules[rule_class.__name__] = rule_class
+
+
+def get_rules() -> dict:
+    """
+    Function returns the registered rules
+
+    @return: dictionary of rule name -> components of the rule
+    """
+    return {name: tuple(rule_class.components) for name, rule_class in _rules.items()}
+
+
+class RequiredValuesRule(AbstractRule):
+    """the values ZMK needs to identify the keyboard and where the config is saved"""
+    components = ('config_name', 'config_id', 'shield_directory', 'working_directory')
+
+    def check(self, zmk_config: Config.ZMKConfig, changes: dict | None) -> list:
+        problems = [f"the {name.replace('_', ' ')} is not set" for name in self.components
+                    if getattr(zmk_config, f"get_{name}")() is None]
+        name = zmk_config.get_config_name()
+        if name is not None and len(name) > 16:
+            problems.append(f"the config name {name!r} is longer than the 16 characters ZMK allows")
+        return problems
+
+
+class McuRule(AbstractRule):
+    """the MCU is set and accepts the config"""
+    components = ('mcu', 'transform', 'driver', 'split_config')
+
+    def check(self, zmk_config: Config.ZMKConfig, changes: dict | None) -> list:
+        mcu = zmk_config.get_mcu()
+        if mcu is None:
+            return ["the mcu is not set"]
+        if not mcu.check_config(zmk_config):
+            return [f"the config is not compatible with the mcu {mcu}"]
+        return []
+
+
+class TransformRule(AbstractRule):
+    """every key of the transform is set and no two keys have the same row and column"""
+    components = ('transform',)
+
+    def check(self, zmk_config: Config.ZMKConfig, changes: dict | None) -> list:
+        transform = zmk_config.get_transform()
+        if transform is None:
+            return ["the transform is not set"]
+        problems = []
+        seen = {}
+        for index, key in enumerate(transform.get_matrix()):
+            if key is None:
+                problems.append(f"key {index} of the transform is not set")
+            elif key in seen:
+                problems.append(f"keys {seen[key]} and {index} of the transform are both at row {key.row} column "
+                                f"{key.col}")
+            else:
+                seen[key] = index
+        return problems
+
+
+class KeymapSizeRule(AbstractRule):
+    """the keymap has a position for every key of the transform"""
+    components = ('keymap', 'transform')
+
+    def check(self, zmk_config: Config.ZMKConfig, changes: dict | None) -> list:
+        keys = len(zmk_config.get_transform()) if zmk_config.get_transform() is not None else 0
+        positions = zmk_config.get_keymap().get_position_count()
+        if positions != keys:
+            return [f"the keymap has {positions} positions but the transform has {keys} keys"]
+        return []
+
+
+class BindingRule(AbstractRule):
+    """
+    every behaviour of the keymap can be built, the keymap stores every distinct behaviour once so they are only built
+    the first time they are used, and they are forgotten once no position uses them anymore
+    """
+    components = ('keymap',)
+
+    def __init__(self):
+        self.__built: dict[Behaviours.AbstractBehaviour, str | None] = {}
+        """behaviour -> problem building it, or None if it was built"""
+
+    def check(self, zmk_config: Config.ZMKConfig, changes: dict | None) -> list:
+        problems = []
+        built = {}
+        for behaviour in zmk_config.get_keymap().get_behaviours():
+            if behaviour in self.__built:
+                built[behaviour] = self.__built[behaviour]
+            else:
+                try:
+                    behaviour.build()
+                    built[behaviour] = None
+                except (ValueError, TypeError, KeyError) as error:
+                    built[behaviour] = f"the behaviour {behaviour} can't be built: {error}"
+            if built[behaviour] is not None:
+                problems.append(built[behaviour])
+        # the behaviours of removed positions and layers aren't kept
+        self.__built = built
+        return problems
+
+
+class LayerRule(AbstractRule):
+    """
+    every layer can be reached and left again, the LayerGraph is kept between checks and only the positions which
+    changed are updated in it
+    """
+    components = ('keymap',)
+
+    def __init__(self):
+        self.__graph: LayerGraph | None = None
+
+    def check(self, zmk_config: Config.ZMKConfig, changes: dict | None) -> list:
+        keymap = zmk_config.get_keymap()
+        keys = None if changes is None else changes['keymap']
+        if self.__graph is None or keys is None or None in keys:
+            self.__graph = LayerGraph(keymap.get_layers())
+        else:
+            for layer, position in keys:
+                self.__graph.set_binding(layer, position, keymap.get(layer, position))
+        return self.__graph.get_warnings()
+
+
+class ConfigOptionRule(AbstractRule):
+    """every config option accepts its value, and the split config options are only set for a split keyboard"""
+    components = ('config_options', 'default_config_options', 'split_config', 'split_config_options')
+
+    def check(self, zmk_config: Config.ZMKConfig, changes: dict | None) -> list:
+        problems = []
+        options = zmk_config.get_default_config_options() + zmk_config.get_config_options()
+        for side, side_options in zmk_config.get_split_config_options().items():
+            if side_options and not zmk_config.is_split_config():
+                problems.append(f"the {side} has config options but the config is not split")
+            options += side_options
+        for option in options:
+            if not option.check_config_property(zmk_config):
+                problems.append(f"the config option {option} has an invalid value")
+        return problems
+
+
+for _rule in (RequiredValuesRule, McuRule, TransformRule, KeymapSizeRule, BindingRule, LayerRule, ConfigOptionRule):
+    register_rule(_rule)
+
+
+class ConfigValidator:
+    """
+    Class ConfigValidator checks a ZMKConfig with the registered rules, and when it's checked again only runs the rules
+    reading a component which changed since
+    """
+
+    def __init__(self, zmk_config: Config.ZMKConfig):
+        """
+        Constructor for the ConfigValidator class, the validator subscribes to the changes of the config
+
+        **Attributes**
+        `self.__rules` - dictionary of rule name -> instance of the rule
+
+        `self.__problems` - dictionary of rule name -> problems found the last time the rule was run, rules which
+        haven't been run yet are missing
+
+        `self.__changes` - dictionary of component -> set of the keys which changed since the rules were last run
+
+        `self.__last_run` - names of the rules run by the last validation
+        """
+        self.__config = zmk_config
+        self.__rules: dict[str, AbstractRule] = {name: rule_class() for name, rule_class in _rules.items()}
+        self.__problems: dict[str, list] = {}
+        self.__changes: dict[str, set] = {}
+        self.__last_run: list[str] = []
+        zmk_config.subscribe(self.__on_changes)
+
+    def __on_changes(self, changes: list) -> None:
+        for change in changes:
+            self.__changes.setdefault(change.component, set()).add(change.key)
+
+    def validate(self) -> list:
+        """
+        Method checks the config
+
+        @return: list of the problems found by every rule, in the order the rules were registered
+        """
+        changes, self.__changes = self.__changes, {}
+        self.__last_run = []
+        for name, rule in self.__rules.items():
+            if name not in self.__problems:
+                self.__problems[name] = rule.check(self.__config, None)
+            elif any(component in changes for component in rule.components):
+                self.__problems[name] = rule.check(self.__config, {component: frozenset(changes.get(component, ()))
+                                                                   for component in rule.components})
+            else:
+                continue
+            self.__last_run.append(name)
+        return [problem for problems in self.__problems.values() for problem in problems]
+
+    def get_problems(self) -> dict:
+        """
+        Method returns the problems found by the last validation
+
+        @return: dictionary of rule name -> list of problems
+        """
+        return {name: list(problems) for name, problems in self.__problems.items()}
+
+    def get_last_run(self) -> list:
+        """Method returns the names of the rules run by the last validation"""
+        return list(self.__last_run)
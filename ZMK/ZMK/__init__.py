@@ -1,6 +1,6 @@
 """
 The ZMK Package is a Python package which allows you to create a ZMK config using a Python interface.
 """
-from . import Behaviours, ConfigOptions, CustomDataStructures, Drivers, ExportConfig, Features, ImportConfig, \
-    KeyCodes, MCUs, Shields, Transform
+from . import Behaviours, BuildConfig, Changes, Combos, ConfigOptions, CustomDataStructures, Drivers, ExportConfig, \
+    Features, ImportConfig, History, ImportKeymap, KeyCodes, Keymap, LayerAnalysis, MCUs, Shields, Transform, Validation
 from . import Config